@@ -2,8 +2,10 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import copy
 import json
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict
 from pathlib import Path
 from typing import Any, Iterable
@@ -28,7 +30,9 @@ from ragstream.ingestion.vector_store_chroma import VectorStoreChroma
 
 # Added on 13.04.2026:
 # Parallel SPLADE ingestion branch.
+from ragstream.ingestion.splade_backend import create_splade_embedder, resolve_splade_backend
 from ragstream.ingestion.splade_embedder import SpladeEmbedder
+from ragstream.ingestion.splade_process_pool import SpladeProcessPoolEmbedder
 from ragstream.ingestion.vector_store_splade import VectorStoreSplade
 
 # Added on 15.03.2026:
@@ -45,6 +49,15 @@ from ragstream.textforge.RagLog import LogDeveloper as _logger_dev
 
 DEV_LOG_ENABLED = False
 
+# SuperPrompt attributes written by MemoryRetriever (merged back after
+# concurrent retrieval; extras keys are merged separately).
+MEMORY_RETRIEVAL_FIELDS = (
+    "memory_context_pack",
+    "memory_context_text",
+    "active_memory_brief_title",
+    "active_memory_brief",
+)
+
 
 def logger_dev(*args, **kwargs):
     if DEV_LOG_ENABLED:
@@ -297,9 +310,16 @@ class AppController:
         Run Retrieval on the current SuperPrompt.
 
         Current behavior:
-        1. Run document retrieval.
-        2. Run memory retrieval if MemoryRetriever is configured.
-        3. Store raw document chunks and raw memory candidates in SuperPrompt.
+        1. Run document retrieval and memory retrieval (if MemoryRetriever is
+           configured) concurrently; both are dominated by independent
+           embedding calls and vector searches.
+        2. Store raw document chunks and raw memory candidates in SuperPrompt.
+
+        Memory retrieval works on a private view of the SuperPrompt (see
+        _memory_retrieval_view), so the two branches never share a mutable
+        object. Its fields are merged into sp after document retrieval has
+        finished, in the same order the former sequential flow produced. A
+        memory failure is logged and leaves document retrieval untouched.
 
         This method does not run:
         - ReRanker
@@ -312,16 +332,34 @@ class AppController:
 
         project_name = self._normalize_project_name(project_name)
 
-        sp = self.retriever.run(
-            sp=sp,
-            project_name=project_name,
-            top_k=int(top_k),
-            use_retrieval_splade=bool(use_retrieval_splade),
-        )
+        if self.memory_retriever is None:
+            logger(
+                "Memory Retrieval skipped: MemoryRetriever is not configured.",
+                "INFO",
+                "INTERNAL",
+            )
+            return self.retriever.run(
+                sp=sp,
+                project_name=project_name,
+                top_k=int(top_k),
+                use_retrieval_splade=bool(use_retrieval_splade),
+            )
+
+        memory_view = self._memory_retrieval_view(sp)
+        base_extras = dict(memory_view.extras)
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-retrieval") as pool:
+            memory_future = pool.submit(self.memory_retriever.run, memory_view)
+
+            sp = self.retriever.run(
+                sp=sp,
+                project_name=project_name,
+                top_k=int(top_k),
+                use_retrieval_splade=bool(use_retrieval_splade),
+            )
 
-        if self.memory_retriever is not None:
             try:
-                sp = self.memory_retriever.run(sp)
+                memory_view = memory_future.result()
             except Exception as e:
                 logger(f"Memory Retrieval failed: {e}", "ERROR", "PUBLIC")
                 logger_dev(
@@ -329,15 +367,47 @@ class AppController:
                     "ERROR",
                     "CONFIDENTIAL",
                 )
-        else:
-            logger(
-                "Memory Retrieval skipped: MemoryRetriever is not configured.",
-                "INFO",
-                "INTERNAL",
-            )
+                return sp
 
+        self._merge_memory_retrieval(sp, memory_view, base_extras)
         return sp
 
+    @staticmethod
+    def _memory_retrieval_view(sp: SuperPrompt) -> SuperPrompt:
+        """
+        Copy of sp for the memory branch.
+
+        MemoryRetriever (including its SuperPromptProjector fallback) reads
+        only effective_retrieval_query_text, prompt_ready, body and extras,
+        and writes MEMORY_RETRIEVAL_FIELDS plus extras keys. The strings are
+        immutable; body and extras (with their nested dicts) are deep-copied.
+        Every other field stays shared with sp and must not be touched by the
+        memory branch.
+        """
+        view = copy.copy(sp)
+        view.body = copy.deepcopy(sp.body)
+        view.extras = copy.deepcopy(getattr(sp, "extras", None) or {})
+        return view
+
+    @staticmethod
+    def _merge_memory_retrieval(
+        sp: SuperPrompt,
+        memory_view: SuperPrompt,
+        base_extras: dict[str, Any],
+    ) -> None:
+        """
+        Copy the memory branch's writes from memory_view into sp.
+        """
+        for field in MEMORY_RETRIEVAL_FIELDS:
+            setattr(sp, field, getattr(memory_view, field))
+
+        if sp.extras is None:
+            sp.extras = {}
+
+        for key, value in memory_view.extras.items():
+            if key not in base_extras or base_extras[key] is not value:
+                sp.extras[key] = value
+
     def run_reranker(
         self,
         sp: SuperPrompt,
@@ -394,17 +464,23 @@ class AppController:
         sparse_store = VectorStoreSplade(persist_dir=str(self.splade_root / project_name))
         chunker = Chunker()
         embedder = Embedder(model="text-embedding-3-small")
-        sparse_embedder = SpladeEmbedder(device="cpu")
-
-        stats = manager.run(
-            subfolder=project_name,
-            store=store,
-            chunker=chunker,
-            embedder=embedder,
-            sparse_store=sparse_store,
-            sparse_embedder=sparse_embedder,
-            manifest_path=str(manifest_path),
-        )
+        sparse_embedder = self._make_ingestion_splade_embedder()
+
+        try:
+            stats = manager.run(
+                subfolder=project_name,
+                store=store,
+                chunker=chunker,
+                embedder=embedder,
+                sparse_store=sparse_store,
+                sparse_embedder=sparse_embedder,
+                manifest_path=str(manifest_path),
+                chunking_mode=self._chunking_mode(),
+                build_ann_index=self._dense_search_mode() == "ann",
+            )
+        finally:
+            if isinstance(sparse_embedder, SpladeProcessPoolEmbedder):
+                sparse_embedder.close()
 
         result = asdict(stats)
         result.update(
@@ -571,6 +647,40 @@ class AppController:
             )
             return {}
 
+    def _dense_search_mode(self) -> str:
+        """
+        Return the configured dense retrieval mode ("exact" or "ann").
+        """
+        document_retrieval_config = self.runtime_config.get("document_retrieval", {}) or {}
+        return str(document_retrieval_config.get("dense_search_mode", "exact") or "exact").strip().lower()
+
+    def _chunking_mode(self) -> str:
+        """
+        Return the configured document chunking mode ("fixed" or "cdc").
+        """
+        document_ingestion_config = self.runtime_config.get("document_ingestion", {}) or {}
+        return str(document_ingestion_config.get("chunking_mode", "fixed") or "fixed").strip().lower()
+
+    def _make_ingestion_splade_embedder(self) -> SpladeEmbedder | SpladeProcessPoolEmbedder:
+        """
+        In-process SPLADE encoder, or a process pool when
+        document_ingestion.splade_workers > 0 (splade_torch_threads: 0 = auto).
+        Both use the backend configured under runtime_config "splade".
+        """
+        document_ingestion_config = self.runtime_config.get("document_ingestion", {}) or {}
+        workers = int(document_ingestion_config.get("splade_workers", 0) or 0)
+        if workers <= 0:
+            return create_splade_embedder(self.runtime_config.get("splade"), device="cpu")
+
+        choice = resolve_splade_backend(self.runtime_config.get("splade"))
+        return SpladeProcessPoolEmbedder(
+            choice.model,
+            workers=workers,
+            torch_threads=int(document_ingestion_config.get("splade_torch_threads", 0) or 0),
+            backend=choice.backend,
+            model_kwargs=choice.model_kwargs,
+        )
+
     @staticmethod
     def _normalize_project_name(project_name: str) -> str:
         name = (project_name or "").strip()
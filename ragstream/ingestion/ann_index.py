@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+ann_index.py
+
+Purpose:
+    Optional approximate-nearest-neighbour (ANN) index for the dense document
+    branch: an IVF-flat index over the L2-normalized chunk embeddings.
+
+Role in architecture:
+    - Ingestion side:
+        IngestionManager.run(..., build_ann_index=True) calls
+        build_ivf_index_for_store(store) after all upserts, which writes
+        "<chroma project dir>/dense_ivf.npz" next to the Chroma DB.
+    - Retrieval side:
+        RetrieverEmb in "ann" mode loads this file and probes the closest
+        inverted lists to build a shortlist per query piece. The exact p-norm
+        aggregation then runs over the union of those shortlists only.
+
+Index layout (all arrays, stored with np.savez):
+    ids:           [N]      chunk ids covered by the index
+    centroids:     [C, D]   L2-normalized list centroids (spherical k-means)
+    list_offsets:  [C + 1]  CSR-style offsets into list_members
+    list_members:  [N]      ordinals into ids, grouped by inverted list
+
+Why IVF-flat in NumPy:
+    - No extra native dependency next to Chroma.
+    - Members are rescored exactly from the resident matrix, so only the
+      coarse quantizer is approximate.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, List, Optional
+
+import numpy as np
+
+
+IVF_INDEX_FILE_NAME = "dense_ivf.npz"
+
+# Number of k-means iterations for the coarse quantizer.
+DEFAULT_KMEANS_ITERATIONS = 12
+
+# Training uses at most this many rows per list to keep ingestion bounded.
+DEFAULT_TRAIN_ROWS_PER_LIST = 256
+
+# Block size for assignment matmuls so memory stays flat on large stores.
+_ASSIGN_BLOCK_ROWS = 65536
+
+
+@dataclass(frozen=True)
+class IvfIndex:
+    """In-memory view of one persisted IVF-flat index."""
+    ids: List[str]
+    centroids: np.ndarray
+    list_offsets: np.ndarray
+    list_members: np.ndarray
+
+    @property
+    def n_lists(self) -> int:
+        return int(self.centroids.shape[0])
+
+    def probe(self, query_norm: np.ndarray, n_probe: int) -> np.ndarray:
+        """
+        Return the n_probe closest list ids for every query row.
+
+        Args:
+            query_norm: L2-normalized query vectors, shape [M, D].
+            n_probe: number of inverted lists to visit per query row.
+
+        Returns:
+            Integer array of shape [M, min(n_probe, n_lists)].
+        """
+        n_probe = max(1, min(int(n_probe), self.n_lists))
+        sims = query_norm @ self.centroids.T
+        if n_probe >= self.n_lists:
+            return np.tile(np.arange(self.n_lists), (sims.shape[0], 1))
+        return np.argpartition(-sims, n_probe - 1, axis=1)[:, :n_probe]
+
+
+def ivf_index_path(persist_dir: str | Path) -> Path:
+    """
+    Return the IVF index location for one project Chroma directory.
+    """
+    return Path(persist_dir) / IVF_INDEX_FILE_NAME
+
+
+def build_ivf_index(
+    ids: List[str],
+    embeddings: Any,
+    *,
+    n_lists: Optional[int] = None,
+    n_iter: int = DEFAULT_KMEANS_ITERATIONS,
+    seed: int = 0,
+) -> IvfIndex:
+    """
+    Train a spherical k-means coarse quantizer and assign every vector.
+
+    Args:
+        ids: chunk ids aligned with embeddings.
+        embeddings: raw embeddings, shape [N, D]; normalized here.
+        n_lists: number of inverted lists (default ~sqrt(N), at least 1).
+        n_iter: k-means iterations.
+        seed: RNG seed so repeated builds over the same data are identical.
+    """
+    X = np.asarray(embeddings, dtype=np.float32)
+    if X.ndim != 2 or X.shape[0] != len(ids):
+        raise ValueError("build_ivf_index: embeddings must be [N, D] and aligned with ids")
+    if X.shape[0] == 0 or X.shape[1] == 0:
+        raise ValueError("build_ivf_index: cannot train an index without embeddings")
+
+    X = X / (np.linalg.norm(X, axis=1, keepdims=True) + 1e-12)
+    n = X.shape[0]
+
+    if n_lists is None:
+        n_lists = int(round(np.sqrt(n)))
+    n_lists = max(1, min(int(n_lists), n))
+
+    rng = np.random.default_rng(seed)
+
+    train_rows = min(n, n_lists * DEFAULT_TRAIN_ROWS_PER_LIST)
+    train = X[np.sort(rng.choice(n, size=train_rows, replace=False))] if train_rows < n else X
+
+    centroids = train[rng.choice(train.shape[0], size=n_lists, replace=False)].copy()
+
+    for _ in range(max(1, int(n_iter))):
+        assign = _assign(train, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, train)
+        counts = np.bincount(assign, minlength=n_lists)
+
+        empty = np.flatnonzero(counts == 0)
+        if empty.size:
+            # Re-seed empty lists with random training rows.
+            sums[empty] = train[rng.choice(train.shape[0], size=empty.size, replace=False)]
+
+        centroids = sums / (np.linalg.norm(sums, axis=1, keepdims=True) + 1e-12)
+
+    assign = _assign(X, centroids)
+    order = np.argsort(assign, kind="stable")
+    counts = np.bincount(assign, minlength=n_lists)
+    offsets = np.zeros(n_lists + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    return IvfIndex(
+        ids=[str(chunk_id) for chunk_id in ids],
+        centroids=centroids.astype(np.float32),
+        list_offsets=offsets,
+        list_members=order.astype(np.int64),
+    )
+
+
+def save_ivf_index(index: IvfIndex, path: str | Path) -> None:
+    """
+    Atomically write an IVF index: *.tmp then os.replace.
+    """
+    dst = Path(path)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(dst.name + ".tmp")
+
+    with tmp.open("wb") as f:
+        np.savez(
+            f,
+            ids=np.asarray(index.ids, dtype=str),
+            centroids=index.centroids,
+            list_offsets=index.list_offsets,
+            list_members=index.list_members,
+        )
+
+    os.replace(str(tmp), str(dst))
+
+
+def load_ivf_index(path: str | Path) -> IvfIndex | None:
+    """
+    Load an IVF index, or return None if the file does not exist or holds no
+    usable centroids (e.g. an empty index written by an older build).
+    """
+    src = Path(path)
+    if not src.exists():
+        return None
+
+    with np.load(src, allow_pickle=False) as data:
+        centroids = np.asarray(data["centroids"], dtype=np.float32)
+        if centroids.ndim != 2 or centroids.shape[0] == 0 or centroids.shape[1] == 0:
+            return None
+        return IvfIndex(
+            ids=[str(chunk_id) for chunk_id in data["ids"].tolist()],
+            centroids=centroids,
+            list_offsets=np.asarray(data["list_offsets"], dtype=np.int64),
+            list_members=np.asarray(data["list_members"], dtype=np.int64),
+        )
+
+
+def build_ivf_index_for_store(store: Any, *, n_lists: Optional[int] = None) -> Path | None:
+    """
+    Rebuild the IVF index for one VectorStoreChroma and write it next to its DB.
+
+    An empty store gets no index: a stale file is removed, and retrieval
+    falls back to the exact path until rows exist again.
+
+    Returns:
+        Path of the written index file, or None for an empty store.
+    """
+    raw = store.collection.get(include=["embeddings"])
+    ids: List[str] = raw.get("ids", []) if raw else []
+    embeddings = raw.get("embeddings", []) if raw else []
+
+    path = ivf_index_path(store.persist_path)
+    if len(ids) == 0 or len(embeddings) == 0:
+        path.unlink(missing_ok=True)
+        return None
+
+    index = build_ivf_index(ids, embeddings, n_lists=n_lists)
+    save_ivf_index(index, path)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Internal helpers
+# ---------------------------------------------------------------------------
+
+def _assign(X: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Return the closest centroid id for every row of X (cosine)."""
+    out = np.empty(X.shape[0], dtype=np.int64)
+    for start in range(0, X.shape[0], _ASSIGN_BLOCK_ROWS):
+        block = X[start: start + _ASSIGN_BLOCK_ROWS]
+        out[start: start + block.shape[0]] = np.argmax(block @ centroids.T, axis=1)
+    return out
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+chroma_client_registry.py
+
+Purpose:
+    Process-wide registry of long-lived Chroma clients and collection handles.
+
+Role in architecture:
+    - ChromaVectorStoreBase (VectorStoreChroma) and MemoryVectorStore obtain
+      their client and collection here instead of constructing a new
+      chromadb.PersistentClient + get_or_create_collection per instance, so
+      retrieval, ingestion and memory calls no longer pay the SQLite open and
+      collection lookup on the hot path.
+    - Ingestion writes through the same shared handles, so re-ingesting a
+      project needs no invalidation.
+
+Design notes:
+    - Keys are resolved persist directories (same canonical form as
+      store_generation.store_key), collections are keyed by (path, name).
+    - All lookups and creations run under one lock; the returned Chroma
+      objects themselves are shared across threads.
+    - invalidate(...) drops the cached handles for one path, so the next call
+      looks the collection up again (e.g. after it was deleted / recreated).
+      With close_client=True the client is closed as well, which releases
+      Chroma's shared system for that path once nothing else holds it; use
+      this only when the directory itself goes away.
+    - No code path in the app deletes a project's store directory, but one
+      can vanish underneath the process (manual cleanup, tests). Every lookup
+      therefore checks that a cached path still holds its chroma.sqlite3 and,
+      if not, closes and drops its handles before creating fresh ones;
+      otherwise writes would hit the deleted, now read-only SQLite file.
+    - Chroma allows one settings object per path in a process; the first
+      caller's settings win for the lifetime of the cached client.
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+import chromadb
+from chromadb.config import Settings
+
+from .store_generation import store_key
+
+
+# SQLite file Chroma keeps in every persist directory; gone = directory was deleted.
+_CHROMA_DB_FILE = "chroma.sqlite3"
+
+_lock = threading.Lock()
+_clients: Dict[str, Any] = {}
+_collections: Dict[Tuple[str, str], Any] = {}
+
+
+def get_client(persist_dir: str | Path, *, anonymized_telemetry: bool = False) -> Any:
+    """
+    Return the shared PersistentClient for persist_dir (created on first use).
+    """
+    key = store_key(persist_dir)
+    with _lock:
+        _drop_if_deleted_locked(key)
+        return _get_client_locked(key, anonymized_telemetry)
+
+
+def get_collection(
+    persist_dir: str | Path,
+    collection_name: str,
+    *,
+    anonymized_telemetry: bool = False,
+) -> Any:
+    """
+    Return the shared collection handle (get_or_create_collection on first use).
+    """
+    key = store_key(persist_dir)
+    with _lock:
+        _drop_if_deleted_locked(key)
+        collection = _collections.get((key, collection_name))
+        if collection is None:
+            client = _get_client_locked(key, anonymized_telemetry)
+            collection = client.get_or_create_collection(collection_name)
+            _collections[(key, collection_name)] = collection
+        return collection
+
+
+def invalidate(persist_dir: str | Path, *, close_client: bool = False) -> None:
+    """
+    Drop the cached collection handles (and optionally the client) of one path.
+    """
+    key = store_key(persist_dir)
+    with _lock:
+        client = _drop_locked(key, close_client)
+    _close(client)
+
+
+def _drop_locked(key: str, close_client: bool) -> Any:
+    for collection_key in [ck for ck in _collections if ck[0] == key]:
+        del _collections[collection_key]
+    return _clients.pop(key, None) if close_client else None
+
+
+def _drop_if_deleted_locked(key: str) -> None:
+    # The old client must be closed before a new one opens the same path.
+    if key in _clients and not (Path(key) / _CHROMA_DB_FILE).exists():
+        _close(_drop_locked(key, close_client=True))
+
+
+def _close(client: Any) -> None:
+    if client is not None and hasattr(client, "close"):
+        client.close()
+
+
+def _get_client_locked(key: str, anonymized_telemetry: bool) -> Any:
+    client = _clients.get(key)
+    if client is None:
+        Path(key).mkdir(parents=True, exist_ok=True)
+        client = chromadb.PersistentClient(
+            path=key,
+            settings=Settings(anonymized_telemetry=anonymized_telemetry),
+        )
+        _clients[key] = client
+    return client
@@ -18,7 +18,10 @@ Contract (compatible with your former NumPy store):
 
 Design notes:
 - Uses chromadb.PersistentClient(path=...) to ensure physical persistence on disk.
-- Stores ONLY embeddings + metadatas (documents are optional for this project).
+  Client and collection handles come from the process-wide
+  chroma_client_registry, so creating a store instance is cheap.
+- Stores embeddings + metadatas; documents (chunk texts) are optional and,
+  when given, let retrieval hydrate chunks without re-reading source files.
 - Provides hook methods (_pre_add/_post_add/_pre_query/_post_query) so that the
   history store can enforce selection-only / capacity / eligibility rules later.
 """
@@ -31,8 +34,7 @@ from typing import Any, Dict, Iterable, List, Optional
 import shutil
 from datetime import datetime
 
-import chromadb
-from chromadb.config import Settings
+from .chroma_client_registry import get_client, get_collection
 
 
 class ChromaVectorStoreBase:
@@ -75,14 +77,15 @@ class ChromaVectorStoreBase:
         self.persist_path = Path(persist_dir)
         self.persist_path.mkdir(parents=True, exist_ok=True)
 
-        # Settings keep the DB local, file-backed, and quiet (no telemetry).
-        self._client = chromadb.PersistentClient(
-            path=str(self.persist_path),
-            settings=Settings(anonymized_telemetry=anonymized_telemetry),
-        )
+        # Shared, long-lived client per path: local, file-backed, quiet (no telemetry).
+        self._client = get_client(self.persist_path, anonymized_telemetry=anonymized_telemetry)
 
         self.collection_name = collection_name
-        self._col = self._client.get_or_create_collection(self.collection_name)
+        self._col = get_collection(
+            self.persist_path,
+            self.collection_name,
+            anonymized_telemetry=anonymized_telemetry,
+        )
 
     # -------------------------------------------------------------------------
     # Public API (stable)
@@ -93,14 +96,16 @@ class ChromaVectorStoreBase:
         ids: List[str],
         vectors: List[List[float]],
         metadatas: Optional[List[Dict[str, Any]]] = None,
+        documents: Optional[List[str]] = None,
     ) -> None:
         """
-        Upsert vectors and metadatas into the collection.
+        Upsert vectors, metadatas and optional documents into the collection.
 
         Contract matches the previous NumPy store:
           - ids:      unique stable IDs per chunk (e.g. "path::sha256::i")
           - vectors:  2D list [N, D] of float embeddings
           - metadatas: optional [N] list of dicts (same length as ids)
+          - documents: optional [N] list of chunk texts (same length as ids)
 
         Notes:
           - If an id already exists, Chroma upserts (replaces) it.
@@ -112,15 +117,25 @@ class ChromaVectorStoreBase:
             raise ValueError("ids and vectors length mismatch")
         if metadatas is not None and len(metadatas) != len(ids):
             raise ValueError("metadatas length must match ids (or be None)")
+        if documents is not None and len(documents) != len(ids):
+            raise ValueError("documents length must match ids (or be None)")
 
         ids, vectors, metadatas = self._pre_add(ids, vectors, metadatas)
 
-        # Core upsert (embeddings + optional metadatas). Documents are unused here.
-        self._col.upsert(
-            ids=ids,
-            embeddings=vectors,
-            metadatas=metadatas,
-        )
+        # Core upsert (embeddings + optional metadatas / documents).
+        if documents is None:
+            self._col.upsert(
+                ids=ids,
+                embeddings=vectors,
+                metadatas=metadatas,
+            )
+        else:
+            self._col.upsert(
+                ids=ids,
+                embeddings=vectors,
+                metadatas=metadatas,
+                documents=documents,
+            )
 
         self._post_add(ids, vectors, metadatas)
 
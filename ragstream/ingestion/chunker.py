@@ -1,24 +1,70 @@
 """
 Chunker
 =======
-Splits raw text into overlapping, character-based chunks for embedding.
+Splits raw text into chunks for embedding.
+
+Modes:
+- "fixed": overlapping, character-based windows (default; used for queries too).
+- "cdc":   content-defined chunks. Cut points are chosen among paragraph and
+           sentence breaks by hashing the text just before each break, so an
+           edit only moves the boundaries next to it and every other chunk keeps
+           exactly the same text (and can reuse its stored vectors).
 """
 
+import re
+import zlib
 from typing import List, Tuple
 
+CHUNK_MODE_FIXED = "fixed"
+CHUNK_MODE_CDC = "cdc"
+
+# Characters before a break that decide whether it becomes a cut point.
+_CDC_HASH_WINDOW = 48
+
+# Rough number of characters between two breaks in prose; sets the cut rate.
+_CDC_EXPECTED_BREAK_GAP = 80
+
+# Paragraph breaks, then sentence ends, then single line breaks.
+_BREAK_RE = re.compile(r"\n[ \t]*\n\s*|(?<=[.!?])\s+|\n")
+
 class Chunker:
-    """Window-based text splitter."""
+    """Window-based or content-defined text splitter."""
 
-    def split(self, file_path: str, text: str, chunk_size: int = 1200, overlap: int = 120) -> List[Tuple[str, str]]:
+    def split(
+        self,
+        file_path: str,
+        text: str,
+        chunk_size: int = 1200,
+        overlap: int = 120,
+        mode: str = CHUNK_MODE_FIXED,
+    ) -> List[Tuple[str, str]]:
         """
-        Split the given text into overlapping chunks.
+        Split the given text into chunks.
 
         :param file_path: Absolute path to the source file (kept with each chunk)
         :param text: The full text content of the file
-        :param chunk_size: Maximum characters per chunk (default=500)
-        :param overlap: Number of characters to overlap between chunks (default=100)
+        :param chunk_size: Maximum characters per chunk (default=1200)
+        :param overlap: Number of characters to overlap between chunks (default=120, fixed mode only)
+        :param mode: "fixed" (default) or "cdc"
         :return: List of (file_path, chunk_text) tuples
         """
+        return [
+            (file_path, chunk_text)
+            for _start, _end, chunk_text in self.split_spans(text, chunk_size, overlap, mode)
+        ]
+
+    def split_spans(
+        self,
+        text: str,
+        chunk_size: int = 1200,
+        overlap: int = 120,
+        mode: str = CHUNK_MODE_FIXED,
+    ) -> List[Tuple[int, int, str]]:
+        """
+        Same chunks as split(), with their [start, end) character span in text.
+
+        :return: List of (start, end, chunk_text) tuples; chunk_text is stripped and non-empty
+        """
         if chunk_size <= 0:
             raise ValueError("chunk_size must be positive")
         if overlap < 0:
@@ -26,15 +72,88 @@ class Chunker:
         if overlap >= chunk_size:
             raise ValueError("overlap must be smaller than chunk_size")
 
-        chunks: List[Tuple[str, str]] = []
+        if mode == CHUNK_MODE_FIXED:
+            spans = self._fixed_spans(len(text), chunk_size, overlap)
+        elif mode == CHUNK_MODE_CDC:
+            spans = self._content_defined_spans(text, chunk_size)
+        else:
+            raise ValueError(f"unsupported chunking mode: {mode!r}")
+
+        chunks: List[Tuple[int, int, str]] = []
+        for start, end in spans:
+            chunk_text = text[start:end].strip()
+            if chunk_text:
+                chunks.append((start, end, chunk_text))
+
+        return chunks
+
+    @staticmethod
+    def _fixed_spans(text_length: int, chunk_size: int, overlap: int) -> List[Tuple[int, int]]:
+        spans: List[Tuple[int, int]] = []
         start = 0
-        text_length = len(text)
 
         while start < text_length:
             end = min(start + chunk_size, text_length)
-            chunk_text = text[start:end].strip()
-            if chunk_text:
-                chunks.append((file_path, chunk_text))
+            spans.append((start, end))
             start += chunk_size - overlap
 
-        return chunks
+        return spans
+
+    @staticmethod
+    def _content_defined_spans(text: str, chunk_size: int) -> List[Tuple[int, int]]:
+        """
+        Content-defined boundaries snapped to paragraph / sentence breaks.
+
+        - A break becomes a cut if the chunk is at least min_size long and the
+          CRC32 of the preceding _CDC_HASH_WINDOW characters hits the divisor
+          (paragraph breaks use a smaller divisor, so they are preferred).
+        - A chunk never exceeds chunk_size: it is cut at the last break that
+          fits, or hard-cut at chunk_size when there is no break at all.
+        """
+        max_size = chunk_size
+        min_size = max(1, chunk_size // 4)
+        target = max(min_size + 1, chunk_size // 2)
+        divisor = max(1, (target - min_size) // _CDC_EXPECTED_BREAK_GAP)
+        paragraph_divisor = max(1, divisor // 4)
+
+        breaks: List[Tuple[int, bool]] = [
+            (m.end(), m.group(0).count("\n") >= 2)
+            for m in _BREAK_RE.finditer(text)
+        ]
+
+        spans: List[Tuple[int, int]] = []
+        start = 0
+        last_fit = -1
+
+        for pos, is_paragraph in breaks:
+            while pos - start > max_size:
+                cut = last_fit if last_fit > start else start + max_size
+                spans.append((start, cut))
+                start = cut
+                last_fit = -1
+
+            size = pos - start
+            if size <= 0:
+                continue
+
+            last_fit = pos
+            if size < min_size:
+                continue
+
+            window = text[max(start, pos - _CDC_HASH_WINDOW):pos].encode("utf-8")
+            d = paragraph_divisor if is_paragraph else divisor
+            if zlib.crc32(window) % d == 0:
+                spans.append((start, pos))
+                start = pos
+                last_fit = -1
+
+        while len(text) - start > max_size:
+            cut = last_fit if last_fit > start else start + max_size
+            spans.append((start, cut))
+            start = cut
+            last_fit = -1
+
+        if start < len(text):
+            spans.append((start, len(text)))
+
+        return spans
@@ -2,15 +2,71 @@
 Embedder
 ========
 Wraps OpenAI embeddings API to convert text chunks into dense vectors.
+
+Every text is first looked up in a persistent, content-addressed
+EmbeddingCache keyed by (model, sha256(text)); only misses go to the API.
+
+Retrieval-time texts go through embed_queries(...), which first checks a
+process-wide in-memory LRU (TTL) shared by dense and memory retrieval.
+
+Misses are split into batches bounded by item count and estimated tokens,
+sent concurrently through a bounded thread pool with retry + exponential
+backoff, and reassembled in input order.
 """
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 import os
+import random
+import time
 from dotenv import load_dotenv
+import openai
 from openai import OpenAI
 
+import numpy as np
+
+from ragstream.utils.paths import PATHS
+from .embedding_cache import (
+    DEFAULT_MAX_ENTRIES,
+    EmbeddingCache,
+    QueryEmbeddingLRU,
+    get_embedding_cache,
+    get_query_embedding_lru,
+)
+
+# Shared on-disk cache used by every Embedder unless told otherwise.
+DEFAULT_CACHE_PATH = PATHS["data"] / "embedding_cache" / "embeddings.sqlite3"
+
+# Request shaping defaults (OpenAI allows 2048 inputs / ~300k tokens per call).
+DEFAULT_MAX_BATCH_ITEMS = 256
+DEFAULT_MAX_BATCH_TOKENS = 200_000
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_BASE_S = 1.0
+
+# Transient API failures worth retrying.
+_RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
 class Embedder:
     """High-level embedding interface using OpenAI API."""
-    def __init__(self, model: str = "text-embedding-3-small"):
+    def __init__(
+        self,
+        model: str = "text-embedding-3-small",
+        *,
+        use_cache: bool = True,
+        cache_path: Optional[str] = None,
+        cache_max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_batch_items: int = DEFAULT_MAX_BATCH_ITEMS,
+        max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base_s: float = DEFAULT_BACKOFF_BASE_S,
+    ):
         load_dotenv()  # Load .env file
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
@@ -19,6 +75,45 @@ class Embedder:
         self.client = OpenAI(api_key=api_key)
         self.model = model
 
+        # Batching / concurrency / retry policy for API calls.
+        self.max_batch_items = max(1, int(max_batch_items))
+        self.max_batch_tokens = max(1, int(max_batch_tokens))
+        self.max_workers = max(1, int(max_workers))
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base_s = max(0.0, float(backoff_base_s))
+
+        # Persistent (model, sha256(text)) -> vector cache, shared per file path.
+        self.cache: Optional[EmbeddingCache] = None
+        if use_cache:
+            self.cache = get_embedding_cache(
+                Path(cache_path) if cache_path else DEFAULT_CACHE_PATH,
+                max_entries=cache_max_entries,
+            )
+
+        # Process-wide in-memory LRU for query texts (shared across Embedders, keyed by model).
+        self.query_cache: Optional[QueryEmbeddingLRU] = get_query_embedding_lru() if use_cache else None
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed retrieval-time texts (query pieces, memory query / anchor text).
+
+        Same vectors as embed(texts), but answered from the in-memory query
+        LRU when the same (model, text) was embedded recently. LRU hits are
+        shared read-only float32 arrays; callers must not modify them.
+        """
+        if not texts or self.query_cache is None:
+            return self.embed(texts)
+
+        vectors = self.query_cache.get_many(self.model, texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        if missing:
+            fresh = self.embed(missing)
+            self.query_cache.put_many(self.model, missing, fresh)
+            fresh_by_text = dict(zip(missing, fresh))
+            vectors = [v if v is not None else list(fresh_by_text[t]) for t, v in zip(texts, vectors)]
+
+        return vectors  # type: ignore[return-value]
+
     def embed(self, texts: List[str]) -> List[List[float]]:
         """
         Generate embeddings for a list of texts.
@@ -27,12 +122,121 @@ class Embedder:
         if not texts:
             return []
 
-        # OpenAI API allows batch embedding calls
-        response = self.client.embeddings.create(
-            model=self.model,
-            input=texts
-        )
+        if self.cache is None:
+            return self._embed_remote(texts)
+
+        vectors: List[Optional[List[float]]] = self.cache.get_many(self.model, texts)
+
+        # Embed each distinct missing text once, even if it repeats in this call.
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        if missing:
+            fresh = self._embed_remote(missing)
+            self.cache.put_many(self.model, missing, fresh)
+            fresh_by_text = dict(zip(missing, fresh))
+            vectors = [v if v is not None else fresh_by_text[t] for t, v in zip(texts, vectors)]
+
+        return vectors  # type: ignore[return-value]
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Return hit/miss counters of the embedding cache (empty dict if disabled).
+        """
+        stats = self.cache.stats() if self.cache is not None else {}
+        if self.query_cache is not None:
+            stats["query_lru"] = self.query_cache.stats()
+        return stats
 
-        # Extract embeddings from response
-        embeddings = [item.embedding for item in response.data]
+    def _embed_remote(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts via the API in bounded, concurrent batches.
+
+        Batches keep input order; results are concatenated in batch order, so
+        the output is aligned 1:1 with texts.
+        """
+        batches = [texts[start:end] for start, end in self._split_batches(texts)]
+
+        if len(batches) == 1:
+            return self._embed_batch(batches[0])
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+            results = list(pool.map(self._embed_batch, batches))
+
+        return [vector for batch_vectors in results for vector in batch_vectors]
+
+    def _split_batches(self, texts: List[str]) -> List[Tuple[int, int]]:
+        """
+        Split texts into contiguous [start, end) ranges bounded by
+        max_batch_items and the estimated max_batch_tokens.
+        """
+        ranges: List[Tuple[int, int]] = []
+        start = 0
+        tokens = 0
+
+        for idx, text in enumerate(texts):
+            text_tokens = _estimate_tokens(text)
+            full = (idx - start) >= self.max_batch_items
+            over = idx > start and tokens + text_tokens > self.max_batch_tokens
+            if full or over:
+                ranges.append((start, idx))
+                start = idx
+                tokens = 0
+            tokens += text_tokens
+
+        if start < len(texts):
+            ranges.append((start, len(texts)))
+        return ranges
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Call the OpenAI embeddings API for one batch, retrying transient errors
+        with exponential backoff and jitter.
+
+        Vectors are rounded to float32, the precision the cache stores, so a
+        text embeds to the same values whether it was a hit or a miss.
+        """
+        attempt = 0
+        while True:
+            try:
+                # OpenAI API allows batch embedding calls
+                response = self.client.embeddings.create(
+                    model=self.model,
+                    input=texts
+                )
+                break
+            except _RETRYABLE_ERRORS:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff_base_s * (2 ** attempt)
+                time.sleep(delay + random.uniform(0.0, delay))
+                attempt += 1
+
+        # Extract embeddings from response (the API echoes each input's index)
+        data = sorted(response.data, key=lambda item: item.index)
+        embeddings = [
+            np.asarray(item.embedding, dtype=np.float32).tolist()
+            for item in data
+        ]
+        if len(embeddings) != len(texts):
+            raise RuntimeError("Embedder: embeddings API returned a different number of vectors")
         return embeddings
+
+
+_TOKEN_ENCODER: Any = None
+
+
+def _estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of one text (tiktoken if available, else ~4 chars/token).
+    """
+    global _TOKEN_ENCODER
+    if _TOKEN_ENCODER is None:
+        try:
+            import tiktoken  # type: ignore
+
+            _TOKEN_ENCODER = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _TOKEN_ENCODER = False
+
+    if _TOKEN_ENCODER:
+        return len(_TOKEN_ENCODER.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4)
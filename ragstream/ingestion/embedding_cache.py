@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+"""
+embedding_cache.py
+
+Purpose:
+    Persistent, content-addressed cache for dense embeddings.
+
+Role in architecture:
+    - Embedder.embed(...) looks every text up here before calling the OpenAI
+      embeddings API and stores every new vector afterwards.
+    - Re-ingesting an edited file, re-embedding memory windows and repeated
+      query pieces therefore hit the API only for text never seen before.
+
+Storage model:
+    One SQLite file (WAL mode), one row per (model, sha256(text)):
+        model        TEXT     embedding model name
+        text_sha256  TEXT     hex SHA-256 of the UTF-8 text
+        dim          INTEGER  vector length
+        vector       BLOB     float32 little-endian bytes
+        last_access  INTEGER  access timestamp (ns) for LRU eviction
+
+Size cap:
+    When the number of rows exceeds max_entries, the least recently used rows
+    are deleted in one statement. The row count is read once on open and then
+    tracked in memory from inserted / deleted rows, so put_many(...) never runs
+    COUNT(*) (other processes writing the same file make it approximate until
+    the next open).
+
+LRU stamps:
+    Hits do not write immediately. Their last_access stamps are collected in
+    memory and written in one executemany + commit once _TOUCH_BATCH keys are
+    pending, before every eviction, and on stats() / close().
+
+In-memory query layer:
+    QueryEmbeddingLRU is a small process-wide LRU with TTL in front of the
+    SQLite cache, keyed by (model, sha256(text)). Embedder.embed_queries(...)
+    uses it for retrieval-time texts (dense query pieces, memory query text,
+    memory query anchor), so re-running a prompt needs neither an API call
+    nor a SQLite lookup for texts embedded a few minutes earlier.
+
+Notes:
+    - Caches are shared per file path inside one process (get_embedding_cache),
+      so hit/miss counters describe the whole process, not one Embedder. The
+      first caller's max_entries wins; a later, different limit is logged.
+    - Vectors are stored as float32, which is also what Chroma and the
+      retrieval matrices use.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ragstream.textforge.RagLog import LogALL as logger
+
+
+# Default row cap: ~100k vectors of 1536 float32 dims ≈ 600 MB on disk.
+DEFAULT_MAX_ENTRIES = 100_000
+
+# In-memory query LRU defaults: ~2k float32 vectors of 3072 dims ≈ 25 MB
+# (≈ 12.5 MB at 1536 dims).
+DEFAULT_QUERY_LRU_ENTRIES = 2048
+DEFAULT_QUERY_LRU_TTL_S = 900.0
+
+# SQLite limits the number of host parameters per statement.
+_SQL_BATCH = 500
+
+# Pending last_access updates written together (see "LRU stamps").
+_TOUCH_BATCH = 256
+
+
+def text_sha256(text: str) -> str:
+    """Return the hex SHA-256 of one text (UTF-8)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed (model, sha256(text)) -> float32 vector cache with LRU eviction.
+    """
+
+    def __init__(self, path: str | Path, *, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max(1, int(max_entries))
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model       TEXT    NOT NULL,
+                text_sha256 TEXT    NOT NULL,
+                dim         INTEGER NOT NULL,
+                vector      BLOB    NOT NULL,
+                last_access INTEGER NOT NULL,
+                PRIMARY KEY (model, text_sha256)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)"
+        )
+        self._conn.commit()
+
+        self._count = int(self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0])
+        self._pending_touch: Dict[tuple[str, str], int] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Look up vectors for texts; None marks a miss. Hits refresh their LRU
+        stamp (written in batches, see "LRU stamps").
+        """
+        keys = [text_sha256(t) for t in texts]
+        found: Dict[str, List[float]] = {}
+
+        with self._lock:
+            for key, blob in self._select_locked(model, keys, "text_sha256, vector"):
+                found[key] = np.frombuffer(blob, dtype="<f4").tolist()
+
+            if found:
+                stamp = time.time_ns()
+                for key in found:
+                    self._pending_touch[(model, key)] = stamp
+                if len(self._pending_touch) >= _TOUCH_BATCH:
+                    self._flush_touches_locked()
+                    self._conn.commit()
+
+            results = [found.get(key) for key in keys]
+            hit_count = sum(1 for r in results if r is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+
+        return results
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """
+        Store vectors for texts and evict least recently used rows above the cap.
+        """
+        if len(texts) != len(vectors):
+            raise ValueError("texts and vectors length mismatch")
+        if not texts:
+            return
+
+        stamp = time.time_ns()
+        rows = []
+        for text, vector in zip(texts, vectors):
+            arr = np.asarray(vector, dtype="<f4")
+            rows.append((model, text_sha256(text), int(arr.shape[0]), arr.tobytes(), stamp))
+
+        with self._lock:
+            # Primary-key lookups only: replaced rows must not grow the count.
+            existing = {key for (key,) in self._select_locked(model, [row[1] for row in rows], "text_sha256")}
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_sha256, dim, vector, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._count += len({row[1] for row in rows} - existing)
+            self._evict_locked()
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and the current row count."""
+        with self._lock:
+            if self._pending_touch:
+                self._flush_touches_locked()
+                self._conn.commit()
+            entries = int(self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0])
+            self._count = entries
+            return {
+                "path": str(self.path),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": entries,
+                "max_entries": self.max_entries,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pending_touch:
+                self._flush_touches_locked()
+                self._conn.commit()
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _select_locked(self, model: str, keys: Sequence[str], columns: str) -> List[tuple]:
+        """
+        SELECT columns for the distinct keys of one model, in batches of _SQL_BATCH.
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        rows: List[tuple] = []
+        for start in range(0, len(unique_keys), _SQL_BATCH):
+            batch = unique_keys[start: start + _SQL_BATCH]
+            placeholders = ",".join("?" for _ in batch)
+            rows.extend(
+                self._conn.execute(
+                    f"SELECT {columns} FROM embeddings "
+                    f"WHERE model = ? AND text_sha256 IN ({placeholders})",
+                    [model, *batch],
+                ).fetchall()
+            )
+        return rows
+
+    def _flush_touches_locked(self) -> None:
+        self._conn.executemany(
+            "UPDATE embeddings SET last_access = ? WHERE model = ? AND text_sha256 = ?",
+            [(stamp, model, key) for (model, key), stamp in self._pending_touch.items()],
+        )
+        self._pending_touch = {}
+
+    def _evict_locked(self) -> None:
+        overflow = self._count - self.max_entries
+        if overflow <= 0:
+            return
+
+        # Recent hits must be on disk before picking the oldest rows.
+        self._flush_touches_locked()
+        cur = self._conn.execute(
+            "DELETE FROM embeddings WHERE (model, text_sha256) IN ("
+            "  SELECT model, text_sha256 FROM embeddings ORDER BY last_access ASC LIMIT ?"
+            ")",
+            (overflow,),
+        )
+        deleted = max(0, int(cur.rowcount))
+        self.evictions += deleted
+        self._count -= deleted
+
+
+_registry_lock = threading.Lock()
+_registry: Dict[str, EmbeddingCache] = {}
+
+
+def get_embedding_cache(path: str | Path, *, max_entries: int = DEFAULT_MAX_ENTRIES) -> EmbeddingCache:
+    """
+    Return the process-wide EmbeddingCache for one file path.
+
+    One file gets one cache (two connections evicting with different limits
+    would undo each other's work), so a different max_entries for an already
+    open path is logged and ignored.
+    """
+    key = Path(path).resolve().as_posix()
+    with _registry_lock:
+        cache = _registry.get(key)
+        if cache is None:
+            cache = EmbeddingCache(key, max_entries=max_entries)
+            _registry[key] = cache
+            return cache
+
+    if max(1, int(max_entries)) != cache.max_entries:
+        logger(
+            f"Embedding cache {key} is already open with max_entries={cache.max_entries}; "
+            f"ignoring max_entries={int(max_entries)}.",
+            "WARN",
+            "INTERNAL",
+        )
+    return cache
+
+
+class QueryEmbeddingLRU:
+    """
+    Thread-safe in-memory (model, sha256(text)) -> vector LRU with a TTL.
+
+    Vectors are kept as read-only float32 arrays and returned without a copy.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = DEFAULT_QUERY_LRU_ENTRIES,
+        ttl_s: float = DEFAULT_QUERY_LRU_TTL_S,
+    ) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_s = float(ttl_s)
+        self._entries: "OrderedDict[tuple[str, str], tuple[float, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Return each cached read-only float32 vector (None for misses or expired entries).
+        """
+        now = time.monotonic()
+        result: List[Optional[np.ndarray]] = []
+        with self._lock:
+            for text in texts:
+                key = (model, text_sha256(text))
+                entry = self._entries.get(key)
+                if entry is None or entry[0] < now:
+                    if entry is not None:
+                        del self._entries[key]
+                    self.misses += 1
+                    result.append(None)
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                result.append(entry[1])
+        return result
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """
+        Insert vectors aligned with texts; the least recently used entries go first.
+        """
+        expires_at = time.monotonic() + self.ttl_s
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = (model, text_sha256(text))
+                arr = np.array(vector, dtype=np.float32)
+                arr.flags.writeable = False
+                self._entries[key] = (expires_at, arr)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_query_lru_lock = threading.Lock()
+_query_lru: Optional[QueryEmbeddingLRU] = None
+
+
+def get_query_embedding_lru() -> QueryEmbeddingLRU:
+    """
+    Return the process-wide QueryEmbeddingLRU shared by all retrieval callers.
+    """
+    global _query_lru
+    with _query_lru_lock:
+        if _query_lru is None:
+            _query_lru = QueryEmbeddingLRU()
+        return _query_lru
@@ -21,25 +21,33 @@ What this module provides:
     4) publish_atomic(manifest_dict, manifest_path) -> None
        - Writes the ENTIRE manifest JSON atomically: *.tmp then os.replace.
 
+    5) scan_records(doc_root, abs_paths, manifest_prev, ...) -> (records, hashed)
+       - Builds 'records_now' for a list of files. With trust_stat=True, a
+         file whose path, size and mtime_ns match the previous manifest keeps
+         its stored sha256 without being read; only the rest is hashed, in
+         parallel on a thread pool. full_verify=True rehashes everything.
+
 Data shapes:
     Record (one per file; used both during scan and inside the manifest):
         {
           "path":   str,    # RELATIVE path from doc root, e.g. "project1/file.md"
           "sha256": str,    # content hash (hex)
           "mtime":  float,  # UNIX mtime
-          "size":   int     # bytes
+          "size":   int,    # bytes
+          "mtime_ns": int   # exact UNIX mtime in ns (used by the stat fast path)
         }
 
     Manifest JSON written to disk:
         {
           "version": "1",
           "generated_at": "YYYY-MM-DDTHH:MM:SSZ",
-          "files": [Record, Record, ...]
+          "files": [Record, Record, ...],
+          "runs_since_full_verify": int   # optional; see needs_full_verify()
         }
 
 Notes:
-    - This module does NOT scan directories. IngestionManager (or caller) is
-      responsible for building 'records_now' from the doc root using compute_sha256.
+    - This module does NOT walk directories. IngestionManager (or caller) is
+      responsible for listing the files; scan_records turns them into 'records_now'.
     - 'diff' expects 'records_now' as a list[Record] and the previous manifest dict.
     - 'tombstones' are files that were present in the previous manifest but are
       missing on disk now (useful for deleting stale vectors).
@@ -50,23 +58,32 @@ from __future__ import annotations
 import hashlib
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, TypedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TypedDict
 
 
 # ---------------------------------------------------------------------------
 # Typed structures for clarity (no runtime dependency; just type hints)
 # ---------------------------------------------------------------------------
 
-class Record(TypedDict):
-    """A single file's state at scan time (also stored in the manifest)."""
+class _RecordRequired(TypedDict):
     path: str     # relative path from doc root, POSIX style (e.g., "project1/file.md")
     sha256: str   # hex SHA-256 of the file contents
     mtime: float  # last modified time (float UNIX timestamp)
     size: int     # file size in bytes
 
 
+class Record(_RecordRequired, total=False):
+    """A single file's state at scan time (also stored in the manifest)."""
+    mtime_ns: int  # exact mtime in nanoseconds; missing in manifests written before it existed
+
+
+# Default thread count for hashing files that cannot use the stat fast path.
+DEFAULT_HASH_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
@@ -197,6 +214,100 @@ def diff(
     return to_process, unchanged, tombstones
 
 
+def scan_records(
+    doc_root: str | Path,
+    abs_paths: Sequence[str],
+    manifest_prev: Dict[str, Any],
+    *,
+    trust_stat: bool = True,
+    full_verify: bool = False,
+    max_workers: int = DEFAULT_HASH_WORKERS,
+    stat_by_path: Optional[Dict[str, os.stat_result]] = None,
+) -> Tuple[List[Record], int]:
+    """
+    Build current Records for the given files.
+
+    Stat fast path (trust_stat=True and full_verify=False):
+        If the previous manifest has a record with the same path, size and
+        mtime_ns, its sha256 is reused and the file is not read at all.
+
+    Every other file is hashed; hashing runs on a thread pool because it is
+    I/O bound and hashlib releases the GIL on large buffers.
+
+    Args:
+        doc_root: root that relative record paths are computed against.
+        abs_paths: absolute file paths of the current scan.
+        manifest_prev: manifest dict as returned by load_manifest().
+        trust_stat: enable the stat fast path.
+        full_verify: rehash every file regardless of trust_stat.
+        max_workers: thread count for hashing.
+        stat_by_path: optional os.stat results already collected by the caller.
+
+    Returns:
+        (records, hashed_count): records in abs_paths order, and how many files
+        were actually hashed in this scan.
+    """
+    root = Path(doc_root)
+    prev_files = manifest_prev.get("files", []) if isinstance(manifest_prev, dict) else []
+    prev_by_path: Dict[str, Dict[str, Any]] = {rec["path"]: rec for rec in prev_files}
+
+    records: List[Record] = []
+    to_hash: List[int] = []
+
+    for abs_path in abs_paths:
+        st = (stat_by_path or {}).get(abs_path) or os.stat(abs_path)
+        rel_path = Path(abs_path).relative_to(root).as_posix()
+        rec: Record = {
+            "path": rel_path,
+            "sha256": "",
+            "mtime": float(st.st_mtime),
+            "size": int(st.st_size),
+            "mtime_ns": int(st.st_mtime_ns),
+        }
+
+        prev = prev_by_path.get(rel_path)
+        if (
+            trust_stat
+            and not full_verify
+            and prev is not None
+            and prev.get("sha256")
+            and int(prev.get("size", -1)) == rec["size"]
+            and int(prev.get("mtime_ns", -1)) == rec["mtime_ns"]
+        ):
+            rec["sha256"] = str(prev["sha256"])
+        else:
+            to_hash.append(len(records))
+
+        records.append(rec)
+
+    if to_hash:
+        paths = [abs_paths[i] for i in to_hash]
+        workers = max(1, min(int(max_workers), len(paths)))
+        if workers == 1:
+            digests = [compute_sha256(p) for p in paths]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                digests = list(pool.map(compute_sha256, paths))
+        for i, digest in zip(to_hash, digests):
+            records[i]["sha256"] = digest
+
+    return records, len(to_hash)
+
+
+def needs_full_verify(manifest_prev: Dict[str, Any], every_n_runs: int) -> bool:
+    """
+    Return True when this run should rehash every file.
+
+    every_n_runs <= 0 disables periodic verification. Otherwise a full verify
+    happens once 'runs_since_full_verify' in the previous manifest reaches
+    every_n_runs - 1 (i.e. every N-th run rehashes everything).
+    """
+    if every_n_runs <= 0:
+        return False
+    runs_since = int(manifest_prev.get("runs_since_full_verify", 0) or 0) if isinstance(manifest_prev, dict) else 0
+    return runs_since + 1 >= every_n_runs
+
+
 def publish_atomic(manifest_dict: Dict[str, Any], manifest_path: str) -> None:
     """
     Atomically write the ENTIRE manifest JSON to disk.
@@ -5,6 +5,7 @@ ingestion_manager.py
 Purpose:
     Orchestrate deterministic document ingestion for RAGstream:
       scan → diff vs. manifest → chunk → embed → store → publish manifest
+      → bump store generation (invalidates resident retrieval caches)
 
 Scope:
     • This module focuses on the "documents" ingestion path only
@@ -13,21 +14,37 @@ Scope:
     • Also supports an optional parallel SPLADE sparse-ingestion branch.
 
 Notes:
-    • We compute file hashes from bytes on disk (compute_sha256), NOT from text.
+    • We compute file hashes from bytes on disk (compute_sha256), NOT from text,
+      and skip rehashing files whose size + mtime_ns match the manifest.
     • Chunk IDs are stable: f"{rel_path}::{sha256}::{idx}" (matches your store helpers).
+    • The dense store also keeps each chunk text as its Chroma document, so
+      retrieval hydrates chunks by id without re-reading and re-chunking files.
+    • Every chunk also stores chunk_sha256 (hash of its text) and its character
+      span. When a file changes, vectors of chunks whose text did not change are
+      copied from the old version instead of being re-embedded; with
+      chunking_mode="cdc" most chunks of an edited file keep their text.
     • We only publish a new manifest after all target files in this run succeed.
+    • By default the per-file stages (prepare / dense / sparse) run as a
+      pipeline on separate threads connected by bounded queues.
+    • Without the pipeline, the dense (network-bound) and sparse (CPU-bound)
+      branches of each file still run concurrently; files are processed one
+      after another.
 """
 
 from __future__ import annotations
 
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterable, Iterator, List
 
 # Local imports: existing dense components
 from .loader import DocumentLoader
-from .chunker import Chunker
+from .chunker import CHUNK_MODE_FIXED, Chunker
 from .embedder import Embedder
+from .embedding_cache import text_sha256
 from .vector_store_chroma import VectorStoreChroma
 
 # Added on 13.04.2026:
@@ -37,13 +54,20 @@ from .vector_store_splade import VectorStoreSplade
 
 # Manifest utilities
 from .file_manifest import (
-    compute_sha256,
     load_manifest,
     diff as manifest_diff,
+    needs_full_verify,
     publish_atomic,
+    scan_records,
     Record,
 )
 
+# Optional IVF index for the dense ANN retrieval mode.
+from .ann_index import build_ivf_index_for_store, ivf_index_path
+
+# Retrieval-side caches reload a store once its generation changes.
+from .store_generation import bump_generation
+
 
 @dataclass(frozen=True)
 class IngestionStats:
@@ -66,6 +90,44 @@ class IngestionStats:
     dense_embedded_bytes: int
     sparse_embedded_bytes: int
 
+    # Files actually hashed in this run (the rest used the stat fast path).
+    files_hashed: int = 0
+
+    # Vectors copied from the previous file version (same chunk text) instead of re-embedded.
+    dense_vectors_reused: int = 0
+    sparse_vectors_reused: int = 0
+
+
+# Bounded queue size between pipeline stages (files in flight per stage).
+DEFAULT_PIPELINE_QUEUE_DEPTH = 4
+
+# Poll interval for pipeline threads so a failure stops every stage quickly.
+_PIPELINE_POLL_S = 0.1
+
+# Marker that closes a stage queue.
+_END_OF_STREAM = object()
+
+
+@dataclass(frozen=True)
+class _PreparedFile:
+    """One changed file after the prepare stage (read + chunk)."""
+    rel_path: str
+    sha_new: str
+    sha_old: str | None
+    ids: List[str]
+    metas: List[Dict[str, Any]]
+    chunk_texts: List[str]
+    chunk_hashes: List[str]
+
+
+@dataclass
+class _BranchCounters:
+    """Mutable per-branch counters; each branch is written by one thread only."""
+    upserts: int = 0
+    embedded_bytes: int = 0
+    deleted: int = 0
+    reused: int = 0
+
 
 class IngestionManager:
     """
@@ -83,7 +145,7 @@ class IngestionManager:
         if not self.doc_root.is_dir():
             raise NotADirectoryError(f"doc_root is not a directory: {self.doc_root}")
 
-        # A loader is tied to a root; it returns absolute file paths + text for a subfolder
+        # A loader is tied to a root; it lists files (+ stat) and reads text on demand
         self.loader = DocumentLoader(root=self.doc_root)
 
     def run(
@@ -98,14 +160,41 @@ class IngestionManager:
         sparse_embedder: SpladeEmbedder | None = None,
         chunk_size: int = 1200,
         overlap: int = 120,
+        chunking_mode: str = CHUNK_MODE_FIXED,
         delete_old_versions: bool = True,
         delete_tombstones: bool = False,
+        build_ann_index: bool = False,
+        pipelined: bool = True,
+        pipeline_queue_depth: int = DEFAULT_PIPELINE_QUEUE_DEPTH,
+        trust_stat: bool = True,
+        full_verify_every: int = 0,
     ) -> IngestionStats:
         """
         Execute a full ingestion cycle for one subfolder under doc_root.
 
         Dense branch is always active.
         Sparse SPLADE branch is active only if both sparse_store and sparse_embedder are provided.
+        With build_ann_index=True the dense IVF index next to the Chroma DB is
+        rebuilt whenever this run changed the dense store (or it is missing).
+
+        With pipelined=True (default) the per-file stages overlap:
+            prepare (read + chunk) ─┬─► dense  (delete old → embed → upsert)
+                                    └─► sparse (delete old → embed → upsert)
+        Each stage runs on its own worker thread, connected by bounded queues,
+        so wall-clock time approaches the slowest stage instead of the sum.
+        Any stage failure stops the pipeline and re-raises before the manifest
+        is published (same all-or-nothing semantics as the sequential path).
+
+        With pipelined=False files are processed one at a time, but the dense
+        and sparse branches of each file still run concurrently, so the
+        embeddings API latency hides behind the SPLADE compute.
+
+        With trust_stat=True (default) unchanged files are recognized by size +
+        mtime_ns and not rehashed. full_verify_every=N > 0 rehashes every file
+        on every N-th run.
+
+        chunking_mode selects the Chunker mode ("fixed" or "cdc"). Switching
+        modes only affects files ingested afterwards.
 
         Returns:
             IngestionStats with useful counters.
@@ -118,26 +207,26 @@ class IngestionManager:
                 "Sparse ingestion requires both sparse_store and sparse_embedder."
             )
 
-        # 1) Load documents (absolute path + raw text) from the subfolder.
-        docs = self.loader.load_documents(subfolder)
-        text_by_abs: Dict[str, str] = {abs_path: text for abs_path, text in docs}
-
-        # 2) Build current Records by hashing files on disk (bytes).
-        records_now: List[Record] = []
-        for abs_path, _text in docs:
-            ap = Path(abs_path)
-            rel_path = ap.relative_to(self.doc_root).as_posix()
-            sha = compute_sha256(abs_path)
-            st = ap.stat()
-            records_now.append({
-                "path": rel_path,
-                "sha256": sha,
-                "mtime": float(st.st_mtime),
-                "size": int(st.st_size),
-            })
-
-        # 3) Load the previous manifest and compute the diff.
+        # 1) List files (absolute path + stat) from the subfolder. No text is read here;
+        #    binary files are skipped by the loader.
+        files = list(self.loader.iter_files(subfolder))
+
+        # 2) Load the previous manifest, then build current Records.
+        #    Stat fast path: files whose size + mtime_ns match the manifest keep
+        #    their stored sha256; only the rest is hashed (in parallel).
         manifest_prev = load_manifest(manifest_path)
+        full_verify = needs_full_verify(manifest_prev, full_verify_every)
+        records_now, files_hashed = scan_records(
+            self.doc_root,
+            [abs_path for abs_path, _st in files],
+            manifest_prev,
+            trust_stat=trust_stat,
+            full_verify=full_verify,
+            stat_by_path=dict(files),
+        )
+        del files
+
+        # 3) Compute the diff against the previous manifest.
         to_process, unchanged, tombstones = manifest_diff(records_now, manifest_prev)
 
         prev_by_path: Dict[str, Record] = {
@@ -145,67 +234,52 @@ class IngestionManager:
         }
 
         # 4) Process changed/new files (shared chunking pass → dense and optional sparse upsert).
-        total_chunks = 0
-        total_deleted_old = 0
-
-        dense_upserts = 0
-        sparse_upserts = 0
-
-        dense_embedded_bytes = 0
-        sparse_embedded_bytes = 0
-
-        for rec in to_process:
-            rel_path = rec["path"]
-            sha_new = rec["sha256"]
-
-            abs_path = (self.doc_root / rel_path).as_posix()
-            text = text_by_abs.get(abs_path)
-            if text is None:
-                text = Path(abs_path).read_text(encoding="utf-8", errors="ignore")
+        #    Each file passes through: prepare (read + chunk) → dense branch → sparse branch.
+        prepared_files = self._iter_prepared_files(
+            to_process,
+            store=store,
+            chunker=chunker,
+            prev_by_path=prev_by_path,
+            chunk_size=chunk_size,
+            overlap=overlap,
+            chunking_mode=chunking_mode,
+            delete_old_versions=delete_old_versions,
+        )
 
-            chunks = chunker.split(abs_path, text, chunk_size=chunk_size, overlap=overlap)
-            chunk_texts: List[str] = []
-            ids: List[str] = []
-            metas: List[Dict[str, Any]] = []
+        dense = _BranchCounters()
+        sparse = _BranchCounters()
 
-            for idx, (_fp, chunk_txt) in enumerate(chunks):
-                if not chunk_txt.strip():
-                    continue
-                chunk_texts.append(chunk_txt)
-                ids.append(store.make_chunk_id(rel_path, sha_new, idx))
-                metas.append({
-                    "path": rel_path,
-                    "sha256": sha_new,
-                    "chunk_idx": idx,
-                    "mtime": rec["mtime"],
-                })
+        def dense_stage(prepared: _PreparedFile) -> None:
+            self._run_branch(prepared, store, embedder, dense, store_documents=True)
 
-            if not chunk_texts:
-                continue
+        def sparse_stage(prepared: _PreparedFile) -> None:
+            # Array rows go straight into the CSR store (no per-term dicts).
+            self._run_branch(
+                prepared,
+                sparse_store,
+                sparse_embedder,
+                sparse,
+                embed_fn=getattr(sparse_embedder, "embed_arrays", None),
+            )
 
-            if delete_old_versions and rel_path in prev_by_path:
-                sha_old = prev_by_path[rel_path]["sha256"]
-                if sha_old != sha_new:
-                    total_deleted_old += self._delete_file_version(store, rel_path, sha_old)
-                    if use_sparse and sparse_store is not None:
-                        total_deleted_old += self._delete_file_version(sparse_store, rel_path, sha_old)
+        stages: List[Callable[[_PreparedFile], None]] = [dense_stage]
+        if use_sparse:
+            stages.append(sparse_stage)
 
-            file_embedded_bytes = sum(len(s.encode("utf-8")) for s in chunk_texts)
+        if pipelined:
+            self._run_pipeline(prepared_files, stages, queue_depth=pipeline_queue_depth)
+        else:
+            self._run_file_by_file(prepared_files, stages)
 
-            # Dense branch
-            dense_vecs = embedder.embed(chunk_texts)
-            store.add(ids=ids, vectors=dense_vecs, metadatas=metas)
-            dense_upserts += len(ids)
-            dense_embedded_bytes += file_embedded_bytes
+        # Every prepared file passes the dense branch, so its upserts are the chunk count.
+        total_chunks = dense.upserts
+        total_deleted_old = dense.deleted + sparse.deleted
 
-            # Optional sparse branch
-            if use_sparse and sparse_store is not None and sparse_embedder is not None:
-                sparse_vecs = sparse_embedder.embed(chunk_texts)
-                sparse_store.add(ids=ids, vectors=sparse_vecs, metadatas=metas)
-                sparse_upserts += len(ids)
-                sparse_embedded_bytes += file_embedded_bytes
+        dense_upserts = dense.upserts
+        sparse_upserts = sparse.upserts
 
-            total_chunks += len(chunk_texts)
+        dense_embedded_bytes = dense.embedded_bytes
+        sparse_embedded_bytes = sparse.embedded_bytes
 
         # 5) Optionally delete tombstones (files that disappeared from disk).
         total_deleted_tombs = 0
@@ -218,14 +292,32 @@ class IngestionManager:
                 if use_sparse and sparse_store is not None:
                     total_deleted_tombs += self._delete_file_version(sparse_store, rel_path, sha_prev)
 
-        # 6) Publish a fresh manifest that reflects the CURRENT disk state.
+        # Fold the sparse write-ahead log, so readers open one compact generation.
+        if use_sparse and sparse_store is not None and hasattr(sparse_store, "compact"):
+            sparse_store.compact()
+
+        # 6) Optionally rebuild the dense ANN index before the manifest is published,
+        #    so a published manifest never points at a stale index.
+        if build_ann_index:
+            dense_changed = total_chunks > 0 or total_deleted_old > 0 or total_deleted_tombs > 0
+            if dense_changed or not ivf_index_path(store.persist_path).exists():
+                build_ivf_index_for_store(store)
+
+        # 7) Publish a fresh manifest that reflects the CURRENT disk state.
+        runs_since_verify = 0 if full_verify else int(manifest_prev.get("runs_since_full_verify", 0) or 0) + 1
         manifest_new = {
             "version": "1",
             "generated_at": "",
             "files": records_now,
+            "runs_since_full_verify": runs_since_verify,
         }
         publish_atomic(manifest_new, manifest_path)
 
+        # 8) Tell resident retrieval caches that the stores changed.
+        bump_generation(store.persist_path)
+        if use_sparse and sparse_store is not None:
+            bump_generation(sparse_store.persist_path)
+
         return IngestionStats(
             files_scanned=len(records_now),
             to_process=len(to_process),
@@ -241,8 +333,228 @@ class IngestionManager:
             sparse_vectors_upserted=sparse_upserts,
             dense_embedded_bytes=dense_embedded_bytes,
             sparse_embedded_bytes=sparse_embedded_bytes,
+            files_hashed=files_hashed,
+            dense_vectors_reused=dense.reused,
+            sparse_vectors_reused=sparse.reused,
         )
 
+    def _iter_prepared_files(
+        self,
+        to_process: List[Record],
+        *,
+        store: VectorStoreChroma,
+        chunker: Chunker,
+        prev_by_path: Dict[str, Record],
+        chunk_size: int,
+        overlap: int,
+        chunking_mode: str,
+        delete_old_versions: bool,
+    ) -> Iterator[_PreparedFile]:
+        """
+        Prepare stage: read + chunk each file and build ids/metadatas.
+
+        Text is read lazily here, one file at a time, and only for files the
+        manifest diff marked as to_process.
+
+        Files without any non-empty chunk are skipped (as before).
+        """
+        for rec in to_process:
+            rel_path = rec["path"]
+            sha_new = rec["sha256"]
+
+            abs_path = (self.doc_root / rel_path).as_posix()
+            text = self.loader.read_text(abs_path)
+
+            spans = chunker.split_spans(
+                text, chunk_size=chunk_size, overlap=overlap, mode=chunking_mode
+            )
+            chunk_texts: List[str] = []
+            chunk_hashes: List[str] = []
+            ids: List[str] = []
+            metas: List[Dict[str, Any]] = []
+
+            for idx, (span_start, span_end, chunk_txt) in enumerate(spans):
+                chunk_sha = text_sha256(chunk_txt)
+                chunk_texts.append(chunk_txt)
+                chunk_hashes.append(chunk_sha)
+                ids.append(store.make_chunk_id(rel_path, sha_new, idx))
+                metas.append({
+                    "path": rel_path,
+                    "sha256": sha_new,
+                    "chunk_idx": idx,
+                    "mtime": rec["mtime"],
+                    "chunk_sha256": chunk_sha,
+                    "span_start": span_start,
+                    "span_end": span_end,
+                    "chunker": chunking_mode,
+                })
+
+            if not chunk_texts:
+                continue
+
+            sha_old: str | None = None
+            if delete_old_versions and rel_path in prev_by_path:
+                if prev_by_path[rel_path]["sha256"] != sha_new:
+                    sha_old = prev_by_path[rel_path]["sha256"]
+
+            yield _PreparedFile(
+                rel_path=rel_path,
+                sha_new=sha_new,
+                sha_old=sha_old,
+                ids=ids,
+                metas=metas,
+                chunk_texts=chunk_texts,
+                chunk_hashes=chunk_hashes,
+            )
+
+    def _run_branch(
+        self,
+        prepared: _PreparedFile,
+        branch_store: Any,
+        branch_embedder: Any,
+        counters: _BranchCounters,
+        *,
+        store_documents: bool = False,
+        embed_fn: Callable[[List[str]], List[Any]] | None = None,
+    ) -> None:
+        """
+        One branch (dense or sparse) for one file: delete old version → embed → upsert.
+
+        With store_documents=True the chunk texts are upserted as documents too.
+        embed_fn overrides branch_embedder.embed (e.g. SpladeEmbedder.embed_arrays).
+
+        Before the old version is deleted, its vectors are looked up by
+        chunk_sha256 (if the store supports it); only chunks with new text
+        are sent to the embedder.
+        """
+        reusable: Dict[str, Any] = {}
+        if prepared.sha_old is not None:
+            if hasattr(branch_store, "vectors_by_chunk_hash"):
+                reusable = branch_store.vectors_by_chunk_hash(prepared.rel_path, prepared.sha_old)
+            counters.deleted += self._delete_file_version(
+                branch_store, prepared.rel_path, prepared.sha_old
+            )
+
+        vectors: List[Any] = [reusable.get(h) for h in prepared.chunk_hashes]
+        missing = [i for i, vec in enumerate(vectors) if vec is None]
+        if missing:
+            embed = embed_fn if embed_fn is not None else branch_embedder.embed
+            fresh = embed([prepared.chunk_texts[i] for i in missing])
+            for i, vec in zip(missing, fresh):
+                vectors[i] = vec
+
+        if store_documents:
+            branch_store.add(
+                ids=prepared.ids,
+                vectors=vectors,
+                metadatas=prepared.metas,
+                documents=prepared.chunk_texts,
+            )
+        else:
+            branch_store.add(ids=prepared.ids, vectors=vectors, metadatas=prepared.metas)
+        counters.upserts += len(prepared.ids)
+        counters.reused += len(prepared.ids) - len(missing)
+        counters.embedded_bytes += sum(
+            len(prepared.chunk_texts[i].encode("utf-8")) for i in missing
+        )
+
+    @staticmethod
+    def _run_file_by_file(
+        items: Iterable[_PreparedFile],
+        stages: List[Callable[[_PreparedFile], None]],
+    ) -> None:
+        """
+        Process one file at a time; its stages (dense / sparse) run concurrently.
+
+        Both branches of a file always finish before the next file starts. The
+        first stage error (in stage order) is re-raised after the file's other
+        stages have finished, so no branch is left half-written in the background.
+        """
+        if len(stages) <= 1:
+            for prepared in items:
+                for stage in stages:
+                    stage(prepared)
+            return
+
+        with ThreadPoolExecutor(max_workers=len(stages), thread_name_prefix="ingest-branch") as pool:
+            for prepared in items:
+                futures = [pool.submit(stage, prepared) for stage in stages]
+                errors = [future.exception() for future in futures]
+                for error in errors:
+                    if error is not None:
+                        raise error
+
+    @staticmethod
+    def _run_pipeline(
+        items: Iterable[_PreparedFile],
+        stages: List[Callable[[_PreparedFile], None]],
+        *,
+        queue_depth: int,
+    ) -> None:
+        """
+        Run the producer (items) and every stage on separate threads.
+
+        - Each stage has its own bounded queue and sees every item in order.
+        - The first error in any thread stops all others and is re-raised here.
+        """
+        stop = threading.Event()
+        errors: List[BaseException] = []
+        queues: List[queue.Queue] = [
+            queue.Queue(maxsize=max(1, int(queue_depth))) for _ in stages
+        ]
+
+        def put(q: queue.Queue, item: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=_PIPELINE_POLL_S)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def fail(exc: BaseException) -> None:
+            errors.append(exc)
+            stop.set()
+
+        def produce() -> None:
+            try:
+                for item in items:
+                    for q in queues:
+                        if not put(q, item):
+                            return
+            except BaseException as exc:  # re-raised in the calling thread
+                fail(exc)
+            finally:
+                for q in queues:
+                    put(q, _END_OF_STREAM)
+
+        def consume(q: queue.Queue, stage: Callable[[_PreparedFile], None]) -> None:
+            try:
+                while not stop.is_set():
+                    try:
+                        item = q.get(timeout=_PIPELINE_POLL_S)
+                    except queue.Empty:
+                        continue
+                    if item is _END_OF_STREAM:
+                        return
+                    stage(item)
+            except BaseException as exc:  # re-raised in the calling thread
+                fail(exc)
+
+        threads = [threading.Thread(target=produce, name="ingest-prepare", daemon=True)]
+        threads.extend(
+            threading.Thread(target=consume, args=(q, stage), name=f"ingest-stage-{i}", daemon=True)
+            for i, (q, stage) in enumerate(zip(queues, stages))
+        )
+
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        if errors:
+            raise errors[0]
+
     @staticmethod
     def _delete_file_version(store: Any, rel_path: str, sha256: str) -> int:
         """
@@ -273,7 +585,10 @@ class IngestionManager:
             ids = res.get("ids", []) if res else []
             return len(ids)
 
-        # Local sparse SPLADE store
+        # Local sparse SPLADE store (answered from its (path, sha256) index)
+        if hasattr(store, "count_where"):
+            return int(store.count_where({"path": rel_path, "sha256": sha256}))
+
         meta_store = getattr(store, "_meta_store", None)
         if isinstance(meta_store, dict):
             return sum(
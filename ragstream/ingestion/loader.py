@@ -2,13 +2,28 @@
 DocumentLoader
 ==============
 Responsible for discovering and loading raw files from *data/doc_raw* and its subfolders.
+
+Discovery and reading are separate steps:
+- iter_files(...) yields (absolute_path, os.stat_result) lazily, without reading text.
+- read_text(...) reads one file only when the caller actually needs its content.
+Binary files are detected cheaply (NUL byte in the first few KB) and skipped.
 """
 
+import os
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
+
+# Suffixes that are always treated as text, so no content sniffing is needed.
+TEXT_SUFFIXES = frozenset({
+    ".txt", ".md", ".rst", ".csv", ".json", ".yaml", ".yml", ".toml", ".ini",
+    ".py", ".js", ".ts", ".html", ".css", ".xml", ".sql", ".sh", ".tex",
+})
+
+# Bytes inspected when deciding whether an unknown file is binary.
+BINARY_SNIFF_BYTES = 8192
 
 class DocumentLoader:
-    """Scans the raw-document directory and yields (file_path, file_text) tuples."""
+    """Scans the raw-document directory and yields files lazily."""
 
     def __init__(self, root: Path) -> None:
         """
@@ -16,27 +31,60 @@ class DocumentLoader:
         """
         self.root = root
 
-    def load_documents(self, subfolder: str) -> List[Tuple[str, str]]:
+    def iter_files(self, subfolder: str) -> Iterator[Tuple[str, os.stat_result]]:
         """
-        Load all files from the given subfolder inside data/doc_raw.
-        Reads any file extension as plain text.
+        Yield every text file of the subfolder with its stat info, in sorted path order.
+        No file content is read except a small sniff for unknown suffixes.
 
         :param subfolder: Name of the subfolder (e.g., 'project1').
-        :return: List of tuples (absolute_file_path_str, file_text).
+        :return: Iterator of (absolute_file_path_str, os.stat_result).
         """
         folder_path = self.root / subfolder
         if not folder_path.exists():
             raise FileNotFoundError(f"Input folder does not exist: {folder_path}")
 
-        docs: List[Tuple[str, str]] = []
+        for file_path in sorted(folder_path.rglob("*")):
+            if not file_path.is_file():
+                continue
+            if self.is_binary(file_path):
+                continue
+            yield str(file_path.resolve()), file_path.stat()
+
+    @staticmethod
+    def is_binary(file_path: Path) -> bool:
+        """
+        Cheap binary check: known text suffixes are trusted, anything else is
+        binary if its first BINARY_SNIFF_BYTES contain a NUL byte.
+        """
+        if file_path.suffix.lower() in TEXT_SUFFIXES:
+            return False
+        try:
+            with file_path.open("rb") as f:
+                return b"\x00" in f.read(BINARY_SNIFF_BYTES)
+        except OSError:
+            return True
+
+    @staticmethod
+    def read_text(file_path: str) -> str:
+        """
+        Read one file as text (UTF-8, falling back to latin-1).
+        """
+        path = Path(file_path)
+        try:
+            return path.read_text(encoding="utf-8")
+        except UnicodeDecodeError:
+            # Fallback: try latin-1 to avoid crash on non-UTF8 files
+            return path.read_text(encoding="latin-1")
 
-        for file_path in folder_path.rglob("*"):
-            if file_path.is_file():
-                try:
-                    text = file_path.read_text(encoding="utf-8")
-                except UnicodeDecodeError:
-                    # Fallback: try latin-1 to avoid crash on non-UTF8 files
-                    text = file_path.read_text(encoding="latin-1")
-                docs.append((str(file_path.resolve()), text))
+    def load_documents(self, subfolder: str) -> List[Tuple[str, str]]:
+        """
+        Load all text files from the given subfolder inside data/doc_raw.
+        Eager convenience wrapper around iter_files + read_text.
 
-        return docs
+        :param subfolder: Name of the subfolder (e.g., 'project1').
+        :return: List of tuples (absolute_file_path_str, file_text).
+        """
+        return [
+            (abs_path, self.read_text(abs_path))
+            for abs_path, _stat in self.iter_files(subfolder)
+        ]
@@ -0,0 +1,438 @@
+# -*- coding: utf-8 -*-
+"""
+splade_backend.py
+
+Purpose:
+    Choose and build the SPLADE inference backend (torch / ONNX / int8 ONNX /
+    OpenVINO) from the "splade" section of runtime_config.json.
+
+Role in architecture:
+    - Retriever and AppController create their SpladeEmbedder through
+      create_splade_embedder(...) instead of hard-coding the torch backend.
+    - The ingestion process pool receives the same resolved choice, so
+      documents and queries are encoded by the same backend.
+
+Backends ("splade.backend"):
+    - "torch"      : default, unchanged behavior
+    - "onnx"       : Sentence Transformers ONNX export (fp32)
+    - "onnx-int8"  : dynamically int8-quantized ONNX export, written once to
+                     data/splade_backend/<model>/ and reused afterwards
+    - "openvino"   : Sentence Transformers OpenVINO export
+    - "auto"       : one-shot calibration benchmark on this host
+
+Auto selection:
+    - Every candidate encodes a fixed set of calibration queries; the median
+      latency over a few runs is measured after one warm-up call.
+    - Parity: for every query, the top-k active dimensions (by weight) must
+      overlap the torch reference by at least min_top_k_overlap on average;
+      candidates below the threshold are rejected.
+    - The fastest accepted backend is written to a small JSON file keyed by
+      model, host and candidate list, so later processes skip the benchmark.
+
+Quantized backends:
+    - An explicitly configured quantized backend ("onnx-int8") passes the same
+      parity check against torch before it is used. If it fails, torch is
+      used instead and a warning is logged. The verdict is cached per model,
+      host and backend in a second JSON file.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import statistics
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from ragstream.textforge.RagLog import LogALL as logger
+from ragstream.utils.paths import PATHS
+from .splade_embedder import SparseVector, SpladeEmbedder
+
+
+BACKEND_AUTO = "auto"
+BACKEND_TORCH = "torch"
+BACKEND_ONNX = "onnx"
+BACKEND_ONNX_INT8 = "onnx-int8"
+BACKEND_OPENVINO = "openvino"
+
+SUPPORTED_BACKENDS = (BACKEND_TORCH, BACKEND_ONNX, BACKEND_ONNX_INT8, BACKEND_OPENVINO)
+
+# Backends whose outputs are approximate and must pass the parity check.
+QUANTIZED_BACKENDS = (BACKEND_ONNX_INT8,)
+
+DEFAULT_MODEL = "naver/splade-cocondenser-ensembledistil"
+
+# Exports and the cached benchmark choice live under data/.
+DEFAULT_BACKEND_ROOT = PATHS["data"] / "splade_backend"
+DEFAULT_CHOICE_PATH = DEFAULT_BACKEND_ROOT / "backend_choice.json"
+DEFAULT_PARITY_PATH = DEFAULT_BACKEND_ROOT / "parity_check.json"
+
+# Parity gate against the torch reference.
+DEFAULT_MIN_TOP_K_OVERLAP = 0.9
+DEFAULT_PARITY_TOP_K = 32
+
+# Timed runs per candidate (after one warm-up call).
+DEFAULT_BENCHMARK_RUNS = 3
+
+# Fixed calibration queries: short prompt-like texts of mixed length.
+_CALIBRATION_QUERIES = [
+    "How is the retrieval stage merged with the sparse branch?",
+    "Explain the ingestion manifest and how deleted files are handled.",
+    "Which configuration keys control chunk size, overlap and the hard embedding floor?",
+    "Summarize the design of the memory retriever, including the anchor query, "
+    "the recency weighting and how selected records are written back into the prompt.",
+    "error handling",
+    "Compare dense and sparse retrieval scores for code identifiers such as "
+    "VectorStoreChroma.delete_file_version and RetrieverSplade.run.",
+]
+
+_CHOICE_FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class SpladeBackendChoice:
+    """
+    Resolved SPLADE backend: the SparseEncoder arguments to use.
+    """
+
+    name: str
+    model: str
+    backend: str
+    model_kwargs: Dict[str, Any] = field(default_factory=dict)
+
+
+def create_splade_embedder(splade_config: Dict[str, Any] | None, *, device: str = "cpu") -> SpladeEmbedder:
+    """
+    Build a SpladeEmbedder for the configured (or auto-selected) backend.
+    """
+    choice = resolve_splade_backend(splade_config)
+    return _build_embedder(choice, device=device)
+
+
+def resolve_splade_backend(splade_config: Dict[str, Any] | None) -> SpladeBackendChoice:
+    """
+    Turn the "splade" config section into a concrete backend choice.
+
+    Config keys (all optional):
+        backend            "torch" (default) | "onnx" | "onnx-int8" | "openvino" | "auto"
+        model              SPLADE model name or local path
+        auto_candidates    backends tried by "auto" (default: all supported)
+        min_top_k_overlap  parity threshold for "auto" and quantized backends (default 0.9)
+        parity_top_k       dimensions compared per query (default 32)
+    """
+    config = splade_config if isinstance(splade_config, dict) else {}
+    model = str(config.get("model", DEFAULT_MODEL) or DEFAULT_MODEL)
+    name = str(config.get("backend", BACKEND_TORCH) or BACKEND_TORCH).strip().lower()
+    min_overlap = float(config.get("min_top_k_overlap", DEFAULT_MIN_TOP_K_OVERLAP))
+    parity_top_k = int(config.get("parity_top_k", DEFAULT_PARITY_TOP_K))
+
+    if name == BACKEND_AUTO:
+        candidates = [
+            str(c).strip().lower()
+            for c in (config.get("auto_candidates") or SUPPORTED_BACKENDS)
+        ]
+        return select_fastest_backend(
+            model,
+            candidates=candidates,
+            min_overlap=min_overlap,
+            parity_top_k=parity_top_k,
+        )
+
+    choice = backend_choice(model, name)
+    if name in QUANTIZED_BACKENDS:
+        choice = verify_backend_parity(
+            model,
+            choice,
+            min_overlap=min_overlap,
+            parity_top_k=parity_top_k,
+        )
+    return choice
+
+
+def backend_choice(model: str, name: str) -> SpladeBackendChoice:
+    """
+    SparseEncoder arguments for one named backend (exports int8 ONNX on first use).
+    """
+    if name not in SUPPORTED_BACKENDS:
+        raise ValueError(f"splade_backend: unsupported backend {name!r}")
+
+    if name == BACKEND_ONNX_INT8:
+        return export_quantized_onnx(model)
+
+    return SpladeBackendChoice(name=name, model=model, backend=name)
+
+
+def export_quantized_onnx(
+    model: str,
+    *,
+    export_root: Path = DEFAULT_BACKEND_ROOT,
+    quantization_config: str | None = None,
+) -> SpladeBackendChoice:
+    """
+    Export the model to ONNX, quantize it to int8 (dynamic quantization) and
+    return the choice that loads it. Existing exports are reused.
+    """
+    config_name = quantization_config or _default_quantization_config()
+    export_dir = Path(export_root) / _safe_dir_name(model)
+    file_name = f"onnx/model_qint8_{config_name}.onnx"
+    choice = SpladeBackendChoice(
+        name=BACKEND_ONNX_INT8,
+        model=str(export_dir),
+        backend=BACKEND_ONNX,
+        model_kwargs={"file_name": file_name},
+    )
+
+    if (export_dir / file_name).exists():
+        return choice
+
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    onnx_embedder = SpladeEmbedder(model, device="cpu", backend=BACKEND_ONNX)
+    export_dir.mkdir(parents=True, exist_ok=True)
+    onnx_embedder.encoder.save(str(export_dir))
+    export_dynamic_quantized_onnx_model(
+        onnx_embedder.encoder,
+        quantization_config=config_name,
+        model_name_or_path=str(export_dir),
+    )
+
+    if not (export_dir / file_name).exists():
+        raise RuntimeError(f"export_quantized_onnx: expected export not found: {export_dir / file_name}")
+    return choice
+
+
+def select_fastest_backend(
+    model: str,
+    *,
+    candidates: Sequence[str] = SUPPORTED_BACKENDS,
+    min_overlap: float = DEFAULT_MIN_TOP_K_OVERLAP,
+    parity_top_k: int = DEFAULT_PARITY_TOP_K,
+    choice_path: Path = DEFAULT_CHOICE_PATH,
+    runs: int = DEFAULT_BENCHMARK_RUNS,
+) -> SpladeBackendChoice:
+    """
+    Benchmark the candidate backends once per host and cache the winner.
+
+    Torch is always measured: it is the parity reference and the fallback.
+    Backends that fail to load (missing optional packages) are skipped.
+    """
+    key = {
+        "model": model,
+        "host": _host_fingerprint(),
+        "candidates": sorted(set(candidates) | {BACKEND_TORCH}),
+        "min_top_k_overlap": float(min_overlap),
+        "parity_top_k": int(parity_top_k),
+    }
+
+    cached = _load_choice(Path(choice_path), key)
+    if cached is not None:
+        return cached
+
+    reference_choice = backend_choice(model, BACKEND_TORCH)
+    reference = _build_embedder(reference_choice)
+    reference_vectors = reference.embed_queries(_CALIBRATION_QUERIES)
+
+    results: Dict[str, Dict[str, Any]] = {
+        BACKEND_TORCH: {"latency_ms": _median_latency_ms(reference, runs), "top_k_overlap": 1.0},
+    }
+    best_choice = reference_choice
+
+    for name in key["candidates"]:
+        if name == BACKEND_TORCH:
+            continue
+        try:
+            choice = backend_choice(model, name)
+            embedder = _build_embedder(choice)
+            overlap = mean_top_k_overlap(
+                reference_vectors,
+                embedder.embed_queries(_CALIBRATION_QUERIES),
+                parity_top_k,
+            )
+        except Exception as exc:  # optional runtimes (onnxruntime, openvino) may be missing
+            results[name] = {"error": f"{type(exc).__name__}: {exc}"}
+            continue
+
+        results[name] = {"top_k_overlap": overlap}
+        if overlap < min_overlap:
+            results[name]["rejected"] = "parity"
+            continue
+
+        results[name]["latency_ms"] = _median_latency_ms(embedder, runs)
+        if results[name]["latency_ms"] < results[best_choice.name]["latency_ms"]:
+            best_choice = choice
+
+    _save_choice(Path(choice_path), key, best_choice, results)
+    return best_choice
+
+
+def verify_backend_parity(
+    model: str,
+    choice: SpladeBackendChoice,
+    *,
+    min_overlap: float = DEFAULT_MIN_TOP_K_OVERLAP,
+    parity_top_k: int = DEFAULT_PARITY_TOP_K,
+    parity_path: Path = DEFAULT_PARITY_PATH,
+) -> SpladeBackendChoice:
+    """
+    Return choice if it matches the torch reference on the calibration
+    queries, otherwise the torch choice (with a logged warning).
+
+    The verdict is cached per model, host, backend and threshold, so the
+    check runs once per host, not once per process.
+    """
+    key = {
+        "model": model,
+        "host": _host_fingerprint(),
+        "backend": choice.name,
+        "min_top_k_overlap": float(min_overlap),
+        "parity_top_k": int(parity_top_k),
+    }
+
+    accepted = _load_choice(Path(parity_path), key)
+    if accepted is None:
+        reference_choice = backend_choice(model, BACKEND_TORCH)
+        overlap = mean_top_k_overlap(
+            _build_embedder(reference_choice).embed_queries(_CALIBRATION_QUERIES),
+            _build_embedder(choice).embed_queries(_CALIBRATION_QUERIES),
+            parity_top_k,
+        )
+        results: Dict[str, Dict[str, Any]] = {choice.name: {"top_k_overlap": overlap}}
+
+        accepted = choice
+        if overlap < min_overlap:
+            results[choice.name]["rejected"] = "parity"
+            accepted = reference_choice
+        _save_choice(Path(parity_path), key, accepted, results)
+
+    if accepted.name != choice.name:
+        logger(
+            f"SPLADE backend {choice.name!r} failed the top-{int(parity_top_k)} parity check "
+            f"against torch (min overlap {float(min_overlap):.2f}); using torch instead.",
+            "WARN",
+            "PUBLIC",
+        )
+    return accepted
+
+
+def mean_top_k_overlap(reference: List[SparseVector], other: List[SparseVector], k: int) -> float:
+    """
+    Mean share of each reference vector's top-k dimensions that also appear
+    in the other vector's top-k dimensions.
+    """
+    if len(reference) != len(other):
+        raise ValueError("mean_top_k_overlap: vector lists differ in length")
+    if not reference:
+        return 1.0
+
+    def top_dims(vector: SparseVector) -> set[str]:
+        return {dim for dim, _weight in sorted(vector.items(), key=lambda item: (-item[1], item[0]))[:k]}
+
+    overlaps: List[float] = []
+    for ref_vec, other_vec in zip(reference, other):
+        ref_top = top_dims(ref_vec)
+        if not ref_top:
+            overlaps.append(1.0 if not other_vec else 0.0)
+            continue
+        overlaps.append(len(ref_top & top_dims(other_vec)) / float(len(ref_top)))
+
+    return float(sum(overlaps) / len(overlaps))
+
+
+# ----------------------------------------------------------------------
+# Internals
+# ----------------------------------------------------------------------
+
+def _build_embedder(choice: SpladeBackendChoice, *, device: str = "cpu") -> SpladeEmbedder:
+    return SpladeEmbedder(
+        choice.model,
+        device=device,
+        backend=choice.backend,
+        model_kwargs=dict(choice.model_kwargs) or None,
+    )
+
+
+def _median_latency_ms(embedder: SpladeEmbedder, runs: int) -> float:
+    embedder.embed_queries(_CALIBRATION_QUERIES)  # warm-up (graph init, allocations)
+    timings: List[float] = []
+    for _ in range(max(1, int(runs))):
+        start = time.perf_counter()
+        embedder.embed_queries(_CALIBRATION_QUERIES)
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return float(statistics.median(timings))
+
+
+def _load_choice(choice_path: Path, key: Dict[str, Any]) -> SpladeBackendChoice | None:
+    if not choice_path.exists():
+        return None
+    try:
+        with choice_path.open("r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if payload.get("version") != _CHOICE_FORMAT_VERSION or payload.get("key") != key:
+        return None
+
+    choice = SpladeBackendChoice(**payload["choice"])
+    if choice.name == BACKEND_ONNX_INT8 and not (Path(choice.model) / choice.model_kwargs.get("file_name", "")).exists():
+        return None
+    return choice
+
+
+def _save_choice(
+    choice_path: Path,
+    key: Dict[str, Any],
+    choice: SpladeBackendChoice,
+    results: Dict[str, Dict[str, Any]],
+) -> None:
+    payload = {
+        "version": _CHOICE_FORMAT_VERSION,
+        "key": key,
+        "choice": asdict(choice),
+        "results": results,
+        "created_at": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
+    }
+    choice_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = choice_path.with_suffix(".json.tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    os.replace(str(tmp_path), str(choice_path))
+
+
+def _host_fingerprint() -> Dict[str, Any]:
+    return {
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count() or 1,
+        "python": platform.python_version(),
+    }
+
+
+def _default_quantization_config() -> str:
+    """
+    Pick the ONNX Runtime dynamic-quantization preset for this CPU.
+    """
+    machine = platform.machine().lower()
+    if machine in {"arm64", "aarch64"}:
+        return "arm64"
+
+    flags = ""
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            flags = f.read()
+    except OSError:
+        pass
+
+    if "avx512_vnni" in flags:
+        return "avx512_vnni"
+    if "avx512f" in flags:
+        return "avx512"
+    return "avx2"
+
+
+def _safe_dir_name(model: str) -> str:
+    return "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in model.strip("/\\"))
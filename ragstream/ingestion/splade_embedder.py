@@ -10,6 +10,7 @@ Role in architecture:
         Embedder.embed(texts) -> List[List[float]]
     - Sparse SPLADE side:
         SpladeEmbedder.embed(texts) -> List[Dict[str, float]]
+        SpladeEmbedder.embed_arrays(texts) -> List[(int32 ids, float32 weights)]
 
 Design goals:
     - Keep the public ingestion-facing API parallel to Embedder:
@@ -18,11 +19,23 @@ Design goals:
         embed_queries(...)
         embed_query(...)
     - Persist nothing here; this module is encoder-only.
+
+Throughput notes:
+    - Documents are sorted by length and encoded in buckets of batch_size
+      similar-length texts, so a short chunk never pads to the longest chunk
+      of the whole call; results are returned in input order.
+    - Each bucket comes back as one [B, vocab] sparse tensor and is split
+      into (indices, values) rows with a single coalesce + bincount, without
+      per-element .item() / .tolist() calls.
+    - embed_arrays(...) returns those rows directly; SpladeVectorStoreBase
+      accepts them as-is, so ingestion never builds string-keyed dicts.
 """
 
 from __future__ import annotations
 
-from typing import Dict, List, Sequence
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
 
 try:
     import torch
@@ -41,6 +54,9 @@ except ImportError as exc:  # pragma: no cover
 
 SparseVector = Dict[str, float]
 
+# One sparse row as parallel arrays: (int32 vocabulary ids, float32 weights).
+SparseRow = Tuple[np.ndarray, np.ndarray]
+
 
 class SpladeEmbedder:
     """
@@ -66,6 +82,7 @@ class SpladeEmbedder:
         batch_size: int = 16,
         max_active_dims: int | None = 256,
         show_progress_bar: bool = False,
+        model_kwargs: Dict[str, Any] | None = None,
     ) -> None:
         """
         Args:
@@ -81,6 +98,9 @@ class SpladeEmbedder:
                 Optional cap on active dimensions to keep sparse output bounded.
             show_progress_bar:
                 Whether Sentence Transformers should show progress bars.
+            model_kwargs:
+                Optional backend loading options, e.g. {"file_name": ...} for a
+                quantized ONNX export (see splade_backend.py).
         """
         self.model = model
         self.device = device
@@ -88,12 +108,14 @@ class SpladeEmbedder:
         self.batch_size = int(batch_size)
         self.max_active_dims = max_active_dims
         self.show_progress_bar = bool(show_progress_bar)
+        self.model_kwargs = dict(model_kwargs or {})
 
         self.encoder = SparseEncoder(
             model,
             device=device,
             backend=backend,
             max_active_dims=max_active_dims,
+            model_kwargs=self.model_kwargs or None,
         )
 
     # ------------------------------------------------------------------
@@ -114,6 +136,13 @@ class SpladeEmbedder:
             List[Dict[str, float]]:
                 One sparse representation per input text.
         """
+        return [self._row_to_dict(row) for row in self._encode_documents(texts)]
+
+    def embed_arrays(self, texts: List[str]) -> List[SparseRow]:
+        """
+        Same as embed(...), but each result is an (int32 ids, float32 weights)
+        pair sorted by id, ready for SpladeVectorStoreBase.add(...).
+        """
         return self._encode_documents(texts)
 
     def embed_queries(self, texts: List[str]) -> List[SparseVector]:
@@ -129,12 +158,12 @@ class SpladeEmbedder:
             texts,
             batch_size=self.batch_size,
             show_progress_bar=self.show_progress_bar,
-            convert_to_tensor=False,
+            convert_to_tensor=True,
             convert_to_sparse_tensor=True,
             save_to_cpu=True,
             max_active_dims=self.max_active_dims,
         )
-        return [self._tensor_to_sparse_dict(t) for t in self._ensure_list(raw)]
+        return [self._row_to_dict(row) for row in self._tensor_to_rows(raw, len(texts))]
 
     def embed_query(self, text: str) -> SparseVector:
         """
@@ -149,20 +178,80 @@ class SpladeEmbedder:
     # Internals
     # ------------------------------------------------------------------
 
-    def _encode_documents(self, texts: Sequence[str]) -> List[SparseVector]:
+    def _encode_documents(self, texts: Sequence[str]) -> List[SparseRow]:
         if not texts:
             return []
 
-        raw = self.encoder.encode_document(
-            list(texts),
-            batch_size=self.batch_size,
-            show_progress_bar=self.show_progress_bar,
-            convert_to_tensor=False,
-            convert_to_sparse_tensor=True,
-            save_to_cpu=True,
-            max_active_dims=self.max_active_dims,
-        )
-        return [self._tensor_to_sparse_dict(t) for t in self._ensure_list(raw)]
+        rows: List[SparseRow | None] = [None] * len(texts)
+        for bucket in self._length_buckets(texts):
+            raw = self.encoder.encode_document(
+                [texts[i] for i in bucket],
+                batch_size=self.batch_size,
+                show_progress_bar=self.show_progress_bar,
+                convert_to_tensor=True,
+                convert_to_sparse_tensor=True,
+                save_to_cpu=True,
+                max_active_dims=self.max_active_dims,
+            )
+            for i, row in zip(bucket, self._tensor_to_rows(raw, len(bucket))):
+                rows[i] = row
+
+        return rows  # type: ignore[return-value]
+
+    def _length_buckets(self, texts: Sequence[str]) -> List[List[int]]:
+        """
+        Input positions grouped into buckets of at most batch_size texts of
+        similar length (longest first; ties keep input order).
+        """
+        order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+        size = max(1, self.batch_size)
+        return [order[start:start + size] for start in range(0, len(order), size)]
+
+    @classmethod
+    def _tensor_to_rows(cls, raw: object, n_rows: int) -> List[SparseRow]:
+        """
+        Split a batched encoder output into one (indices, values) row per text.
+
+        Expected common case:
+            sparse COO tensor, shape [n_rows, vocab_size]
+
+        Fallbacks:
+            dense tensor of the same shape, or a list of per-text tensors
+        """
+        tensors = cls._ensure_list(raw)
+        if len(tensors) == 1 and tensors[0].dim() == 2:
+            batch = tensors[0]
+        elif tensors:
+            batch = torch.stack([t.to_dense() if t.is_sparse else t for t in tensors])
+        else:
+            return []
+
+        if batch.is_sparse:
+            batch = batch.coalesce()
+            coords = batch.indices().cpu().numpy()
+            row_of_nnz = coords[0]
+            dim_ids = coords[1]
+            values = batch.values().detach().cpu().numpy()
+        else:
+            row_idx, col_idx = torch.nonzero(batch, as_tuple=True)
+            values = batch[row_idx, col_idx].detach().cpu().numpy()
+            row_of_nnz = row_idx.cpu().numpy()
+            dim_ids = col_idx.cpu().numpy()
+
+        nonzero = values != 0.0
+        row_of_nnz = row_of_nnz[nonzero]
+        dim_ids = dim_ids[nonzero].astype(np.int32)
+        values = values[nonzero].astype(np.float32)
+
+        # Coalesced COO / nonzero() are row-major, so each row is one contiguous slice.
+        counts = np.bincount(row_of_nnz, minlength=n_rows)
+        bounds = np.cumsum(counts)[:-1]
+        return list(zip(np.split(dim_ids, bounds), np.split(values, bounds)))
+
+    @staticmethod
+    def _row_to_dict(row: SparseRow) -> SparseVector:
+        indices, values = row
+        return {str(int(dim_id)): float(value) for dim_id, value in zip(indices.tolist(), values.tolist())}
 
     @staticmethod
     def _ensure_list(raw: object) -> List[torch.Tensor]:
@@ -175,46 +264,3 @@ class SpladeEmbedder:
         if isinstance(raw, torch.Tensor):
             return [raw]
         raise TypeError(f"Unsupported sparse encoder output type: {type(raw)!r}")
-
-    @staticmethod
-    def _tensor_to_sparse_dict(tensor: torch.Tensor) -> SparseVector:
-        """
-        Convert one sparse tensor into Dict[str, float].
-
-        Expected common case:
-            sparse COO tensor, shape [vocab_size]
-
-        Fallback:
-            dense tensor -> convert non-zero entries only
-        """
-        if tensor.is_sparse:
-            t = tensor.coalesce()
-            indices = t.indices()
-            values = t.values()
-
-            if indices.numel() == 0:
-                return {}
-
-            # 1D sparse vector: indices shape [1, nnz]
-            # Defensive fallback: use last row if shape differs.
-            if indices.dim() == 2:
-                dim_ids = indices[-1].tolist()
-            else:
-                dim_ids = indices.tolist()
-
-            return {
-                str(int(dim_id)): float(value)
-                for dim_id, value in zip(dim_ids, values.tolist())
-                if float(value) != 0.0
-            }
-
-        # Dense fallback
-        nonzero = torch.nonzero(tensor, as_tuple=False).flatten().tolist()
-        if not nonzero:
-            return {}
-
-        return {
-            str(int(idx)): float(tensor[idx].item())
-            for idx in nonzero
-            if float(tensor[idx].item()) != 0.0
-        }
\ No newline at end of file
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+splade_process_pool.py
+
+Purpose:
+    Multi-process SPLADE document encoding for CPU-only ingestion.
+
+Role in architecture:
+    - Drop-in replacement for SpladeEmbedder on the ingestion side:
+        embed(texts)        -> List[Dict[str, float]]
+        embed_arrays(texts) -> List[(int32 ids, float32 weights)]
+    - IngestionManager uses it exactly like SpladeEmbedder; AppController
+      creates it only when document_ingestion.splade_workers > 0.
+
+Design:
+    - N worker processes (spawn context, so no torch state is forked) each
+      load the SPLADE model once, in the pool initializer.
+    - Every worker pins torch to its share of the cores
+      (torch.set_num_threads), so N workers do not oversubscribe the CPU.
+    - Every call is cut into at least one slice per worker (at most task_size
+      texts each) and sent through the pool's pipes; each worker returns one
+      packed (counts, ids, weights) triple per slice, so a slice costs three
+      array pickles instead of one object per chunk.
+    - Results are reassembled in input order.
+
+Notes:
+    - The pool is started lazily on first use and must be closed (close() or
+      a with-block); the model load cost is paid once per worker, not per call.
+    - Query encoding stays in-process (SpladeEmbedder.embed_queries): queries
+      are few and short, and a round-trip through the pool would add latency.
+"""
+
+from __future__ import annotations
+
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+SparseVector = Dict[str, float]
+
+# One sparse row as parallel arrays: (int32 vocabulary ids, float32 weights).
+SparseRow = Tuple[np.ndarray, np.ndarray]
+
+# Texts per task sent to one worker.
+DEFAULT_TASK_SIZE = 64
+
+# Per-process encoder, created by _init_worker in every pool worker.
+_WORKER_EMBEDDER: Any = None
+
+
+def _init_worker(
+    model: str,
+    backend: str,
+    model_kwargs: Dict[str, Any] | None,
+    batch_size: int,
+    max_active_dims: int | None,
+    torch_threads: int,
+) -> None:
+    """
+    Pool initializer: pin torch threads, then load the model once.
+    """
+    global _WORKER_EMBEDDER
+
+    import torch
+
+    torch.set_num_threads(max(1, int(torch_threads)))
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Already set (only allowed once per process); keep the existing value.
+        pass
+
+    from ragstream.ingestion.splade_embedder import SpladeEmbedder
+
+    _WORKER_EMBEDDER = SpladeEmbedder(
+        model,
+        device="cpu",
+        backend=backend,
+        batch_size=batch_size,
+        max_active_dims=max_active_dims,
+        model_kwargs=model_kwargs,
+    )
+
+
+def _encode_task(texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Worker task: encode one slice and pack the rows as (counts, ids, weights).
+    """
+    rows = _WORKER_EMBEDDER.embed_arrays(texts)
+    counts = np.asarray([indices.shape[0] for indices, _values in rows], dtype=np.int64)
+    if not rows:
+        return counts, np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+    indices = np.concatenate([indices for indices, _values in rows]).astype(np.int32, copy=False)
+    values = np.concatenate([values for _indices, values in rows]).astype(np.float32, copy=False)
+    return counts, indices, values
+
+
+class SpladeProcessPoolEmbedder:
+    """
+    SPLADE document encoder backed by a pool of worker processes.
+    """
+
+    def __init__(
+        self,
+        model: str = "naver/splade-cocondenser-ensembledistil",
+        *,
+        workers: int = 2,
+        torch_threads: int = 0,
+        backend: str = "torch",
+        model_kwargs: Dict[str, Any] | None = None,
+        batch_size: int = 16,
+        max_active_dims: int | None = 256,
+        task_size: int = DEFAULT_TASK_SIZE,
+    ) -> None:
+        """
+        Args:
+            model:
+                SPLADE model name or local path.
+            workers:
+                Number of worker processes (>= 1).
+            torch_threads:
+                Torch intra-op threads per worker; 0 = cpu_count // workers.
+            backend:
+                SparseEncoder backend used inside the workers.
+            model_kwargs:
+                Optional backend loading options (see splade_backend.py).
+            batch_size:
+                Encoder batch size inside each worker.
+            max_active_dims:
+                Optional cap on active dimensions per vector.
+            task_size:
+                Upper bound on texts per task sent to one worker.
+        """
+        self.model = model
+        self.workers = max(1, int(workers))
+        cpu_count = os.cpu_count() or 1
+        self.torch_threads = int(torch_threads) if int(torch_threads) > 0 else max(1, cpu_count // self.workers)
+        self.backend = backend
+        self.model_kwargs = dict(model_kwargs or {})
+        self.batch_size = int(batch_size)
+        self.max_active_dims = max_active_dims
+        self.task_size = max(1, int(task_size))
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Public API (parallel to SpladeEmbedder)
+    # ------------------------------------------------------------------
+
+    def embed(self, texts: List[str]) -> List[SparseVector]:
+        """
+        Document-side sparse encoding, one Dict[str, float] per text.
+        """
+        return [
+            {str(int(dim_id)): float(value) for dim_id, value in zip(indices.tolist(), values.tolist())}
+            for indices, values in self.embed_arrays(texts)
+        ]
+
+    def embed_arrays(self, texts: List[str]) -> List[SparseRow]:
+        """
+        Document-side sparse encoding, one (int32 ids, float32 weights) row per text.
+        """
+        if not texts:
+            return []
+
+        # At least one slice per worker, so even a small file (fewer chunks
+        # than task_size) is spread over the whole pool.
+        slice_size = max(1, min(self.task_size, math.ceil(len(texts) / self.workers)))
+        slices = [list(texts[start:start + slice_size]) for start in range(0, len(texts), slice_size)]
+        pool = self._get_pool()
+
+        rows: List[SparseRow] = []
+        for counts, indices, values in pool.map(_encode_task, slices):
+            bounds = np.cumsum(counts)[:-1]
+            rows.extend(zip(np.split(indices, bounds), np.split(values, bounds)))
+
+        if len(rows) != len(texts):
+            raise RuntimeError("SpladeProcessPoolEmbedder.embed_arrays: worker returned a different number of rows")
+        return rows
+
+    def close(self) -> None:
+        """
+        Shut the worker processes down (safe to call more than once).
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def __enter__(self) -> "SpladeProcessPoolEmbedder":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(
+                        self.model,
+                        self.backend,
+                        self.model_kwargs or None,
+                        self.batch_size,
+                        self.max_active_dims,
+                        self.torch_threads,
+                    ),
+                )
+            return self._pool
@@ -14,50 +14,186 @@ Purpose:
         snapshot(timestamp=None) -> Path
 
 Storage model:
-    Local filesystem persistence under one project folder.
-    The store persists:
-        - sparse vectors by id
-        - metadatas by id
-
-Why local and simple:
-    For your current architecture, SPLADE ingestion is the first step.
-    Later retrieval can rescore a bounded set of chunk_ids efficiently from this
-    store without requiring a full external search engine.
+    Local filesystem persistence under one project folder, as immutable
+    "generations" plus a small pointer file:
+
+        <index_name>.current.json      -> {"generation": N, "dir": "<index_name>.g00000N", ...}
+        <index_name>.g00000N/
+            indptr.npy    int64   [n_rows + 1]   CSR row pointers
+            indices.npy   int32   [nnz]          vocabulary ids (sorted per row)
+            data.npy      float32 [nnz]          SPLADE weights
+            ids.json                              chunk id per row
+            metadatas.json                        metadata dict per row
+            postings_indptr.npy / postings_rows.npy / postings_data.npy / term_max.npy
+                                                  inverted index (see below)
+
+    A new generation is written completely, then the pointer is replaced
+    atomically (os.replace), so readers always see one consistent version.
+    Files and the directory are fsynced around both renames (not on Windows,
+    where directories cannot be fsynced), so the switch survives power loss.
+    Arrays are opened with np.load(mmap_mode="r").
+
+Write-ahead log:
+    add() and deletions do NOT rewrite the generation. They append JSON-line
+    records to "<index_name>.wal.jsonl" and fsync once per call:
+
+        {"op": "upsert", "id": ..., "indices": [...], "values": [...], "metadata": {...}}
+        {"op": "delete", "id": ...}
+
+    Opening the store loads the current generation and replays the log; a
+    torn last line (crash mid-append) is dropped. compact() folds the log
+    into a new generation and then empties it; it also runs automatically
+    once the log exceeds wal_compact_bytes. Replay is idempotent, so a crash
+    between switching the pointer and emptying the log loses nothing.
+
+    Stores written by older versions ("<index_name>.pkl", dict-of-dicts with
+    string vocabulary keys) are migrated once on first open; the pickle is
+    kept as "<index_name>.pkl.migrated".
+
+Scoring:
+    Query vectors are scattered into a dense weight array over their active
+    vocabulary ids; candidate rows are gathered from the CSR arrays and scored
+    in one vectorized pass (no per-document Python loop).
+
+Top-k search:
+    An inverted index (vocabulary id -> posting list of (row, weight), plus the
+    maximum weight per term) is written with every generation and rebuilt
+    lazily after mutations. search()/query() use MaxScore-style pruning,
+    term-at-a-time: query terms are processed by decreasing upper bound
+    (query weight * term max); once the k-th best partial score exceeds what
+    the unprocessed terms could still add, no unseen row can enter the top-k,
+    and only the surviving rows are rescored exactly from the CSR arrays.
+    The result equals an exhaustive scan (same scores, same tie order).
+
+Mutations:
+    add/delete are applied to an in-memory overlay and merged into the CSR
+    arrays lazily, on the next read or compaction.
+
+Metadata index:
+    (path, sha256) -> ids and path -> ids are kept in memory next to the
+    metadata and updated on every upsert / delete. Version deletes, count and
+    where-filters that constrain path (and sha256) therefore touch only the
+    matching chunks; other filters fall back to a full metadata scan.
 """
 
 from __future__ import annotations
 
+from collections.abc import Mapping
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+import json
 import os
 import pickle
 import shutil
 
+import numpy as np
+
 
 SparseVector = Dict[str, float]
 
+# One sparse row as parallel arrays: (int32 vocabulary ids, float32 weights).
+SparseRow = Tuple[np.ndarray, np.ndarray]
+
+# On-disk format version of one CSR generation.
+_FORMAT_VERSION = "2"
+
+# Log size above which add/delete fold the log into a new generation.
+DEFAULT_WAL_COMPACT_BYTES = 64 * 1024 * 1024
+
+
+# Relative slack for partial-score comparisons (float summation order differs
+# between the term-at-a-time accumulator and the exact CSR rescoring).
+_PRUNE_SLACK = 1e-9
+
+# Once at most this many rows can still enter the top-k, they are rescored
+# exactly from the CSR arrays instead of scanning further posting lists.
+_RESCORE_ROWS = 2048
+
+
+@dataclass(frozen=True)
+class _Postings:
+    """Inverted index over the CSR rows, one posting list per vocabulary id."""
+    indptr: np.ndarray     # int64 [n_terms + 1]
+    rows: np.ndarray       # int32 [nnz], ascending within each term
+    data: np.ndarray       # float32 [nnz]
+    term_max: np.ndarray   # float32 [n_terms]
+
+
+class SparseIndexView(Mapping):
+    """
+    Read-only {chunk_id: sparse_vector} mapping over a SpladeVectorStoreBase.
+
+    Vectors are rebuilt as dicts on access; this exists for compatibility and
+    debugging, not for scoring.
+    """
+
+    def __init__(self, store: "SpladeVectorStoreBase") -> None:
+        self._store = store
+
+    def __getitem__(self, chunk_id: str) -> SparseVector:
+        vector = self._store.get_vector(chunk_id)
+        if vector is None:
+            raise KeyError(chunk_id)
+        return vector
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.ids())
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __contains__(self, chunk_id: object) -> bool:
+        return isinstance(chunk_id, str) and self._store.row_ordinals([chunk_id])[0] >= 0
+
 
 class SpladeVectorStoreBase:
     """
     Base implementation of a local persistent sparse store.
 
     Responsibilities:
-      - Own one filesystem-backed sparse index bundle.
+      - Own one filesystem-backed CSR sparse index (generations + pointer).
       - Provide deterministic add/query/delete/snapshot methods.
       - Offer policy hooks for subclasses, matching the Chroma base style.
     """
 
-    def __init__(self, persist_dir: str, index_name: str) -> None:
+    def __init__(
+        self,
+        persist_dir: str,
+        index_name: str,
+        *,
+        wal_compact_bytes: int = DEFAULT_WAL_COMPACT_BYTES,
+    ) -> None:
         self.persist_path = Path(persist_dir)
         self.persist_path.mkdir(parents=True, exist_ok=True)
 
         self.index_name = index_name
-        self._bundle_path = self.persist_path / f"{self.index_name}.pkl"
+        self.wal_compact_bytes = max(0, int(wal_compact_bytes))
+        self._pointer_path = self.persist_path / f"{self.index_name}.current.json"
+        self._wal_path = self.persist_path / f"{self.index_name}.wal.jsonl"
+        self._legacy_bundle_path = self.persist_path / f"{self.index_name}.pkl"
+        self._generation = 0
+
+        # Merged CSR state (possibly memory-mapped from the current generation).
+        self._ids: List[str] = []
+        self._row_by_id: Dict[str, int] = {}
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        self._data = np.zeros(0, dtype=np.float32)
+        self._row_of_nnz: Optional[np.ndarray] = None
+        self._id_array: Optional[np.ndarray] = None
+        self._postings: Optional[_Postings] = None
 
-        self._index: Dict[str, SparseVector] = {}
         self._meta_store: Dict[str, Dict[str, Any]] = {}
+        # Secondary metadata index (see module docstring).
+        self._ids_by_version: Dict[Tuple[str, str], set[str]] = {}
+        self._ids_by_path: Dict[str, set[str]] = {}
+
+        # Overlay of mutations not merged into the CSR arrays yet.
+        self._pending: Dict[str, SparseRow] = {}
+        self._dropped: set[str] = set()
 
         self._load()
 
@@ -68,11 +204,13 @@ class SpladeVectorStoreBase:
     def add(
         self,
         ids: List[str],
-        vectors: List[SparseVector],
+        vectors: List[SparseVector | SparseRow],
         metadatas: Optional[List[Dict[str, Any]]] = None,
     ) -> None:
         """
         Upsert sparse vectors and metadatas into the local store.
+
+        Vectors may be Dict[str, float] or (int32 ids, float32 weights) pairs.
         """
         if not ids or not vectors:
             return
@@ -85,11 +223,20 @@ class SpladeVectorStoreBase:
 
         metas = metadatas or [{} for _ in ids]
 
+        records: List[Dict[str, Any]] = []
         for chunk_id, vector, meta in zip(ids, vectors, metas):
-            self._index[chunk_id] = self._normalize_sparse_vector(vector)
-            self._meta_store[chunk_id] = dict(meta)
+            indices, values = self._to_row(vector)
+            records.append({
+                "op": "upsert",
+                "id": str(chunk_id),
+                "indices": indices.tolist(),
+                "values": values.tolist(),
+                "metadata": dict(meta),
+            })
+            self._apply_upsert(str(chunk_id), (indices, values), dict(meta))
 
-        self._persist()
+        self._append_wal(records)
+        self._maybe_compact()
         self._post_add(ids, vectors, metadatas)
 
     def query(
@@ -118,18 +265,22 @@ class SpladeVectorStoreBase:
         k = max(1, int(k))
         vector, k, where = self._pre_query(vector, k, where)
 
-        scored: List[tuple[str, float]] = []
-        for chunk_id, doc_vec in self._index.items():
-            meta = self._meta_store.get(chunk_id, {})
+        self._materialize()
+        if where:
+            rows = np.sort(self.row_ordinals(self.ids_where(where)))
+        else:
+            rows = np.arange(len(self._ids), dtype=np.int64)
 
-            if where and not self._metadata_matches(meta, where):
-                continue
+        if rows.size == 0:
+            return self._post_query([], {"scored": []})
 
-            score = self._dot_sparse(vector, doc_vec)
-            scored.append((chunk_id, score))
+        if where:
+            top_rows, top_scores = self._rank_rows(rows, self.score(vector, rows), k)
+        else:
+            top_rows, top_scores = self.search(vector, k)
 
-        scored.sort(key=lambda row: (-row[1], row[0]))
-        ids = [chunk_id for chunk_id, _score in scored[:k]]
+        scored = [(self._ids[int(row)], float(score)) for row, score in zip(top_rows, top_scores)]
+        ids = [chunk_id for chunk_id, _score in scored]
         return self._post_query(ids, {"scored": scored})
 
     def delete_where(self, where: Dict[str, Any]) -> None:
@@ -139,12 +290,40 @@ class SpladeVectorStoreBase:
         if not where:
             return
 
-        ids_to_delete = [
+        self._delete_ids(self.ids_where(where))
+
+    def ids_where(self, where: Dict[str, Any]) -> List[str]:
+        """
+        Return the ids whose metadata matches where (same filter syntax as query).
+
+        Conditions on path / path + sha256 are answered from the secondary
+        index; only those candidates are checked with the full filter.
+        """
+        candidates = self._indexed_candidates(where)
+        if candidates is None:
+            return [
+                chunk_id
+                for chunk_id, meta in self._meta_store.items()
+                if self._metadata_matches(meta, where)
+            ]
+
+        return sorted(
             chunk_id
-            for chunk_id, meta in self._meta_store.items()
-            if self._metadata_matches(meta, where)
-        ]
-        self._delete_ids(ids_to_delete)
+            for chunk_id in candidates
+            if self._metadata_matches(self._meta_store.get(chunk_id, {}), where)
+        )
+
+    def count_where(self, where: Dict[str, Any]) -> int:
+        """
+        Return how many ids match where.
+        """
+        return len(self.ids_where(where))
+
+    def ids_for_file_version(self, rel_path: str, sha256: str) -> List[str]:
+        """
+        Return the ids of one file version, straight from the (path, sha256) index.
+        """
+        return sorted(self._ids_by_version.get((str(rel_path), str(sha256)), ()))
 
     def snapshot(self, timestamp: Optional[str] = None) -> Path:
         """
@@ -158,12 +337,292 @@ class SpladeVectorStoreBase:
         shutil.copytree(self.persist_path, dst, dirs_exist_ok=False)
         return dst
 
+    def compact(self) -> None:
+        """
+        Fold the write-ahead log into a new generation and empty the log.
+        """
+        if not self._pending and not self._dropped and not self._wal_has_records():
+            return
+
+        # _write_generation returns only after the new pointer and its
+        # directory entry are fsynced, so emptying the log cannot lose data.
+        self._write_generation()
+        self._truncate_wal()
+
     @property
-    def index(self) -> Dict[str, SparseVector]:
+    def index(self) -> SparseIndexView:
+        """
+        Read-only {chunk_id: sparse_vector} view, kept for compatibility/debugging.
+        """
+        return SparseIndexView(self)
+
+    # ------------------------------------------------------------------
+    # Array-level read API (used by retrieval)
+    # ------------------------------------------------------------------
+
+    def prepare_for_reads(self) -> None:
+        """
+        Build every lazily derived read structure now (merged CSR, postings,
+        id array), so a store shared between threads is only read afterwards.
+        """
+        self._materialize()
+        self._get_row_of_nnz()
+        self._get_postings()
+        self._get_id_array()
+
+    def __len__(self) -> int:
+        self._materialize()
+        return len(self._ids)
+
+    def ids(self) -> List[str]:
+        """
+        Return all stored chunk ids in row order.
+        """
+        self._materialize()
+        return list(self._ids)
+
+    def row_ordinals(self, ids: Iterable[str]) -> np.ndarray:
+        """
+        Map chunk ids to CSR row numbers (-1 for unknown ids).
+        """
+        self._materialize()
+        return np.asarray([self._row_by_id.get(str(cid), -1) for cid in ids], dtype=np.int64)
+
+    def row_ids(self, rows: Iterable[int]) -> List[str]:
+        """
+        Map CSR row numbers back to chunk ids.
+        """
+        self._materialize()
+        return [self._ids[int(row)] for row in rows]
+
+    def get_vector(self, chunk_id: str) -> Optional[SparseVector]:
+        """
+        Return one stored sparse vector as Dict[str, float] (None if unknown).
+        """
+        self._materialize()
+        row = self._row_by_id.get(str(chunk_id))
+        if row is None:
+            return None
+        start, end = int(self._indptr[row]), int(self._indptr[row + 1])
+        return {
+            str(int(dim_id)): float(value)
+            for dim_id, value in zip(self._indices[start:end], self._data[start:end])
+        }
+
+    def get_rows(self, chunk_ids: List[str]) -> List[Optional[SparseRow]]:
+        """
+        Return stored rows as (int32 ids, float32 weights), None for unknown ids.
+
+        Unlike get_vector(...), this does not materialize: pending upserts are
+        read from the write-ahead overlay and everything else is sliced from
+        the committed CSR arrays.
+        """
+        rows: List[Optional[SparseRow]] = []
+        for chunk_id in chunk_ids:
+            chunk_id = str(chunk_id)
+            pending = self._pending.get(chunk_id)
+            if pending is not None:
+                rows.append(pending)
+                continue
+            row = self._row_by_id.get(chunk_id)
+            if row is None or chunk_id in self._dropped:
+                rows.append(None)
+                continue
+            start, end = int(self._indptr[row]), int(self._indptr[row + 1])
+            rows.append((
+                np.asarray(self._indices[start:end], dtype=np.int32),
+                np.asarray(self._data[start:end], dtype=np.float32),
+            ))
+        return rows
+
+    def get_metadata(self, chunk_id: str) -> Dict[str, Any]:
+        """
+        Return a copy of the metadata stored for one chunk id ({} if unknown).
+        """
+        return dict(self._meta_store.get(str(chunk_id), {}))
+
+    def score(self, vector: SparseVector, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Dot products between one query vector and stored rows.
+
+        Args:
+            vector: Query sparse vector (Dict[str, float]).
+            rows:   Optional CSR row numbers to score; None scores every row.
+
+        Returns:
+            float64 array of scores aligned with rows (or with ids()).
+        """
+        self._materialize()
+        n_rows = len(self._ids) if rows is None else int(len(rows))
+        scores = np.zeros(n_rows, dtype=np.float64)
+
+        q_indices, q_values = self._to_row(vector)
+        if n_rows == 0 or q_indices.size == 0:
+            return scores
+
+        q_dense = np.zeros(int(q_indices.max()) + 1, dtype=np.float64)
+        q_dense[q_indices] = q_values
+
+        if rows is None:
+            row_of_nnz = self._get_row_of_nnz()
+            indices = self._indices
+            data = self._data
+        else:
+            row_of_nnz, indices, data = self._gather_rows(np.asarray(rows, dtype=np.int64))
+
+        in_vocab = indices < q_dense.shape[0]
+        contributions = np.asarray(data[in_vocab], dtype=np.float64) * q_dense[indices[in_vocab]]
+        scores += np.bincount(row_of_nnz[in_vocab], weights=contributions, minlength=n_rows)
+        return scores
+
+    def score_many(self, vectors: List[SparseVector], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Dot products between several query vectors and stored rows at once.
+
+        The queries become a dense [M, V_active] matrix over the union of
+        their active terms; the requested CSR rows are gathered once, entries
+        outside that term set are dropped, and all M x N scores come from one
+        gather-multiply plus a per-row np.add.reduceat.
+
+        Args:
+            vectors: Query sparse vectors (one per query piece).
+            rows:    Optional CSR row numbers to score; None scores every row.
+
+        Returns:
+            float64 array [len(vectors), N] aligned with rows (or with ids()).
+        """
+        self._materialize()
+        n_rows = len(self._ids) if rows is None else int(len(rows))
+        scores = np.zeros((len(vectors), n_rows), dtype=np.float64)
+
+        q_rows = [self._to_row(vector) for vector in vectors]
+        if n_rows == 0 or not q_rows:
+            return scores
+
+        q_indices = np.concatenate([indices for indices, _values in q_rows])
+        if q_indices.size == 0:
+            return scores
+        q_values = np.concatenate([values for _indices, values in q_rows]).astype(np.float64)
+        q_piece = np.repeat(
+            np.arange(len(q_rows), dtype=np.int64),
+            [indices.shape[0] for indices, _values in q_rows],
+        )
+
+        active_terms = np.unique(q_indices)
+        q_dense = np.zeros((len(q_rows), active_terms.shape[0]), dtype=np.float64)
+        q_dense[q_piece, np.searchsorted(active_terms, q_indices)] = q_values
+
+        if rows is None:
+            row_of_nnz = self._get_row_of_nnz()
+            indices = self._indices
+            data = self._data
+        else:
+            row_of_nnz, indices, data = self._gather_rows(np.asarray(rows, dtype=np.int64))
+
+        # Keep only stored entries whose term occurs in some query piece.
+        term_pos = np.minimum(np.searchsorted(active_terms, indices), active_terms.shape[0] - 1)
+        hit = active_terms[term_pos] == indices
+        if not hit.any():
+            return scores
+        row_of_nnz = row_of_nnz[hit]
+        term_pos = term_pos[hit]
+
+        contributions = q_dense[:, term_pos] * np.asarray(data[hit], dtype=np.float64)
+
+        # row_of_nnz is non-decreasing, so each row's entries are contiguous.
+        hit_rows, starts = np.unique(row_of_nnz, return_index=True)
+        scores[:, hit_rows] = np.add.reduceat(contributions, starts, axis=1)
+        return scores
+
+    def search(self, vector: SparseVector, k: int) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Expose the underlying sparse vector mapping for advanced ops/debugging.
+        Exact top-k rows for one query vector, pruned with MaxScore.
+
+        Returns:
+            (rows, scores) sorted by score descending, then chunk id ascending.
         """
-        return self._index
+        self._materialize()
+        n_rows = len(self._ids)
+        k = min(max(1, int(k)), n_rows)
+        if n_rows == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+
+        q_indices, q_values = self._to_row(vector)
+        postings = self._get_postings()
+
+        # Pruning needs non-negative weights (always true for SPLADE outputs).
+        if q_indices.size == 0 or (q_values < 0).any() or (postings.data.size and postings.data.min() < 0):
+            all_rows = np.arange(n_rows, dtype=np.int64)
+            return self._rank_rows(all_rows, self.score(vector, all_rows), k)
+
+        known = q_indices < postings.term_max.shape[0]
+        q_indices = q_indices[known].astype(np.int64)
+        q_weights = q_values[known].astype(np.float64)
+
+        upper = q_weights * postings.term_max[q_indices]
+        order = np.argsort(-upper, kind="stable")
+        q_indices, q_weights, upper = q_indices[order], q_weights[order], upper[order]
+        # remaining[j] = upper bound of everything after term j
+        remaining = np.concatenate([np.cumsum(upper[::-1])[::-1][1:], [0.0]])
+
+        acc = np.zeros(n_rows, dtype=np.float64)
+        touched = np.zeros(n_rows, dtype=bool)
+        n_touched = 0
+        # None while every row may still enter the top-k; afterwards the mask of rows that can.
+        alive: Optional[np.ndarray] = None
+        candidates: Optional[np.ndarray] = None
+        theta = 0.0
+
+        for j, (term, weight) in enumerate(zip(q_indices, q_weights)):
+            start, end = int(postings.indptr[term]), int(postings.indptr[term + 1])
+            rows = postings.rows[start:end]
+            contributions = weight * postings.data[start:end]
+
+            if alive is None:
+                acc[rows] += contributions
+                n_touched += int(np.count_nonzero(~touched[rows]))
+                touched[rows] = True
+            else:
+                keep = alive[rows]
+                acc[rows[keep]] += contributions[keep]
+
+            rest = float(remaining[j])
+            if n_touched < k:
+                continue
+
+            # acc holds lower bounds of the exact scores, so its k-th value is one too.
+            theta = float(np.partition(acc, n_rows - k)[n_rows - k])
+            slack = _PRUNE_SLACK * max(1.0, abs(theta))
+            if rest >= theta - slack:
+                continue
+
+            # Unseen rows score <= rest < theta; touched rows survive only if
+            # their partial score plus the remaining bound can still reach theta.
+            alive = (touched if alive is None else alive) & (acc + rest >= theta - slack)
+            if int(np.count_nonzero(alive)) <= max(k, _RESCORE_ROWS):
+                candidates = np.flatnonzero(alive)
+                break
+
+        if candidates is None:
+            # Every term was processed, so acc is complete for all live rows;
+            # only rows that tie or beat the k-th score need exact rescoring.
+            live = touched if alive is None else alive
+            if n_touched >= k:
+                slack = _PRUNE_SLACK * max(1.0, abs(theta))
+                candidates = np.flatnonzero(live & (acc >= theta - slack))
+            else:
+                candidates = np.flatnonzero(live)
+
+        top_rows, top_scores = self._rank_rows(candidates, self.score(vector, candidates), k)
+        if top_rows.shape[0] >= k:
+            return top_rows, top_scores
+
+        # Fewer than k rows share a term with the query: pad with zero scores by id.
+        untouched = np.flatnonzero(~touched)
+        pad_rows, pad_scores = self._rank_rows(
+            untouched, np.zeros(untouched.shape[0], dtype=np.float64), k - top_rows.shape[0]
+        )
+        return np.concatenate([top_rows, pad_rows]), np.concatenate([top_scores, pad_scores])
 
     # ------------------------------------------------------------------
     # Hook methods (parallel to Chroma base)
@@ -201,68 +660,509 @@ class SpladeVectorStoreBase:
     # ------------------------------------------------------------------
 
     def _load(self) -> None:
-        if not self._bundle_path.exists():
-            return
+        if self._pointer_path.exists():
+            self._load_generation()
+        elif self._legacy_bundle_path.exists():
+            self._migrate_legacy_bundle()
+
+        self._replay_wal()
+
+    def _load_generation(self) -> None:
+        with self._pointer_path.open("r", encoding="utf-8") as f:
+            pointer = json.load(f)
+
+        gen_dir = self.persist_path / str(pointer["dir"])
+        self._generation = int(pointer.get("generation", 0))
 
-        with self._bundle_path.open("rb") as f:
+        # np.asarray keeps the memory mapping but avoids np.memmap's slow indexing path.
+        self._indptr = np.asarray(np.load(gen_dir / "indptr.npy", mmap_mode="r"))
+        self._indices = np.asarray(np.load(gen_dir / "indices.npy", mmap_mode="r"))
+        self._data = np.asarray(np.load(gen_dir / "data.npy", mmap_mode="r"))
+
+        with (gen_dir / "ids.json").open("r", encoding="utf-8") as f:
+            self._ids = [str(cid) for cid in json.load(f)]
+        with (gen_dir / "metadatas.json").open("r", encoding="utf-8") as f:
+            metadatas = json.load(f)
+
+        if len(self._ids) != len(metadatas) or len(self._ids) + 1 != len(self._indptr):
+            raise RuntimeError(
+                f"SpladeVectorStoreBase._load: inconsistent generation files in {gen_dir}"
+            )
+
+        self._row_by_id = {cid: row for row, cid in enumerate(self._ids)}
+        self._meta_store = {}
+        self._ids_by_version = {}
+        self._ids_by_path = {}
+        for cid, meta in zip(self._ids, metadatas):
+            self._set_metadata(cid, dict(meta or {}))
+        self._row_of_nnz = None
+        self._id_array = None
+
+        self._postings = None
+        if (gen_dir / "term_max.npy").exists():
+            self._postings = _Postings(
+                indptr=np.asarray(np.load(gen_dir / "postings_indptr.npy", mmap_mode="r")),
+                rows=np.asarray(np.load(gen_dir / "postings_rows.npy", mmap_mode="r")),
+                data=np.asarray(np.load(gen_dir / "postings_data.npy", mmap_mode="r")),
+                term_max=np.asarray(np.load(gen_dir / "term_max.npy", mmap_mode="r")),
+            )
+
+    def _migrate_legacy_bundle(self) -> None:
+        """
+        One-time conversion of the old pickled dict-of-dicts bundle.
+        """
+        with self._legacy_bundle_path.open("rb") as f:
             payload = pickle.load(f)
 
-        self._index = dict(payload.get("index", {}))
-        self._meta_store = dict(payload.get("metadatas", {}))
+        metadatas = dict(payload.get("metadatas", {}))
+        for chunk_id, vector in dict(payload.get("index", {})).items():
+            self._apply_upsert(str(chunk_id), self._to_row(vector), dict(metadatas.get(chunk_id, {})))
 
-    def _persist(self) -> None:
-        payload = {
-            "version": "1",
+        self._write_generation()
+        os.replace(
+            str(self._legacy_bundle_path),
+            str(self._legacy_bundle_path.with_suffix(".pkl.migrated")),
+        )
+
+    def _write_generation(self) -> None:
+        """
+        Write the merged state as a new generation and switch the pointer to it.
+        """
+        self._materialize()
+
+        generation = self._generation + 1
+        dir_name = f"{self.index_name}.g{generation:06d}"
+        gen_dir = self.persist_path / dir_name
+        tmp_dir = self.persist_path / f"{dir_name}.tmp"
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+
+        # Every file is fsynced: once the pointer moves, the log may be emptied.
+        self._save_durable(tmp_dir / "indptr.npy", np.asarray(self._indptr, dtype=np.int64))
+        self._save_durable(tmp_dir / "indices.npy", np.asarray(self._indices, dtype=np.int32))
+        self._save_durable(tmp_dir / "data.npy", np.asarray(self._data, dtype=np.float32))
+        self._save_durable(tmp_dir / "ids.json", self._ids)
+        self._save_durable(
+            tmp_dir / "metadatas.json",
+            [self._meta_store.get(cid, {}) for cid in self._ids],
+        )
+
+        postings = self._get_postings()
+        self._save_durable(tmp_dir / "postings_indptr.npy", np.asarray(postings.indptr, dtype=np.int64))
+        self._save_durable(tmp_dir / "postings_rows.npy", np.asarray(postings.rows, dtype=np.int32))
+        self._save_durable(tmp_dir / "postings_data.npy", np.asarray(postings.data, dtype=np.float32))
+        self._save_durable(tmp_dir / "term_max.npy", np.asarray(postings.term_max, dtype=np.float32))
+        self._fsync_dir(tmp_dir)
+
+        if gen_dir.exists():
+            shutil.rmtree(gen_dir)
+        os.replace(str(tmp_dir), str(gen_dir))
+        self._fsync_dir(self.persist_path)
+
+        pointer = {
+            "version": _FORMAT_VERSION,
             "index_name": self.index_name,
-            "index": self._index,
-            "metadatas": self._meta_store,
+            "generation": generation,
+            "dir": dir_name,
+            "rows": len(self._ids),
+            "nnz": int(self._indices.shape[0]),
         }
+        tmp_pointer = self._pointer_path.with_suffix(".json.tmp")
+        self._save_durable(tmp_pointer, pointer)
+        os.replace(str(tmp_pointer), str(self._pointer_path))
+
+        # The renames are durable only once the directory entry is; callers
+        # (compact) empty the log right after this returns.
+        self._fsync_dir(self.persist_path)
+
+        self._generation = generation
+        self._remove_stale_generations(keep=dir_name)
+
+    @staticmethod
+    def _save_durable(path: Path, payload: Any) -> None:
+        """
+        Write one NumPy array (.npy) or JSON value and fsync it.
+        """
+        with path.open("wb") as f:
+            if isinstance(payload, np.ndarray):
+                np.save(f, payload)
+            else:
+                f.write(json.dumps(payload, ensure_ascii=False, indent=None).encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+
+    @staticmethod
+    def _fsync_dir(path: Path) -> None:
+        """
+        fsync a directory so renames inside it survive a power loss.
 
-        tmp_path = self._bundle_path.with_suffix(self._bundle_path.suffix + ".tmp")
-        with tmp_path.open("wb") as f:
-            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        Windows cannot open directories for fsync (NTFS journals renames
+        itself), so this is a no-op there.
+        """
+        if os.name == "nt":
+            return
+        fd = os.open(str(path), os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
 
-        os.replace(str(tmp_path), str(self._bundle_path))
+    def _remove_stale_generations(self, keep: str) -> None:
+        """
+        Best-effort cleanup of older generation folders (they may still be
+        memory-mapped by another reader; such folders are left for later).
+        """
+        for path in self.persist_path.glob(f"{self.index_name}.g*"):
+            if path.name == keep or not path.is_dir():
+                continue
+            shutil.rmtree(path, ignore_errors=True)
 
     def _delete_ids(self, ids: Iterable[str]) -> None:
-        changed = False
+        records: List[Dict[str, Any]] = []
         for chunk_id in ids:
-            if chunk_id in self._index:
-                del self._index[chunk_id]
-                changed = True
-            if chunk_id in self._meta_store:
-                del self._meta_store[chunk_id]
-                changed = True
+            chunk_id = str(chunk_id)
+            if self._apply_delete(chunk_id):
+                records.append({"op": "delete", "id": chunk_id})
 
-        if changed:
-            self._persist()
+        if records:
+            self._append_wal(records)
+            self._maybe_compact()
 
-    @staticmethod
-    def _normalize_sparse_vector(vector: SparseVector) -> SparseVector:
+    def _apply_upsert(self, chunk_id: str, row: SparseRow, metadata: Dict[str, Any]) -> None:
+        self._pending[chunk_id] = row
+        self._set_metadata(chunk_id, metadata)
+
+    def _apply_delete(self, chunk_id: str) -> bool:
         """
-        Remove zero entries and normalize key/value types.
+        Remove one id from the in-memory state; True if it existed.
         """
-        normalized: SparseVector = {}
-        for key, value in vector.items():
-            fval = float(value)
-            if fval != 0.0:
-                normalized[str(key)] = fval
-        return normalized
+        existed = False
+        if chunk_id in self._pending:
+            del self._pending[chunk_id]
+            existed = True
+        if chunk_id in self._row_by_id and chunk_id not in self._dropped:
+            self._dropped.add(chunk_id)
+            existed = True
+        if chunk_id in self._meta_store:
+            self._drop_metadata(chunk_id)
+            existed = True
+        return existed
+
+    # ------------------------------------------------------------------
+    # Metadata index
+    # ------------------------------------------------------------------
+
+    def _set_metadata(self, chunk_id: str, metadata: Dict[str, Any]) -> None:
+        if chunk_id in self._meta_store:
+            self._drop_metadata(chunk_id)
+
+        self._meta_store[chunk_id] = metadata
+        path, sha256 = metadata.get("path"), metadata.get("sha256")
+        if isinstance(path, str):
+            self._ids_by_path.setdefault(path, set()).add(chunk_id)
+            if isinstance(sha256, str):
+                self._ids_by_version.setdefault((path, sha256), set()).add(chunk_id)
+
+    def _drop_metadata(self, chunk_id: str) -> None:
+        metadata = self._meta_store.pop(chunk_id, None) or {}
+        path, sha256 = metadata.get("path"), metadata.get("sha256")
+        if not isinstance(path, str):
+            return
+
+        self._discard_indexed(self._ids_by_path, path, chunk_id)
+        if isinstance(sha256, str):
+            self._discard_indexed(self._ids_by_version, (path, sha256), chunk_id)
 
     @staticmethod
-    def _dot_sparse(left: SparseVector, right: SparseVector) -> float:
+    def _discard_indexed(index: Dict[Any, set[str]], key: Any, chunk_id: str) -> None:
+        ids = index.get(key)
+        if ids is None:
+            return
+        ids.discard(chunk_id)
+        if not ids:
+            del index[key]
+
+    def _indexed_candidates(self, where: Dict[str, Any]) -> Optional[set[str]]:
+        """
+        Superset of the ids matching where, from the metadata index
+        (None if where does not constrain path).
+        """
+        if "$and" in where:
+            conditions = where["$and"]
+            if not isinstance(conditions, list):
+                raise ValueError("$and value must be a list")
+            # path and sha256 may sit in separate $and branches.
+            merged: Dict[str, Any] = {}
+            for cond in conditions:
+                if isinstance(cond, dict) and not any(key.startswith("$") for key in cond):
+                    merged.update(cond)
+            candidates = self._indexed_candidates(merged) if merged else None
+            for cond in conditions:
+                sub = self._indexed_candidates(cond) if isinstance(cond, dict) else None
+                if sub is not None:
+                    candidates = sub if candidates is None else candidates & sub
+            return candidates
+
+        if "$or" in where:
+            conditions = where["$or"]
+            if not isinstance(conditions, list):
+                raise ValueError("$or value must be a list")
+            union: set[str] = set()
+            for cond in conditions:
+                sub = self._indexed_candidates(cond) if isinstance(cond, dict) else None
+                if sub is None:
+                    return None
+                union |= sub
+            return union
+
+        path = where.get("path")
+        if not isinstance(path, str):
+            return None
+        sha256 = where.get("sha256")
+        if isinstance(sha256, str):
+            return set(self._ids_by_version.get((path, sha256), ()))
+        return set(self._ids_by_path.get(path, ()))
+
+    # ------------------------------------------------------------------
+    # Write-ahead log
+    # ------------------------------------------------------------------
+
+    def _append_wal(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Append records as JSON lines and fsync before returning.
+        """
+        payload = "".join(
+            json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for record in records
+        ).encode("utf-8")
+
+        with self._wal_path.open("ab") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _replay_wal(self) -> None:
+        """
+        Re-apply logged records on top of the loaded generation.
+
+        Only the last line may be incomplete (crash during append); it is
+        dropped and cut off the file so later appends start on a clean line.
+        """
+        if not self._wal_path.exists():
+            return
+
+        with self._wal_path.open("rb") as f:
+            raw = f.read()
+
+        good_bytes = 0
+        lines = raw.split(b"\n")
+        for line_no, line in enumerate(lines):
+            is_last = line_no == len(lines) - 1
+            if not line.strip():
+                if not is_last:
+                    good_bytes += len(line) + 1
+                continue
+
+            try:
+                record = json.loads(line.decode("utf-8"))
+                if is_last:
+                    # A complete record always ends with a newline.
+                    raise ValueError("unterminated last record")
+            except ValueError:
+                if is_last:
+                    break
+                raise RuntimeError(
+                    f"SpladeVectorStoreBase._replay_wal: corrupt record at line {line_no + 1} "
+                    f"in {self._wal_path}"
+                )
+
+            self._apply_wal_record(record)
+            good_bytes += len(line) + 1
+
+        if good_bytes < len(raw):
+            with self._wal_path.open("r+b") as f:
+                f.truncate(good_bytes)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _apply_wal_record(self, record: Dict[str, Any]) -> None:
+        op = record.get("op")
+        chunk_id = str(record.get("id"))
+
+        if op == "upsert":
+            row = (
+                np.asarray(record.get("indices", []), dtype=np.int32),
+                np.asarray(record.get("values", []), dtype=np.float32),
+            )
+            self._apply_upsert(chunk_id, row, dict(record.get("metadata") or {}))
+        elif op == "delete":
+            self._apply_delete(chunk_id)
+        else:
+            raise RuntimeError(f"SpladeVectorStoreBase._replay_wal: unknown op {op!r}")
+
+    def _wal_has_records(self) -> bool:
+        return self._wal_path.exists() and self._wal_path.stat().st_size > 0
+
+    def _truncate_wal(self) -> None:
+        with self._wal_path.open("wb") as f:
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _maybe_compact(self) -> None:
+        if self.wal_compact_bytes <= 0 or not self._wal_path.exists():
+            return
+        if self._wal_path.stat().st_size >= self.wal_compact_bytes:
+            self.compact()
+
+    def _materialize(self) -> None:
+        """
+        Merge pending upserts / deletions into new CSR arrays.
+
+        Kept rows stay in their order; upserted rows are appended in insertion
+        order. Everything runs as NumPy gathers, not per-entry Python loops.
+        """
+        if not self._pending and not self._dropped:
+            return
+
+        keep_mask = np.asarray(
+            [cid not in self._dropped and cid not in self._pending for cid in self._ids],
+            dtype=bool,
+        )
+        row_lengths = np.diff(np.asarray(self._indptr, dtype=np.int64))
+        nnz_mask = np.repeat(keep_mask, row_lengths)
+
+        new_ids = [cid for cid, keep in zip(self._ids, keep_mask) if keep]
+        index_parts = [np.asarray(self._indices[nnz_mask], dtype=np.int32)]
+        data_parts = [np.asarray(self._data[nnz_mask], dtype=np.float32)]
+        length_parts = [row_lengths[keep_mask]]
+
+        if self._pending:
+            new_ids.extend(self._pending.keys())
+            index_parts.extend(indices for indices, _values in self._pending.values())
+            data_parts.extend(values for _indices, values in self._pending.values())
+            length_parts.append(
+                np.asarray([indices.shape[0] for indices, _values in self._pending.values()], dtype=np.int64)
+            )
+
+        lengths = np.concatenate(length_parts)
+        indptr = np.zeros(len(new_ids) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+
+        self._ids = new_ids
+        self._row_by_id = {cid: row for row, cid in enumerate(new_ids)}
+        self._indptr = indptr
+        self._indices = np.concatenate(index_parts).astype(np.int32, copy=False)
+        self._data = np.concatenate(data_parts).astype(np.float32, copy=False)
+        self._row_of_nnz = None
+        self._id_array = None
+        self._postings = None
+
+        self._pending = {}
+        self._dropped = set()
+
+    def _gather_rows(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Gather a subset of CSR rows.
+
+        Returns:
+            (local_row_of_nnz, indices, data) where local_row_of_nnz numbers
+            the requested rows 0..len(rows)-1.
+        """
+        starts = np.asarray(self._indptr, dtype=np.int64)[rows]
+        lengths = np.asarray(self._indptr, dtype=np.int64)[rows + 1] - starts
+        total = int(lengths.sum())
+
+        local_row = np.repeat(np.arange(rows.shape[0], dtype=np.int64), lengths)
+        first_pos = np.cumsum(lengths) - lengths
+        positions = np.repeat(starts - first_pos, lengths) + np.arange(total, dtype=np.int64)
+
+        return local_row, self._indices[positions], self._data[positions]
+
+    def _get_row_of_nnz(self) -> np.ndarray:
+        if self._row_of_nnz is None:
+            row_lengths = np.diff(np.asarray(self._indptr, dtype=np.int64))
+            self._row_of_nnz = np.repeat(np.arange(len(self._ids), dtype=np.int64), row_lengths)
+        return self._row_of_nnz
+
+    def _get_postings(self) -> _Postings:
+        """
+        Return the inverted index, building it from the CSR arrays if needed.
         """
-        Dot product over sparse dicts.
+        if self._postings is not None:
+            return self._postings
 
-        Iterate over the smaller dict for efficiency.
+        indices = np.asarray(self._indices, dtype=np.int64)
+        n_terms = int(indices.max()) + 1 if indices.size else 0
+
+        # Stable sort keeps rows ascending inside every posting list.
+        order = np.argsort(indices, kind="stable")
+        post_rows = self._get_row_of_nnz()[order].astype(np.int32)
+        post_data = np.asarray(self._data, dtype=np.float32)[order]
+
+        counts = np.bincount(indices, minlength=n_terms)
+        post_indptr = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(counts, out=post_indptr[1:])
+
+        term_max = np.zeros(n_terms, dtype=np.float32)
+        non_empty = counts > 0
+        if non_empty.any():
+            term_max[non_empty] = np.maximum.reduceat(post_data, post_indptr[:-1][non_empty])
+
+        self._postings = _Postings(
+            indptr=post_indptr,
+            rows=post_rows,
+            data=post_data,
+            term_max=term_max,
+        )
+        return self._postings
+
+    def _rank_rows(
+        self,
+        rows: np.ndarray,
+        scores: np.ndarray,
+        k: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sort rows by (score desc, chunk id asc) and keep the first k.
         """
-        if len(left) > len(right):
-            left, right = right, left
+        rows = np.asarray(rows, dtype=np.int64)
+        if rows.size == 0 or k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+
+        order = np.lexsort((self._get_id_array()[rows], -scores))[:k]
+        return rows[order], np.asarray(scores, dtype=np.float64)[order]
+
+    def _get_id_array(self) -> np.ndarray:
+        if self._id_array is None:
+            self._id_array = np.asarray(self._ids, dtype=str)
+        return self._id_array
+
+    @staticmethod
+    def _to_row(vector: SparseVector | SparseRow) -> SparseRow:
+        """
+        Convert Dict[str, float] (or an (ids, weights) array pair, e.g. from
+        SpladeEmbedder.embed_arrays) into sorted (int32 ids, float32 weights),
+        dropping zero entries.
+        """
+        if isinstance(vector, tuple):
+            indices = np.asarray(vector[0], dtype=np.int32)
+            values = np.asarray(vector[1], dtype=np.float32)
+            if indices.shape != values.shape:
+                raise ValueError("SpladeVectorStoreBase._to_row: ids and weights length mismatch")
+            nonzero = values != 0.0
+            indices, values = indices[nonzero], values[nonzero]
+            if indices.size > 1 and (np.diff(indices) <= 0).any():
+                order = np.argsort(indices, kind="stable")
+                indices, values = indices[order], values[order]
+            return indices, values
+
+        items = [(int(key), float(value)) for key, value in vector.items() if float(value) != 0.0]
+        items.sort()
 
-        score = 0.0
-        for key, value in left.items():
-            score += float(value) * float(right.get(key, 0.0))
-        return score
+        indices = np.asarray([key for key, _value in items], dtype=np.int32)
+        values = np.asarray([value for _key, value in items], dtype=np.float32)
+        return indices, values
 
     @classmethod
     def _metadata_matches(cls, metadata: Dict[str, Any], where: Dict[str, Any]) -> bool:
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+store_generation.py
+
+Purpose:
+    Process-wide generation counters for persistent project stores.
+
+Role in architecture:
+    - IngestionManager.run(...) bumps the generation of every store it wrote to
+      right after it has published the new manifest.
+    - Retrieval-side caches remember the generation they were built for and
+      reload as soon as the current generation differs.
+
+Design notes:
+    - Keys are resolved persist directories, so every component that points at
+      the same on-disk store shares one counter.
+    - Counters live in memory only. A fresh process starts at generation 0 and
+      therefore always builds its caches from disk once.
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Dict
+
+
+_lock = threading.Lock()
+_generations: Dict[str, int] = {}
+
+
+def store_key(persist_dir: str | Path) -> str:
+    """
+    Return the canonical key used for one persist directory.
+    """
+    return Path(persist_dir).resolve().as_posix()
+
+
+def current_generation(persist_dir: str | Path) -> int:
+    """
+    Return the current generation of the store at persist_dir (0 if never bumped).
+    """
+    key = store_key(persist_dir)
+    with _lock:
+        return _generations.get(key, 0)
+
+
+def bump_generation(persist_dir: str | Path) -> int:
+    """
+    Mark the store at persist_dir as changed and return the new generation.
+    """
+    key = store_key(persist_dir)
+    with _lock:
+        generation = _generations.get(key, 0) + 1
+        _generations[key] = generation
+        return generation
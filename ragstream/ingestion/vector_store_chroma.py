@@ -86,12 +86,63 @@ class VectorStoreChroma(ChromaVectorStoreBase):
             Number of deleted IDs (best-effort; 0 if nothing matched).
         """
         # Look up matching IDs by metadata, then delete by ID for clarity/audit.
-        res = self.collection.get(where={"path": rel_path, "sha256": sha256}, include=[])
+        res = self.collection.get(
+            where={"$and": [{"path": rel_path}, {"sha256": sha256}]},
+            include=[],
+        )
         ids = res.get("ids", []) if res else []
         if ids:
             self.collection.delete(ids=ids)
         return len(ids)
 
+    def vectors_by_chunk_hash(self, rel_path: str, sha256: str) -> Dict[str, List[float]]:
+        """
+        Return {chunk_sha256: vector} for one stored file version.
+
+        Used by ingestion to reuse vectors of chunks whose text did not change
+        between two versions of a file. Chunks stored without chunk_sha256
+        (ingested before it existed) are ignored.
+        """
+        res = self.collection.get(
+            where={"$and": [{"path": rel_path}, {"sha256": sha256}]},
+            include=["embeddings", "metadatas"],
+        )
+        if not res:
+            return {}
+
+        embeddings = res.get("embeddings")
+        metadatas = res.get("metadatas") or []
+        if embeddings is None:
+            return {}
+
+        vectors: Dict[str, List[float]] = {}
+        for meta, emb in zip(metadatas, embeddings):
+            chunk_sha = (meta or {}).get("chunk_sha256")
+            if chunk_sha and emb is not None:
+                vectors[str(chunk_sha)] = [float(x) for x in emb]
+        return vectors
+
+    def get_documents(self, ids: List[str]) -> Dict[str, str]:
+        """
+        Return {chunk_id: chunk_text} for the given ids.
+
+        Only ids that exist and were stored with a document are returned, so
+        callers can fall back for chunks ingested before texts were stored.
+        """
+        if not ids:
+            return {}
+
+        res = self.collection.get(ids=list(ids), include=["documents"])
+        if not res:
+            return {}
+
+        documents = res.get("documents") or []
+        return {
+            str(chunk_id): str(doc)
+            for chunk_id, doc in zip(res.get("ids", []), documents)
+            if doc is not None
+        }
+
     # Introspection utilities (handy for tests/diagnostics)
 
     @property
@@ -10,6 +10,7 @@ Usage:
     store = VectorStoreSplade(persist_dir=".../data/splade_db/project1")
     store.add(ids=[...], vectors=[...], metadatas=[...])
     top_ids = store.query(vector=q_sparse, k=5)
+    store.compact()   # fold the write-ahead log into a new on-disk generation
     snap_dir = store.snapshot()
 """
 
@@ -18,7 +19,7 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any, Dict, List
 
-from .splade_vector_store_base import SpladeVectorStoreBase
+from .splade_vector_store_base import DEFAULT_WAL_COMPACT_BYTES, SparseRow, SpladeVectorStoreBase
 
 
 class VectorStoreSplade(SpladeVectorStoreBase):
@@ -32,8 +33,18 @@ class VectorStoreSplade(SpladeVectorStoreBase):
         possible, so both branches stay structurally parallel.
     """
 
-    def __init__(self, persist_dir: str, index_name: str = "docs_sparse") -> None:
-        super().__init__(persist_dir=persist_dir, index_name=index_name)
+    def __init__(
+        self,
+        persist_dir: str,
+        index_name: str = "docs_sparse",
+        *,
+        wal_compact_bytes: int = DEFAULT_WAL_COMPACT_BYTES,
+    ) -> None:
+        super().__init__(
+            persist_dir=persist_dir,
+            index_name=index_name,
+            wal_compact_bytes=wal_compact_bytes,
+        )
 
     @staticmethod
     def make_chunk_id(rel_path: str, sha256: str, chunk_idx: int) -> str:
@@ -49,14 +60,25 @@ class VectorStoreSplade(SpladeVectorStoreBase):
 
         This mirrors VectorStoreChroma.delete_file_version(...).
         """
-        ids = [
-            chunk_id
-            for chunk_id, meta in self._meta_store.items()
-            if meta.get("path") == rel_path and meta.get("sha256") == sha256
-        ]
+        ids = self.ids_for_file_version(rel_path, sha256)
         self._delete_ids(ids)
         return len(ids)
 
+    def vectors_by_chunk_hash(self, rel_path: str, sha256: str) -> Dict[str, SparseRow]:
+        """
+        Return {chunk_sha256: (int32 ids, float32 weights)} for one stored file version.
+
+        This mirrors VectorStoreChroma.vectors_by_chunk_hash(...). Rows come
+        from get_rows(...), so reuse during ingestion never forces a CSR rebuild.
+        """
+        ids = self.ids_for_file_version(rel_path, sha256)
+        vectors: Dict[str, SparseRow] = {}
+        for chunk_id, row in zip(ids, self.get_rows(ids)):
+            chunk_sha = self.get_metadata(chunk_id).get("chunk_sha256")
+            if chunk_sha and row is not None:
+                vectors[str(chunk_sha)] = row
+        return vectors
+
     @property
     def name(self) -> str:
         """
@@ -75,4 +97,4 @@ class VectorStoreSplade(SpladeVectorStoreBase):
         """
         Return total number of stored sparse vectors.
         """
-        return len(self._index)
\ No newline at end of file
+        return len(self)
\ No newline at end of file
@@ -285,7 +285,9 @@ class MemoryCompressor:
         self,
         query_text: str,
     ) -> Vector:
-        vectors = self._embedder.embed([query_text])
+        # Shared in-memory query LRU when available (see Embedder.embed_queries).
+        embed = getattr(self._embedder, "embed_queries", self._embedder.embed)
+        vectors = embed([query_text])
         vector = vectors[0]
 
         if hasattr(vector, "tolist"):
@@ -50,10 +50,11 @@ class MemoryVectorStore:
 
         Path(self.persist_dir).mkdir(parents=True, exist_ok=True)
 
-        import chromadb
+        from ragstream.ingestion.chroma_client_registry import get_client, get_collection
 
-        self._client = chromadb.PersistentClient(path=self.persist_dir)
-        self._collection = self._client.get_or_create_collection(name=self.collection_name)
+        # Shared, long-lived client/collection per path (chroma_client_registry).
+        self._client = get_client(self.persist_dir)
+        self._collection = get_collection(self.persist_dir, self.collection_name)
 
         logger(
             f"MemoryVectorStore ready: {self.persist_dir} | collection={self.collection_name}",
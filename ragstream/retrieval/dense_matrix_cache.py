@@ -0,0 +1,242 @@
+# dense_matrix_cache.py
+# -*- coding: utf-8 -*-
+"""
+dense_matrix_cache.py
+
+Purpose:
+    Process-wide, per-project cache of the dense document matrix used by
+    RetrieverEmb.
+
+What is cached per project:
+    - ids:        chunk ids in matrix row order
+    - metadatas:  chunk metadata dicts in matrix row order
+    - matrix:     L2-normalized embeddings, shape [N, D], stored as
+                  float32 (default), float16, or int8 with one float32
+                  scale per row (see "Precision" below)
+
+Precision:
+    - The stored precision is chosen per get(...) call ("float32", "float16",
+      "int8"); an entry loaded with another precision counts as stale.
+    - float16 halves and int8 quarters the resident size (1536-dim:
+      6 KB -> 3 KB / 1.5 KB per chunk). Quantized matrices are meant for a
+      first-pass similarity only; RetrieverEmb rescores the top candidates
+      exactly from full-precision vectors loaded from the store on demand.
+    - int8 rows are symmetric per-row quantized: row ~= q * scale with
+      scale = max|row| / 127.
+    - rows_float32(...) dequantizes a block of rows, so callers can feed
+      BLAS in float32 without materializing the whole matrix.
+
+Invalidation:
+    - Each entry remembers the store generation it was built for
+      (see ragstream.ingestion.store_generation).
+    - IngestionManager.run(...) bumps that generation after publishing a new
+      manifest, so the next query reloads the project from Chroma.
+
+Important design rule:
+    - This module does not talk to Chroma itself. The caller passes a loader
+      callable, so RetrieverEmb keeps ownership of store access and validation.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from ragstream.ingestion.store_generation import current_generation, store_key
+
+# Raw loader result: (ids, metadatas, embeddings [N, D])
+DenseLoadResult = Tuple[List[str], List[Dict[str, Any]], Any]
+
+# Stored matrix precisions.
+PRECISION_FLOAT32 = "float32"
+PRECISION_FLOAT16 = "float16"
+PRECISION_INT8 = "int8"
+DENSE_PRECISIONS = (PRECISION_FLOAT32, PRECISION_FLOAT16, PRECISION_INT8)
+
+# Largest int8 magnitude used by the symmetric per-row quantization.
+_INT8_MAX = 127.0
+
+
+@dataclass(frozen=True)
+class DenseMatrix:
+    """One resident project matrix, ready for a single matmul per query."""
+    generation: int
+    ids: List[str]
+    metadatas: List[Dict[str, Any]]
+    matrix: np.ndarray
+
+    # Storage precision of matrix; scales holds the per-row int8 scale.
+    precision: str = PRECISION_FLOAT32
+    scales: np.ndarray | None = field(default=None, compare=False, repr=False)
+
+    # Structures derived from this exact matrix (e.g. ANN views), built on
+    # first use and dropped together with the entry on invalidation.
+    derived: Dict[str, Any] = field(default_factory=dict, compare=False, repr=False)
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    @property
+    def is_quantized(self) -> bool:
+        return self.precision != PRECISION_FLOAT32
+
+    def rows_float32(self, rows: slice | np.ndarray) -> np.ndarray:
+        """
+        Return the selected rows as float32 (dequantized when needed).
+        """
+        block = self.matrix[rows]
+        if not self.is_quantized:
+            return block
+        block = block.astype(np.float32)
+        if self.scales is not None:
+            block *= self.scales[rows][:, None]
+        return block
+
+
+class DenseMatrixCache:
+    """
+    Thread-safe cache of DenseMatrix entries keyed by project persist dir.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, DenseMatrix] = {}
+
+        # One load lock per project so a slow load of one project never
+        # blocks queries against another one.
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def get(
+        self,
+        persist_dir: str | Path,
+        loader: Callable[[], DenseLoadResult],
+        *,
+        precision: str = PRECISION_FLOAT32,
+    ) -> DenseMatrix:
+        """
+        Return the cached matrix for persist_dir, loading it when missing or stale.
+
+        precision selects how the matrix is held in RAM ("float32", "float16"
+        or "int8"); switching precision for a project reloads it.
+        """
+        if precision not in DENSE_PRECISIONS:
+            raise ValueError(f"DenseMatrixCache.get: unsupported precision: {precision!r}")
+
+        key = store_key(persist_dir)
+
+        entry = self._fresh_entry(key, precision)
+        if entry is not None:
+            return entry
+
+        with self._load_lock(key):
+            # Another thread may have finished the load while we waited.
+            entry = self._fresh_entry(key, precision)
+            if entry is not None:
+                return entry
+
+            generation = current_generation(key)
+            ids, metadatas, embeddings = loader()
+            matrix, scales = self._quantize(self._normalize_rows(embeddings), precision)
+            entry = DenseMatrix(
+                generation=generation,
+                ids=[str(chunk_id) for chunk_id in ids],
+                metadatas=[dict(meta or {}) for meta in metadatas],
+                matrix=matrix,
+                precision=precision,
+                scales=scales,
+            )
+
+            with self._lock:
+                self._entries[key] = entry
+            return entry
+
+    def derived(
+        self,
+        entry: DenseMatrix,
+        name: str,
+        factory: Callable[[DenseMatrix], Any],
+    ) -> Any:
+        """
+        Return a structure derived from one cached entry, building it once.
+
+        Derived values share the lifetime of their entry, so a generation bump
+        rebuilds them together with the matrix.
+        """
+        with self._lock:
+            if name in entry.derived:
+                return entry.derived[name]
+
+        value = factory(entry)
+
+        with self._lock:
+            return entry.derived.setdefault(name, value)
+
+    def invalidate(self, persist_dir: str | Path | None = None) -> None:
+        """
+        Drop one project entry, or all entries when persist_dir is None.
+        """
+        with self._lock:
+            if persist_dir is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(store_key(persist_dir), None)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _fresh_entry(self, key: str, precision: str) -> DenseMatrix | None:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry.precision != precision or entry.generation != current_generation(key):
+            return None
+        return entry
+
+    def _load_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            lock = self._load_locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self._load_locks[key] = lock
+            return lock
+
+    @staticmethod
+    def _normalize_rows(embeddings: Any) -> np.ndarray:
+        """
+        Convert embeddings to float32 and L2-normalize every row once.
+        """
+        A = np.asarray(embeddings, dtype=np.float32)
+        if A.ndim != 2:
+            raise RuntimeError(
+                "DenseMatrixCache: expected a 2D embedding matrix, "
+                f"got shape {A.shape}"
+            )
+        A = A / (np.linalg.norm(A, axis=1, keepdims=True) + 1e-12)
+        return np.ascontiguousarray(A, dtype=np.float32)
+
+    @staticmethod
+    def _quantize(A: np.ndarray, precision: str) -> Tuple[np.ndarray, np.ndarray | None]:
+        """
+        Convert a normalized float32 matrix to the stored precision.
+
+        Returns (matrix, per-row scales or None).
+        """
+        if precision == PRECISION_FLOAT16:
+            return np.ascontiguousarray(A, dtype=np.float16), None
+
+        if precision == PRECISION_INT8:
+            scales = np.abs(A).max(axis=1) / _INT8_MAX if A.size else np.zeros(A.shape[0], dtype=np.float32)
+            scales = np.where(scales > 0.0, scales, 1.0).astype(np.float32)
+            Q = np.rint(A / scales[:, None]).astype(np.int8)
+            return np.ascontiguousarray(Q), scales
+
+        return A, None
+
+
+# Shared process-wide instance used by RetrieverEmb.
+DENSE_MATRIX_CACHE = DenseMatrixCache()
@@ -14,6 +14,8 @@ Design:
     - Merge both branches with deterministic RRF.
     - Keep hydration and SuperPrompt write-back in this file.
     - Preserve the current external Retriever.run(...) contract.
+    - Retriever.run_batch(...) gives the same per-prompt result for many
+      SuperPrompts, with one shared dense embedding + matrix product.
 
 Current flow inside Retriever.run(...):
     1) PreProcessing
@@ -23,6 +25,9 @@ Current flow inside Retriever.run(...):
        - run the dense embedding-based retrieval backend
     3) Retriever_SPLADE
        - score exactly the dense-selected candidate IDs
+       - or, with document_retrieval.candidate_mode = "union", let SPLADE
+         return its own top-k from the inverted index, union both candidate
+         sets and score the union in both branches
     4) RRF_Merger
        - fuse both ranked lists deterministically
     5) PostProcessing
@@ -35,17 +40,29 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
+from chromadb.errors import ChromaError
+
 from ragstream.ingestion.chunker import Chunker
 from ragstream.ingestion.embedder import Embedder
+from ragstream.ingestion.vector_store_chroma import VectorStoreChroma
+from ragstream.ingestion.splade_backend import create_splade_embedder
 from ragstream.ingestion.splade_embedder import SpladeEmbedder
 from ragstream.orchestration.super_prompt import A3ChunkStatus, SuperPrompt
 from ragstream.orchestration.superprompt_projector import SuperPromptProjector
 from ragstream.retrieval.chunk import Chunk
+from ragstream.retrieval.dense_matrix_cache import PRECISION_FLOAT32
 from ragstream.retrieval.doc_score import DocScore  # compatibility re-export
-from ragstream.retrieval.retriever_emb import RetrieverEmb
+from ragstream.retrieval.retriever_emb import (
+    DEFAULT_ANN_N_PROBE,
+    DEFAULT_ANN_SHORTLIST_PER_PIECE,
+    DEFAULT_RESCORE_CANDIDATES,
+    SEARCH_MODE_EXACT,
+    RetrieverEmb,
+)
 from ragstream.retrieval.retriever_splade import RetrieverSplade
 from ragstream.retrieval.rrf_merger import rrf_merge
 from ragstream.retrieval.smart_query_splitter import split_query_into_pieces
+from ragstream.textforge.RagLog import LogALL as logger
 
 
 # Keep old import compatibility:
@@ -62,6 +79,12 @@ RankedRow = Tuple[str, float, Dict[str, Any]]
 DEFAULT_QUERY_CHUNK_SIZE = 1200
 DEFAULT_QUERY_OVERLAP = 120
 
+# Candidate generation modes (runtime_config document_retrieval.candidate_mode).
+# - "dense": SPLADE only re-scores the dense candidates (default).
+# - "union": SPLADE also generates candidates; both branches score the union.
+CANDIDATE_MODE_DENSE = "dense"
+CANDIDATE_MODE_UNION = "union"
+
 
 class Retriever:
     """
@@ -109,10 +132,20 @@ class Retriever:
         # Keep the chunk class explicit so hydration remains readable and testable.
         self.chunk_cls = Chunk
 
-        # Dense backend remains unchanged and independent.
+        # Dense backend remains independent; the search mode is a runtime option.
+        document_retrieval_config = self.runtime_config.get("document_retrieval", {}) or {}
         self.retriever_emb = RetrieverEmb(
             chroma_root=str(self.chroma_root),
             embedder=self.embedder,
+            search_mode=str(document_retrieval_config.get("dense_search_mode", SEARCH_MODE_EXACT)),
+            ann_n_probe=int(document_retrieval_config.get("ann_n_probe", DEFAULT_ANN_N_PROBE)),
+            ann_shortlist_per_piece=int(
+                document_retrieval_config.get("ann_shortlist_per_piece", DEFAULT_ANN_SHORTLIST_PER_PIECE)
+            ),
+            dense_precision=str(document_retrieval_config.get("dense_precision", PRECISION_FLOAT32)),
+            rescore_candidates=int(
+                document_retrieval_config.get("dense_rescore_candidates", DEFAULT_RESCORE_CANDIDATES)
+            ),
         )
 
         # Lazy init for SPLADE so app startup does not immediately load the sparse model.
@@ -152,11 +185,84 @@ class Retriever:
             top_k=top_k,
         )
 
+        ranked_rows = self._merge_branches(
+            project_name=project_name,
+            query_pieces=query_pieces,
+            top_k=top_k,
+            ranked_rows_emb=ranked_rows_emb,
+            use_retrieval_splade=use_retrieval_splade,
+        )
+
+        sp = self._postprocess(sp, ranked_rows, project_name)
+        return sp
+
+    def run_batch(
+        self,
+        sps: List[SuperPrompt],
+        project_name: str,
+        top_k: int,
+        *,
+        use_retrieval_splade: bool = True,
+    ) -> List[SuperPrompt]:
+        """
+        Execute the Retrieval stage for many SuperPrompts in one pass.
+
+        Same result per SuperPrompt as calling run(...) in a loop, but the
+        dense branch embeds all query pieces together and scores them with one
+        matrix product (RetrieverEmb.run_batch). SPLADE, RRF and hydration
+        still run per prompt.
+
+        Returns:
+            The same SuperPrompt instances, each mutated in place.
+        """
+        query_pieces_batch = [self._preprocess(sp) for sp in sps]
+
+        ranked_rows_emb_batch = self.retriever_emb.run_batch(
+            project_name=project_name,
+            query_pieces_batch=query_pieces_batch,
+            top_k=top_k,
+        )
+
+        for sp, query_pieces, ranked_rows_emb in zip(sps, query_pieces_batch, ranked_rows_emb_batch):
+            ranked_rows = self._merge_branches(
+                project_name=project_name,
+                query_pieces=query_pieces,
+                top_k=top_k,
+                ranked_rows_emb=ranked_rows_emb,
+                use_retrieval_splade=use_retrieval_splade,
+            )
+            self._postprocess(sp, ranked_rows, project_name)
+
+        return sps
+
+    # -----------------------------------------------------------------
+    # Stage-level orchestration helpers
+    # -----------------------------------------------------------------
+
+    def _merge_branches(
+        self,
+        *,
+        project_name: str,
+        query_pieces: List[str],
+        top_k: int,
+        ranked_rows_emb: List[RankedRow],
+        use_retrieval_splade: bool,
+    ) -> List[RankedRow]:
+        """
+        Hard floor → Retriever_SPLADE (or dense passthrough clone) → RRF_Merger.
+        """
         ranked_rows_emb = self._apply_hard_embedding_floor(ranked_rows_emb)
 
         ranked_rows_splade: List[RankedRow]
 
-        if use_retrieval_splade and ranked_rows_emb:
+        if use_retrieval_splade and self._candidate_mode() == CANDIDATE_MODE_UNION:
+            ranked_rows_emb, ranked_rows_splade = self._score_candidate_union(
+                project_name=project_name,
+                query_pieces=query_pieces,
+                top_k=top_k,
+                ranked_rows_emb=ranked_rows_emb,
+            )
+        elif use_retrieval_splade and ranked_rows_emb:
             candidate_ids = [str(chunk_id) for chunk_id, _score, _meta in ranked_rows_emb]
 
             try:
@@ -185,14 +291,7 @@ class Retriever:
             weight_b=0.25,
         )
 
-        ranked_rows = self._project_rrf_metadata_to_retrieval_contract(ranked_rows)
-
-        sp = self._postprocess(sp, ranked_rows)
-        return sp
-
-    # -----------------------------------------------------------------
-    # Stage-level orchestration helpers
-    # -----------------------------------------------------------------
+        return self._project_rrf_metadata_to_retrieval_contract(ranked_rows)
 
     def _preprocess(self, sp: SuperPrompt) -> List[str]:
         """
@@ -213,7 +312,12 @@ class Retriever:
 
         return query_pieces
 
-    def _postprocess(self, sp: SuperPrompt, ranked_rows: List[RankedRow]) -> SuperPrompt:
+    def _postprocess(
+        self,
+        sp: SuperPrompt,
+        ranked_rows: List[RankedRow],
+        project_name: str | None = None,
+    ) -> SuperPrompt:
         """
         Complete the Retrieval stage after the backend retrievers have finished.
 
@@ -221,7 +325,7 @@ class Retriever:
         - hydrate ranked rows into real Chunk objects
         - write the fused retrieval result into SuperPrompt
         """
-        valid_ranked_rows, hydrated_chunks = self._hydrate_ranked_chunks(ranked_rows)
+        valid_ranked_rows, hydrated_chunks = self._hydrate_ranked_chunks(ranked_rows, project_name)
         self._write_stage_to_superprompt(sp, valid_ranked_rows, hydrated_chunks)
         return sp
 
@@ -231,7 +335,8 @@ class Retriever:
         """
         if self._retriever_splade is None:
             if self._splade_embedder is None:
-                self._splade_embedder = SpladeEmbedder(device="cpu")
+                # Backend (torch / ONNX / int8 ONNX / auto) comes from runtime_config "splade".
+                self._splade_embedder = create_splade_embedder(self.runtime_config.get("splade"), device="cpu")
 
             self._retriever_splade = RetrieverSplade(
                 splade_root=str(self.splade_root),
@@ -240,10 +345,73 @@ class Retriever:
 
         return self._retriever_splade
 
+    def _score_candidate_union(
+        self,
+        *,
+        project_name: str,
+        query_pieces: List[str],
+        top_k: int,
+        ranked_rows_emb: List[RankedRow],
+    ) -> Tuple[List[RankedRow], List[RankedRow]]:
+        """
+        Union candidate mode: dense top-k ∪ SPLADE top-k, scored by both branches.
+
+        - The hard embedding floor has already been applied to the dense
+          candidates; SPLADE-only candidates are lexical hits the dense branch
+          missed, so the union scores are not floored again.
+        - Without a SPLADE store the dense candidates are returned unchanged
+          and the SPLADE list is empty (same fallback as the default mode).
+        """
+        document_retrieval_config = self.runtime_config.get("document_retrieval", {}) or {}
+        sparse_top_k = int(document_retrieval_config.get("sparse_candidate_top_k", 0) or 0)
+        if sparse_top_k <= 0:
+            sparse_top_k = top_k
+
+        try:
+            retriever_splade = self._get_retriever_splade()
+            sparse_candidates = retriever_splade.run(
+                project_name=project_name,
+                query_pieces=query_pieces,
+                top_k=sparse_top_k,
+            )
+        except FileNotFoundError:
+            return ranked_rows_emb, []
+
+        union_ids = list(dict.fromkeys(
+            [str(chunk_id) for chunk_id, _score, _meta in ranked_rows_emb]
+            + [str(chunk_id) for chunk_id, _score, _meta in sparse_candidates]
+        ))
+        if not union_ids:
+            return [], []
+
+        union_rows_emb = self.retriever_emb.run(
+            project_name=project_name,
+            query_pieces=query_pieces,
+            top_k=len(union_ids),
+            candidate_ids=union_ids,
+        )
+        union_rows_splade = retriever_splade.run(
+            project_name=project_name,
+            query_pieces=query_pieces,
+            top_k=len(union_ids),
+            candidate_ids=union_ids,
+        )
+        return union_rows_emb, union_rows_splade
+
     # -----------------------------------------------------------------
     # Internal helpers kept in retriever.py
     # -----------------------------------------------------------------
 
+    def _candidate_mode(self) -> str:
+        """
+        Return the configured candidate generation mode ("dense" or "union").
+        """
+        document_retrieval_config = self.runtime_config.get("document_retrieval", {}) or {}
+        mode = str(document_retrieval_config.get("candidate_mode", CANDIDATE_MODE_DENSE) or "").strip().lower()
+        if mode not in (CANDIDATE_MODE_DENSE, CANDIDATE_MODE_UNION):
+            raise ValueError(f"Retriever: unsupported candidate_mode {mode!r}")
+        return mode
+
     def _apply_hard_embedding_floor(
         self,
         ranked_rows_emb: List[RankedRow],
@@ -315,18 +483,22 @@ class Retriever:
     def _hydrate_ranked_chunks(
         self,
         ranked_rows: List[RankedRow],
+        project_name: str | None = None,
     ) -> tuple[List[RankedRow], List[Chunk]]:
         """
         Reconstruct real Chunk objects for the selected ranked rows.
 
-        Why reconstruction is needed:
-        - Vector stores keep vectors + metadata only.
-        - The actual chunk text must therefore be rebuilt from doc_raw
-          using the same chunker and the stored chunk_idx.
+        Where the chunk text comes from (first match wins):
+        - the chunk text stored as Chroma document at ingestion time
+          (one get-by-ids call for all rows; no file reads, no re-chunking)
+        - the stored span_start/span_end applied to the raw source file
+        - re-chunking the raw source file with the fixed chunker and the
+          stored chunk_idx (projects ingested before texts/spans were stored)
 
         Important robustness rule:
-        - If one retrieved row points to a stale or broken source file,
-          we skip that row instead of crashing the whole Retrieval stage.
+        - A stored chunk text is used even when the raw source file is gone.
+        - If a row has no stored text and points to a stale or broken source
+          file, we skip that row instead of crashing the whole Retrieval stage.
 
         Returns:
             (valid_ranked_rows, hydrated_chunks)
@@ -339,6 +511,11 @@ class Retriever:
         valid_ranked_rows: List[RankedRow] = []
         hydrated: List[Chunk] = []
 
+        stored_texts = self._load_stored_chunk_texts(
+            project_name,
+            [str(chunk_id) for chunk_id, _score, _meta in ranked_rows],
+        )
+
         # Local caches avoid re-reading and re-splitting the same source file
         # when several retrieved chunks come from that file.
         text_cache: Dict[str, str] = {}
@@ -353,20 +530,61 @@ class Retriever:
             if not rel_path:
                 continue
 
-            raw_path = self.doc_root / rel_path
-            if not raw_path.exists():
-                continue
-
             chunk_idx_raw = meta.get("chunk_idx")
             if chunk_idx_raw is None:
                 continue
 
             chunk_idx = int(chunk_idx_raw)
+            has_span = meta.get("span_start") is not None and meta.get("span_end") is not None
+
+            snippet = stored_texts.get(str(chunk_id), "").strip()
+            if snippet:
+                if has_span:
+                    span = (int(meta["span_start"]), int(meta["span_end"]))
+                else:
+                    span = (chunk_idx * step, chunk_idx * step + len(snippet))
+
+                valid_ranked_rows.append((chunk_id, float(score), dict(meta)))
+                hydrated.append(
+                    self.chunk_cls(
+                        id=chunk_id,
+                        source=rel_path,
+                        snippet=snippet,
+                        span=span,
+                        meta=dict(meta),
+                    )
+                )
+                continue
+
+            raw_path = self.doc_root / rel_path
+            if not raw_path.exists():
+                continue
 
             cache_key = raw_path.as_posix()
             if cache_key not in text_cache:
                 text_cache[cache_key] = raw_path.read_text(encoding="utf-8", errors="ignore")
 
+            source_text = text_cache[cache_key]
+
+            if has_span:
+                start = int(meta["span_start"])
+                end = min(int(meta["span_end"]), len(source_text))
+                snippet = source_text[start:end].strip()
+                if not snippet:
+                    continue
+
+                valid_ranked_rows.append((chunk_id, float(score), dict(meta)))
+                hydrated.append(
+                    self.chunk_cls(
+                        id=chunk_id,
+                        source=rel_path,
+                        snippet=snippet,
+                        span=(start, end),
+                        meta=dict(meta),
+                    )
+                )
+                continue
+
             if cache_key not in split_cache:
                 split_cache[cache_key] = self.chunker.split(
                     file_path=str(raw_path),
@@ -381,7 +599,6 @@ class Retriever:
 
             _fp, snippet = all_chunks_for_file[chunk_idx]
 
-            source_text = text_cache[cache_key]
             start = chunk_idx * step
             end = min(start + DEFAULT_QUERY_CHUNK_SIZE, len(source_text))
 
@@ -398,6 +615,36 @@ class Retriever:
 
         return valid_ranked_rows, hydrated
 
+    def _load_stored_chunk_texts(
+        self,
+        project_name: str | None,
+        chunk_ids: List[str],
+    ) -> Dict[str, str]:
+        """
+        Fetch the chunk texts stored at ingestion time for the given ids.
+
+        Returns an empty dict when there is no project / dense store, or when
+        Chroma reports an error (logged); hydration then falls back to the raw
+        source files.
+        """
+        if not project_name or not chunk_ids:
+            return {}
+
+        project_db_dir = self.chroma_root / project_name
+        if not project_db_dir.exists():
+            return {}
+
+        try:
+            store = VectorStoreChroma(persist_dir=str(project_db_dir))
+            return store.get_documents(chunk_ids)
+        except (ChromaError, ValueError) as e:
+            logger(
+                f"Retriever: stored chunk texts unavailable, reading source files instead: {e}",
+                "WARN",
+                "INTERNAL",
+            )
+            return {}
+
     def _write_stage_to_superprompt(
             self,
             sp: SuperPrompt,
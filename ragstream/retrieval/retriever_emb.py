@@ -11,9 +11,21 @@ Scope of this file:
         * project_name
         * query_pieces
         * top_k
-    - Open the active project's Chroma document store.
+        * optional candidate_ids
+    - Read the active project's pre-normalized dense matrix from the
+      process-wide DENSE_MATRIX_CACHE (loaded from Chroma only on first use
+      or after ingestion bumped the store generation).
     - Compare every stored chunk embedding against all query-piece embeddings.
     - Aggregate per-chunk similarities with p-norm averaging.
+    - Optional "ann" mode: shortlist rows per query piece from the IVF index
+      built at ingestion time (see ragstream.ingestion.ann_index), then run
+      the same exact p-norm aggregation over the union of the shortlists.
+    - With candidate_ids, score exactly those chunks (e.g. the dense + sparse
+      candidate union built by Retriever) instead of searching.
+    - Optional quantized matrix ("float16" / "int8" dense_precision): the
+      first pass runs on the quantized rows, then the best
+      rescore_candidates rows are rescored exactly from full-precision
+      vectors loaded from Chroma on demand.
     - Return ranked retrieval rows to the top-level Retriever stage.
 
 Important design rule:
@@ -29,13 +41,23 @@ Stage-1 refactor goal:
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Sequence, Tuple
 
 import numpy as np
 
+from ragstream.ingestion.ann_index import IvfIndex, ivf_index_path, load_ivf_index
 from ragstream.ingestion.embedder import Embedder
 from ragstream.ingestion.vector_store_chroma import VectorStoreChroma
+from ragstream.retrieval.dense_matrix_cache import (
+    DENSE_MATRIX_CACHE,
+    DENSE_PRECISIONS,
+    PRECISION_FLOAT32,
+    DenseLoadResult,
+    DenseMatrix,
+)
+from ragstream.retrieval.score_selection import select_top_k
 
 # Ranked row returned to Retriever:
 # (chunk_id, retrieval_score, metadata)
@@ -48,6 +70,31 @@ DEFAULT_TOP_K = 100
 # p-value for p-norm averaging across query pieces.
 DEFAULT_P_NORM = 10
 
+# Dense search modes:
+# - "exact": score every stored chunk (default, current behavior)
+# - "ann":   shortlist per query piece from the IVF index built at ingestion,
+#            then run the exact p-norm aggregation over the shortlist union
+SEARCH_MODE_EXACT = "exact"
+SEARCH_MODE_ANN = "ann"
+
+# ANN defaults: inverted lists visited and rows kept per query piece.
+DEFAULT_ANN_N_PROBE = 8
+DEFAULT_ANN_SHORTLIST_PER_PIECE = 200
+
+# Quantized first pass: rows rescored exactly per query (at least top_k).
+DEFAULT_RESCORE_CANDIDATES = 400
+
+# Rows dequantized to float32 per matmul block in the quantized first pass.
+_DEQUANT_BLOCK_ROWS = 4096
+
+
+@dataclass(frozen=True)
+class _AnnView:
+    """IVF index remapped onto the row order of one cached DenseMatrix."""
+    index: IvfIndex
+    member_rows: np.ndarray     # list members as matrix rows (-1 = no longer stored)
+    unindexed_rows: np.ndarray  # matrix rows the index does not cover yet
+
 
 class RetrieverEmb:
     """
@@ -59,7 +106,17 @@ class RetrieverEmb:
     - Return ranked rows to the top-level Retriever.
     """
 
-    def __init__(self, *, chroma_root: str, embedder: Embedder) -> None:
+    def __init__(
+        self,
+        *,
+        chroma_root: str,
+        embedder: Embedder,
+        search_mode: str = SEARCH_MODE_EXACT,
+        ann_n_probe: int = DEFAULT_ANN_N_PROBE,
+        ann_shortlist_per_piece: int = DEFAULT_ANN_SHORTLIST_PER_PIECE,
+        dense_precision: str = PRECISION_FLOAT32,
+        rescore_candidates: int = DEFAULT_RESCORE_CANDIDATES,
+    ) -> None:
         """
         Initialize the embedding-based retrieval backend.
 
@@ -68,11 +125,44 @@ class RetrieverEmb:
                 Absolute path to the chroma_db root folder.
             embedder:
                 Shared Embedder instance used to embed the query pieces.
+            search_mode:
+                "exact" (brute force) or "ann" (IVF shortlist + exact rescoring).
+                "ann" silently falls back to "exact" when a project has no index.
+            ann_n_probe:
+                Number of IVF lists probed per query piece in "ann" mode.
+            ann_shortlist_per_piece:
+                Rows kept per query piece before the exact p-norm aggregation.
+            dense_precision:
+                Resident matrix precision: "float32" (exact, default),
+                "float16" or "int8" (quantized first pass + exact rescoring).
+            rescore_candidates:
+                Rows rescored from full-precision vectors per query when the
+                matrix is quantized (never fewer than top_k).
         """
+        search_mode = (search_mode or SEARCH_MODE_EXACT).strip().lower()
+        if search_mode not in {SEARCH_MODE_EXACT, SEARCH_MODE_ANN}:
+            raise ValueError(f"RetrieverEmb: unsupported search_mode: {search_mode!r}")
+
+        dense_precision = (dense_precision or PRECISION_FLOAT32).strip().lower()
+        if dense_precision not in DENSE_PRECISIONS:
+            raise ValueError(f"RetrieverEmb: unsupported dense_precision: {dense_precision!r}")
+
         self.chroma_root = Path(chroma_root).resolve()
         self.embedder = embedder
-
-    def run(self, *, project_name: str, query_pieces: List[str], top_k: int) -> List[RankedRow]:
+        self.search_mode = search_mode
+        self.ann_n_probe = max(1, int(ann_n_probe))
+        self.ann_shortlist_per_piece = max(1, int(ann_shortlist_per_piece))
+        self.dense_precision = dense_precision
+        self.rescore_candidates = max(1, int(rescore_candidates))
+
+    def run(
+        self,
+        *,
+        project_name: str,
+        query_pieces: List[str],
+        top_k: int,
+        candidate_ids: List[str] | None = None,
+    ) -> List[RankedRow]:
         """
         Execute the current embedding-based retrieval backend.
 
@@ -83,6 +173,10 @@ class RetrieverEmb:
                 Pre-split retrieval query pieces.
             top_k:
                 Number of chunks to keep after ranking.
+            candidate_ids:
+                Optional fixed candidate set. When provided, every candidate that
+                exists in the dense store is scored and returned (no top-k cut);
+                ids unknown to the dense store are skipped.
 
         Returns:
             Ranked retrieval rows in this format:
@@ -95,26 +189,343 @@ class RetrieverEmb:
         - Local validation belongs here, at the lower level.
         - The top-level Retriever.run(...) stays visually simple.
         """
+        project_db_dir = self._project_db_dir(project_name, "run")
+
+        if not query_pieces:
+            return []
+
+        k = int(top_k) if int(top_k) > 0 else DEFAULT_TOP_K
+
+        dense = self._dense_matrix(project_db_dir)
+
+        if dense.size == 0:
+            return []
+
+        query_vectors = self._embed_queries(query_pieces)
+
+        if len(query_vectors) == 0:
+            return []
+
+        Q_norm = self._normalized_queries(dense, query_vectors)
+
+        candidate_rows = None
+        if candidate_ids is not None:
+            candidate_rows = self._fixed_candidate_rows(dense, candidate_ids)
+            if candidate_rows.size == 0:
+                return []
+            k = int(candidate_rows.size)
+        elif self.search_mode == SEARCH_MODE_ANN:
+            candidate_rows = self._ann_candidate_rows(dense, project_db_dir, Q_norm)
+
+        return self._rank_candidates(dense, project_db_dir, candidate_rows, Q_norm, k)
+
+    def run_batch(
+        self,
+        *,
+        project_name: str,
+        query_pieces_batch: List[List[str]],
+        top_k: int,
+    ) -> List[List[RankedRow]]:
+        """
+        Same as calling run(...) once per entry of query_pieces_batch, in one pass.
+
+        - All query pieces of all prompts are embedded in one embed_queries call
+          (the Embedder batches the API requests).
+        - Exact mode: one [N, D] x [D, sum(M)] product; each prompt's columns
+          are then aggregated and ranked separately.
+        - ANN mode: shortlists are per prompt, so only the embedding is shared.
+
+        Returns:
+            One ranked row list per prompt, identical to sequential run(...) calls.
+        """
+        project_db_dir = self._project_db_dir(project_name, "run_batch")
+
+        results: List[List[RankedRow]] = [[] for _ in query_pieces_batch]
+        k = int(top_k) if int(top_k) > 0 else DEFAULT_TOP_K
+
+        flat_pieces = [piece for pieces in query_pieces_batch for piece in pieces]
+        if not flat_pieces:
+            return results
+
+        dense = self._dense_matrix(project_db_dir)
+        if dense.size == 0:
+            return results
+
+        query_vectors = self._embed_queries(flat_pieces)
+        if len(query_vectors) != len(flat_pieces):
+            raise RuntimeError("RetrieverEmb.run_batch: embedder returned a different number of vectors")
+
+        Q_norm_all = self._normalized_queries(dense, query_vectors)
+
+        all_sims = None
+        if self.search_mode != SEARCH_MODE_ANN:
+            all_sims = self._matrix_similarities(dense, Q_norm_all)   # [N, sum(M)]
+
+        start = 0
+        for batch_pos, pieces in enumerate(query_pieces_batch):
+            end = start + len(pieces)
+            if end > start:
+                Q_norm = Q_norm_all[start:end]
+                if all_sims is None:
+                    candidate_rows = self._ann_candidate_rows(dense, project_db_dir, Q_norm)
+                    results[batch_pos] = self._rank_candidates(dense, project_db_dir, candidate_rows, Q_norm, k)
+                else:
+                    sims = np.ascontiguousarray(all_sims[:, start:end])
+                    results[batch_pos] = self._rank_candidates(dense, project_db_dir, None, Q_norm, k, sims=sims)
+            start = end
+
+        return results
+
+    def _embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed query pieces through the shared query LRU when the embedder has one.
+        """
+        embed = getattr(self.embedder, "embed_queries", self.embedder.embed)
+        return embed(texts)
+
+    def _project_db_dir(self, project_name: str, caller: str) -> Path:
+        """
+        Validate project_name and return its existing Chroma directory.
+        """
         project_name = (project_name or "").strip()
         if not project_name:
-            raise ValueError("RetrieverEmb.run: project_name must not be empty")
+            raise ValueError(f"RetrieverEmb.{caller}: project_name must not be empty")
 
         if not self.chroma_root.exists():
             raise FileNotFoundError(
-                f"RetrieverEmb.run: chroma_root does not exist: {self.chroma_root}"
+                f"RetrieverEmb.{caller}: chroma_root does not exist: {self.chroma_root}"
             )
 
         project_db_dir = self.chroma_root / project_name
         if not project_db_dir.exists():
             raise FileNotFoundError(
-                f"RetrieverEmb.run: active project Chroma DB does not exist: {project_db_dir}"
+                f"RetrieverEmb.{caller}: active project Chroma DB does not exist: {project_db_dir}"
             )
+        return project_db_dir
 
-        if not query_pieces:
-            return []
+    def _dense_matrix(self, project_db_dir: Path) -> DenseMatrix:
+        """
+        Return the project's resident matrix in the configured precision.
+        """
+        return DENSE_MATRIX_CACHE.get(
+            project_db_dir,
+            lambda: self._load_project_matrix(project_db_dir),
+            precision=self.dense_precision,
+        )
+
+    @staticmethod
+    def _normalized_queries(dense: DenseMatrix, query_vectors: List[List[float]]) -> np.ndarray:
+        """
+        Validate query vectors against the stored matrix and L2-normalize them row-wise.
+        """
+        Q = np.asarray(query_vectors, dtype=np.float32)   # query pieces:  [M, D]
 
-        k = int(top_k) if int(top_k) > 0 else DEFAULT_TOP_K
+        if Q.ndim != 2:
+            raise RuntimeError(
+                "RetrieverEmb.run: unexpected embedding dimensions returned by OpenAI"
+            )
+
+        if dense.matrix.shape[1] != Q.shape[1]:
+            raise RuntimeError(
+                "RetrieverEmb.run: stored vectors and query vectors have different dimensions"
+            )
+
+        # Stored rows are already normalized by the cache, so cosine similarity
+        # is a single matrix product once the query pieces are normalized.
+        return Q / (np.linalg.norm(Q, axis=1, keepdims=True) + 1e-12)
+
+    @staticmethod
+    def _similarities(A_norm: np.ndarray, Q_norm: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarities [N_chunks, M_query_pieces].
+
+        BLAS computes a single query column with a different kernel (gemv) than
+        several columns (gemm), which changes the last bits of the scores. A
+        single column is therefore duplicated, so every product takes the gemm
+        path and batched and per-prompt scores are bit-identical.
+        """
+        if Q_norm.shape[0] == 1:
+            return (A_norm @ np.vstack([Q_norm, Q_norm]).T)[:, :1]
+        return A_norm @ Q_norm.T
+
+    @classmethod
+    def _matrix_similarities(
+        cls,
+        dense: DenseMatrix,
+        Q_norm: np.ndarray,
+        rows: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """
+        Similarities of the stored rows (None = all rows) against Q_norm.
+
+        A quantized matrix is dequantized block by block, so the product
+        still runs in float32 BLAS while only one block is expanded at a time.
+        """
+        if not dense.is_quantized:
+            return cls._similarities(dense.matrix if rows is None else dense.matrix[rows], Q_norm)
+
+        n_rows = dense.size if rows is None else int(rows.size)
+        sims = np.empty((n_rows, Q_norm.shape[0]), dtype=np.float32)
+        for start in range(0, n_rows, _DEQUANT_BLOCK_ROWS):
+            end = min(start + _DEQUANT_BLOCK_ROWS, n_rows)
+            block = slice(start, end) if rows is None else rows[start:end]
+            sims[start:end] = cls._similarities(dense.rows_float32(block), Q_norm)
+        return sims
+
+    @staticmethod
+    def _aggregate(sims: np.ndarray) -> np.ndarray:
+        """
+        p-mean aggregation over the query-piece axis.
+
+        Strongly favors the best match, but is still not pure max.
+        """
+        p = DEFAULT_P_NORM
+        sims_pos = np.clip(sims, 0.0, None)
+        return np.power(np.mean(np.power(sims_pos, p), axis=1), 1.0 / p)
+
+    def _rank_candidates(
+        self,
+        dense: DenseMatrix,
+        project_db_dir: Path,
+        candidate_rows: np.ndarray | None,
+        Q_norm: np.ndarray,
+        k: int,
+        *,
+        sims: np.ndarray | None = None,
+    ) -> List[RankedRow]:
+        """
+        Score candidate rows (None = all rows) against Q_norm and keep the top k.
+        """
+        ids = dense.ids
+        metadatas = dense.metadatas
+
+        if candidate_rows is None:
+            candidate_rows = np.arange(dense.size)
+            if sims is None:
+                sims = self._matrix_similarities(dense, Q_norm)
+        elif sims is None:
+            sims = self._matrix_similarities(dense, Q_norm, candidate_rows)
+
+        aggregated_scores = self._aggregate(sims)
+
+        if dense.is_quantized:
+            candidate_rows, aggregated_scores = self._rescore_exact(
+                dense,
+                project_db_dir,
+                candidate_rows,
+                aggregated_scores,
+                Q_norm,
+                k,
+            )
+
+        # Vectorized top-k:
+        # argpartition over all scores, then a deterministic sort of only the
+        # winners (higher score first, stable fallback by chunk_id).
+        # Metadata is copied for the winners only.
+        if candidate_rows.size == dense.size:
+            row_ids: Sequence[str] = ids
+        else:
+            row_ids = [ids[row_idx] for row_idx in candidate_rows.tolist()]
+
+        winners = select_top_k(aggregated_scores, row_ids, k)
+
+        rows: List[RankedRow] = []
+        for pos in winners.tolist():
+            row_idx = int(candidate_rows[pos])
+            rows.append(
+                (
+                    str(ids[row_idx]),
+                    float(aggregated_scores[pos]),
+                    dict(metadatas[row_idx]),
+                )
+            )
+
+        return rows
+
+    def _rescore_exact(
+        self,
+        dense: DenseMatrix,
+        project_db_dir: Path,
+        candidate_rows: np.ndarray,
+        approx_scores: np.ndarray,
+        Q_norm: np.ndarray,
+        k: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Keep the best rows of a quantized first pass and rescore them exactly.
+
+        Returns (rows, exact aggregated scores) for the kept rows.
+        """
+        keep = max(int(k), self.rescore_candidates)
+        if candidate_rows.size > keep:
+            # Full scan: candidate_rows is arange(N), so reuse dense.ids as is.
+            if candidate_rows.size == dense.size:
+                row_ids: Sequence[str] = dense.ids
+            else:
+                row_ids = [dense.ids[row_idx] for row_idx in candidate_rows.tolist()]
+            candidate_rows = candidate_rows[select_top_k(approx_scores, row_ids, keep)]
+
+        exact_rows = self._load_exact_rows(dense, project_db_dir, candidate_rows)
+        return candidate_rows, self._aggregate(self._similarities(exact_rows, Q_norm))
+
+    @staticmethod
+    def _load_exact_rows(dense: DenseMatrix, project_db_dir: Path, rows: np.ndarray) -> np.ndarray:
+        """
+        Load full-precision, L2-normalized vectors of the given matrix rows from Chroma.
+
+        Rows Chroma no longer returns (store changed since the matrix was
+        loaded) fall back to their dequantized values.
+        """
+        wanted = [dense.ids[row_idx] for row_idx in rows.tolist()]
+        if not wanted:
+            return np.zeros((0, dense.matrix.shape[1]), dtype=np.float32)
+
+        store = VectorStoreChroma(persist_dir=str(project_db_dir))
+        raw = store.collection.get(ids=wanted, include=["embeddings"])
+
+        found_ids: List[str] = raw.get("ids", []) if raw else []
+        found_vectors = raw.get("embeddings", []) if raw else []
+        vector_by_id = {str(chunk_id): found_vectors[pos] for pos, chunk_id in enumerate(found_ids)}
+
+        exact = dense.rows_float32(rows)
+        for pos, chunk_id in enumerate(wanted):
+            vector = vector_by_id.get(chunk_id)
+            if vector is not None:
+                exact[pos] = np.asarray(vector, dtype=np.float32)
 
+        exact /= np.linalg.norm(exact, axis=1, keepdims=True) + 1e-12
+        return np.ascontiguousarray(exact, dtype=np.float32)
+
+    @staticmethod
+    def _fixed_candidate_rows(dense: DenseMatrix, candidate_ids: List[str]) -> np.ndarray:
+        """
+        Map candidate ids to matrix rows (deduplicated, unknown ids dropped).
+        """
+        row_by_id: Dict[str, int] = DENSE_MATRIX_CACHE.derived(
+            dense,
+            "row_by_id",
+            lambda entry: {chunk_id: row for row, chunk_id in enumerate(entry.ids)},
+        )
+
+        rows: List[int] = []
+        seen: set[int] = set()
+        for chunk_id in candidate_ids:
+            row = row_by_id.get(str(chunk_id).strip())
+            if row is None or row in seen:
+                continue
+            seen.add(row)
+            rows.append(row)
+
+        return np.asarray(rows, dtype=np.int64)
+
+    @staticmethod
+    def _load_project_matrix(project_db_dir: Path) -> DenseLoadResult:
+        """
+        Load ids, metadatas and embeddings of one project from Chroma.
+
+        Called by DENSE_MATRIX_CACHE only when the project is not resident yet
+        or when ingestion has bumped the store generation since the last load.
+        """
         store = VectorStoreChroma(persist_dir=str(project_db_dir))
         raw = store.collection.get(include=["embeddings", "metadatas"])
 
@@ -125,7 +536,7 @@ class RetrieverEmb:
         # embeddings may come back as a NumPy array, so never test it with
         # "if not embeddings". Use explicit length checks instead.
         if len(ids) == 0 or len(embeddings) == 0:
-            return []
+            return [], [], np.zeros((0, 0), dtype=np.float32)
 
         if len(ids) != len(embeddings):
             raise RuntimeError(
@@ -137,50 +548,82 @@ class RetrieverEmb:
                 "RetrieverEmb.run: Chroma returned mismatched ids/metadatas lengths"
             )
 
-        query_vectors = self.embedder.embed(query_pieces)
-
-        if len(query_vectors) == 0:
-            return []
-
-        A = np.asarray(embeddings, dtype=np.float32)    # stored chunks: [N, D]
-        Q = np.asarray(query_vectors, dtype=np.float32) # query pieces:  [M, D]
-
-        if A.ndim != 2 or Q.ndim != 2:
-            raise RuntimeError(
-                "RetrieverEmb.run: unexpected embedding dimensions returned by Chroma/OpenAI"
-            )
-
-        if A.shape[1] != Q.shape[1]:
-            raise RuntimeError(
-                "RetrieverEmb.run: stored vectors and query vectors have different dimensions"
-            )
-
-        # Normalize rows to compute cosine similarity as a matrix product.
-        # Similarities shape: [N_chunks, M_query_pieces]
-        A_norm = A / (np.linalg.norm(A, axis=1, keepdims=True) + 1e-12)
-        Q_norm = Q / (np.linalg.norm(Q, axis=1, keepdims=True) + 1e-12)
-        sims = A_norm @ Q_norm.T
+        if len(metadatas) == 0:
+            metadatas = [None] * len(ids)
 
-        # p-mean aggregation over the query-piece axis.
-        # Strongly favors the best match, but is still not pure max.
-        p = DEFAULT_P_NORM
-        sims_pos = np.clip(sims, 0.0, None)
-        aggregated_scores = np.power(np.mean(np.power(sims_pos, p), axis=1), 1.0 / p)
+        return list(ids), [meta or {} for meta in metadatas], embeddings
 
-        rows: List[RankedRow] = []
-        for idx, chunk_id in enumerate(ids):
-            meta = metadatas[idx] if (len(metadatas) > 0 and metadatas[idx] is not None) else {}
-            rows.append(
-                (
-                    str(chunk_id),
-                    float(aggregated_scores[idx]),
-                    dict(meta),
-                )
-            )
+    def _ann_candidate_rows(
+        self,
+        dense: DenseMatrix,
+        project_db_dir: Path,
+        Q_norm: np.ndarray,
+    ) -> np.ndarray | None:
+        """
+        Build the union of per-query-piece ANN shortlists as matrix rows.
 
-        # Deterministic sort:
-        # 1) higher score first
-        # 2) stable fallback by chunk_id
-        rows.sort(key=lambda row: (-row[1], row[0]))
+        Returns None when the project has no IVF index, so the caller uses
+        the exact path instead.
+        """
+        view = DENSE_MATRIX_CACHE.derived(
+            dense,
+            "ann_ivf",
+            lambda entry: self._build_ann_view(entry, project_db_dir),
+        )
+        if view is None:
+            return None
+
+        probed = view.index.probe(Q_norm, self.ann_n_probe)
+        offsets = view.index.list_offsets
+
+        shortlists: List[np.ndarray] = []
+        for piece_idx in range(Q_norm.shape[0]):
+            parts = [
+                view.member_rows[offsets[list_id]: offsets[list_id + 1]]
+                for list_id in probed[piece_idx].tolist()
+            ]
+            parts.append(view.unindexed_rows)
+            rows = np.concatenate(parts)
+            rows = rows[rows >= 0]
+            if rows.size == 0:
+                continue
+
+            if rows.size > self.ann_shortlist_per_piece:
+                piece_sims = dense.rows_float32(rows) @ Q_norm[piece_idx]
+                keep = np.argpartition(-piece_sims, self.ann_shortlist_per_piece - 1)
+                rows = rows[keep[: self.ann_shortlist_per_piece]]
+
+            shortlists.append(rows)
+
+        if not shortlists:
+            return np.zeros(0, dtype=np.int64)
+
+        return np.unique(np.concatenate(shortlists))
+
+    @staticmethod
+    def _build_ann_view(dense: DenseMatrix, project_db_dir: Path) -> _AnnView | None:
+        """
+        Load the project's IVF index and remap its members to matrix rows.
 
-        return rows[: min(k, len(rows))]
\ No newline at end of file
+        An index trained on a different embedding dimension (e.g. after a
+        model switch) is ignored, so the caller uses the exact path.
+        """
+        index = load_ivf_index(ivf_index_path(project_db_dir))
+        if index is None or index.centroids.shape[1] != dense.matrix.shape[1]:
+            return None
+
+        row_of = {chunk_id: row for row, chunk_id in enumerate(dense.ids)}
+        index_to_row = np.asarray(
+            [row_of.get(chunk_id, -1) for chunk_id in index.ids],
+            dtype=np.int64,
+        )
+        member_rows = index_to_row[index.list_members] if index.list_members.size else index.list_members
+
+        covered = np.zeros(dense.size, dtype=bool)
+        covered[member_rows[member_rows >= 0]] = True
+
+        return _AnnView(
+            index=index,
+            member_rows=member_rows,
+            unindexed_rows=np.flatnonzero(~covered),
+        )
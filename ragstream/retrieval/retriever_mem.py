@@ -469,9 +469,11 @@ class MemoryRetriever:
         embedder: Any,
     ) -> list[float]:
         """
-        Create one dense vector for memory query text.
+        Create one dense vector for memory query text (via the shared query LRU
+        when the embedder provides embed_queries).
         """
-        vectors = embedder.embed([query_text])
+        embed = getattr(embedder, "embed_queries", embedder.embed)
+        vectors = embed([query_text])
         vector = vectors[0]
 
         if hasattr(vector, "tolist"):
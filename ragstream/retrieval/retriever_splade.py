@@ -12,10 +12,17 @@ Scope of this file:
         * query_pieces
         * top_k
         * optional candidate_ids
-    - Open the active project's SPLADE document store.
+    - Read the active project's SPLADE document store from the process-wide
+      SPLADE_STORE_CACHE (opened only on first use or after ingestion bumped
+      the store generation).
     - Compare stored sparse chunk representations against all query-piece
-      sparse representations.
+      sparse representations in one vectorized pass (store.score_many).
     - Aggregate per-chunk similarities with p-norm averaging.
+    - Without candidate_ids (global mode), candidates are the union of each
+      query piece's top-k from the store's pruned inverted-index search. The
+      per-piece depth is widened until the p-norm bound proves that no row
+      outside the union can reach the final top-k, so global mode returns
+      exactly what a full scan over all rows would.
     - Return ranked retrieval rows to the top-level Retriever stage.
 
 Important design rule:
@@ -31,11 +38,16 @@ Design goal:
 
 from __future__ import annotations
 
+import threading
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
+import numpy as np
+
 from ragstream.ingestion.splade_embedder import SpladeEmbedder
 from ragstream.ingestion.vector_store_splade import VectorStoreSplade
+from ragstream.retrieval.score_selection import select_top_k
+from ragstream.retrieval.splade_store_cache import SPLADE_STORE_CACHE
 
 # Ranked row returned to Retriever:
 # (chunk_id, retrieval_score, metadata)
@@ -72,6 +84,11 @@ class RetrieverSplade:
         self.splade_root = Path(splade_root).resolve()
         self.splade_embedder = splade_embedder
 
+        # Last encoded query: Retriever may call run(...) twice for the same
+        # query pieces (candidate generation, then union scoring).
+        self._query_lock = threading.Lock()
+        self._last_query: Tuple[Tuple[str, ...], List[Dict[str, float]]] | None = None
+
     def run(
         self,
         *,
@@ -125,19 +142,20 @@ class RetrieverSplade:
 
         k = int(top_k) if int(top_k) > 0 else DEFAULT_TOP_K
 
-        store = VectorStoreSplade(persist_dir=str(project_db_dir))
+        store = SPLADE_STORE_CACHE.get(
+            project_db_dir,
+            lambda: VectorStoreSplade(persist_dir=str(project_db_dir)),
+        )
 
-        doc_vectors: Dict[str, Dict[str, float]] = store.index
-        meta_store: Dict[str, Dict[str, Any]] = getattr(store, "_meta_store", {})
-
-        if len(doc_vectors) == 0:
+        if len(store) == 0:
             return []
 
-        query_vectors = self.splade_embedder.embed_queries(query_pieces)
+        query_vectors = self._encode_queries(query_pieces)
         if len(query_vectors) == 0:
             return []
 
         target_ids: List[str]
+        target_rows: np.ndarray | None
         use_fixed_candidates = candidate_ids is not None
 
         if use_fixed_candidates:
@@ -156,7 +174,8 @@ class RetrieverSplade:
             if len(target_ids) == 0:
                 return []
 
-            missing_ids = [cid for cid in target_ids if cid not in doc_vectors]
+            target_rows = store.row_ordinals(target_ids)
+            missing_ids = [cid for cid, row in zip(target_ids, target_rows) if row < 0]
             if missing_ids:
                 preview = ", ".join(missing_ids[:10])
                 suffix = " ..." if len(missing_ids) > 10 else ""
@@ -164,59 +183,95 @@ class RetrieverSplade:
                     "RetrieverSplade.run: candidate_ids are missing in the active SPLADE store. "
                     f"Missing {len(missing_ids)} id(s): {preview}{suffix}"
                 )
-        else:
-            target_ids = list(doc_vectors.keys())
 
-        rows: List[RankedRow] = []
-
-        p = DEFAULT_P_NORM
+            # Per-piece similarities [M, N] from one gather + product over the
+            # union of the pieces' active terms.
+            aggregated = self._aggregate(store.score_many(query_vectors, target_rows))
+        else:
+            target_rows, aggregated = self._global_candidates(store, query_vectors, k)
+            target_ids = store.row_ids(target_rows)
 
-        for chunk_id in target_ids:
-            doc_vec = doc_vectors[chunk_id]
-            per_piece_scores: List[float] = []
+        if use_fixed_candidates:
+            positions = select_top_k(aggregated, target_ids, len(target_ids))
+        else:
+            positions = select_top_k(aggregated, target_ids, k)
 
-            for query_vec in query_vectors:
-                sim = self._dot_sparse(doc_vec, query_vec)
-                per_piece_scores.append(float(sim))
-
-            if len(per_piece_scores) == 0:
-                aggregated_score = 0.0
-            else:
-                sims_pos = [max(0.0, float(s)) for s in per_piece_scores]
-                aggregated_score = (
-                    sum(pow(s, p) for s in sims_pos) / float(len(sims_pos))
-                ) ** (1.0 / p)
-
-            meta = meta_store.get(chunk_id, {})
+        # Deterministic order from select_top_k:
+        # 1) higher score first
+        # 2) stable fallback by chunk_id
+        rows: List[RankedRow] = []
+        for pos in positions:
+            chunk_id = target_ids[int(pos)]
             rows.append(
                 (
                     str(chunk_id),
-                    float(aggregated_score),
-                    dict(meta),
+                    float(aggregated[int(pos)]),
+                    store.get_metadata(chunk_id),
                 )
             )
 
-        # Deterministic sort:
-        # 1) higher score first
-        # 2) stable fallback by chunk_id
-        rows.sort(key=lambda row: (-row[1], row[0]))
-
-        if use_fixed_candidates:
-            return rows
-
-        return rows[: min(k, len(rows))]
+        return rows
 
     @staticmethod
-    def _dot_sparse(left: Dict[str, float], right: Dict[str, float]) -> float:
+    def _aggregate(per_piece_scores: np.ndarray) -> np.ndarray:
+        """
+        p-norm average of the clipped per-piece scores [M, N] -> [N].
         """
-        Dot product over sparse dicts.
+        p = DEFAULT_P_NORM
+        sims_pos = np.maximum(per_piece_scores, 0.0)
+        return (np.sum(sims_pos ** p, axis=0) / float(sims_pos.shape[0])) ** (1.0 / p)
 
-        Iterate over the smaller dict for efficiency.
+    def _global_candidates(
+        self,
+        store: VectorStoreSplade,
+        query_vectors: List[Dict[str, float]],
+        k: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        if len(left) > len(right):
-            left, right = right, left
+        Candidate rows and their aggregated scores for global mode.
+
+        Every query piece fetches its own top-`depth` rows from the store's
+        inverted index (MaxScore). A row outside all of those lists scores at
+        most the piece's last fetched score tau_i on every piece, so its
+        p-norm is at most (mean(max(tau_i, 0) ** p)) ** (1 / p). When the k-th
+        best candidate beats that bound, the union already holds the exact
+        top-k; otherwise the depth doubles (up to every row).
+        """
+        n_rows = len(store)
+        depth = min(k, n_rows)
+        while True:
+            rows_per_piece: List[np.ndarray] = []
+            last_scores: List[float] = []
+            for query_vec in query_vectors:
+                rows, scores = store.search(query_vec, depth)
+                rows_per_piece.append(rows)
+                last_scores.append(float(scores[-1]) if scores.size else 0.0)
+
+            target_rows = np.unique(np.concatenate(rows_per_piece))
+            aggregated = self._aggregate(store.score_many(query_vectors, target_rows))
+            if depth >= n_rows:
+                return target_rows, aggregated
+
+            # depth < n_rows here, so every piece returned k or more rows.
+            cut = target_rows.shape[0] - k
+            kth_best = float(np.partition(aggregated, cut)[cut])
+            bound = float(self._aggregate(np.asarray(last_scores, dtype=np.float64)[:, None])[0])
+            if kth_best > bound:
+                return target_rows, aggregated
+
+            depth = min(2 * depth, n_rows)
+
+    def _encode_queries(self, query_pieces: List[str]) -> List[Dict[str, float]]:
+        """
+        Encode query pieces, reusing the previous result for identical pieces.
+        """
+        key = tuple(query_pieces)
+        with self._query_lock:
+            if self._last_query is not None and self._last_query[0] == key:
+                return self._last_query[1]
+
+        query_vectors = self.splade_embedder.embed_queries(list(query_pieces))
 
-        score = 0.0
-        for key, value in left.items():
-            score += float(value) * float(right.get(key, 0.0))
-        return score
\ No newline at end of file
+        with self._query_lock:
+            self._last_query = (key, query_vectors)
+        return query_vectors
\ No newline at end of file
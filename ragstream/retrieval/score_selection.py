@@ -0,0 +1,65 @@
+# score_selection.py
+# -*- coding: utf-8 -*-
+"""
+score_selection.py
+
+Purpose:
+    Vectorized top-k selection over a NumPy score array.
+
+Role:
+    - Shared by the retrieval backends that score many stored chunks and keep
+      only a few of them.
+    - Replaces "build one Python tuple per chunk, sort all, slice top_k".
+
+Ordering contract (identical to the former full Python sort):
+    1) higher score first
+    2) stable fallback by chunk_id (ascending)
+
+Important design rule:
+    - This module is purely deterministic and knows nothing about stores,
+      metadata or SuperPrompt.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+
+def select_top_k(scores: np.ndarray, ids: Sequence[str], k: int) -> np.ndarray:
+    """
+    Return the positions of the k best scores in deterministic order.
+
+    Steps:
+        1) np.argpartition finds the k-th best score in O(N).
+        2) Every position scoring at least that value is kept, so ties at the
+           cut-off are resolved by chunk_id exactly like a full sort would.
+        3) Only these few winners are sorted by (-score, chunk_id).
+
+    Args:
+        scores: 1D score array, aligned with ids.
+        ids: chunk ids, indexable by position.
+        k: number of positions to return.
+
+    Returns:
+        Integer array of at most k positions into scores / ids.
+    """
+    scores = np.asarray(scores)
+    n = int(scores.shape[0])
+    k = min(int(k), n)
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    if k < n:
+        part = np.argpartition(-scores, k - 1)[:k]
+        threshold = scores[part].min()
+        candidates = np.flatnonzero(scores >= threshold)
+    else:
+        candidates = np.arange(n)
+
+    candidate_ids = np.asarray([str(ids[pos]) for pos in candidates.tolist()])
+
+    # np.lexsort sorts by the last key first: score descending, then id ascending.
+    order = np.lexsort((candidate_ids, -scores[candidates]))
+    return candidates[order[:k]]
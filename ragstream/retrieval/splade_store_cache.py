@@ -0,0 +1,118 @@
+# splade_store_cache.py
+# -*- coding: utf-8 -*-
+"""
+splade_store_cache.py
+
+Purpose:
+    Process-wide, per-project cache of opened SPLADE document stores used by
+    RetrieverSplade.
+
+Why:
+    - Opening a VectorStoreSplade reads metadatas.json, rebuilds the id and
+      metadata indexes and replays the write-ahead log, all O(N). Doing that
+      per query would cancel the sub-linear MaxScore search.
+
+Invalidation:
+    - Each entry remembers the store generation it was opened for
+      (see ragstream.ingestion.store_generation).
+    - IngestionManager.run(...) bumps the sparse store's generation after
+      publishing a new manifest, so the next query reopens the store.
+
+Important design rules:
+    - This module does not construct stores itself. The caller passes a
+      factory callable, so RetrieverSplade keeps ownership of store access.
+    - Cached stores are read-only: prepare_for_reads() builds every lazy read
+      structure under the load lock before the store is shared.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict
+
+from ragstream.ingestion.store_generation import current_generation, store_key
+from ragstream.ingestion.vector_store_splade import VectorStoreSplade
+
+
+@dataclass(frozen=True)
+class _SpladeEntry:
+    """One resident project store and the generation it was opened for."""
+    generation: int
+    store: VectorStoreSplade
+
+
+class SpladeStoreCache:
+    """
+    Thread-safe cache of opened SPLADE stores keyed by project persist dir.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _SpladeEntry] = {}
+
+        # One load lock per project so a slow open of one project never
+        # blocks queries against another one.
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def get(
+        self,
+        persist_dir: str | Path,
+        factory: Callable[[], VectorStoreSplade],
+    ) -> VectorStoreSplade:
+        """
+        Return the resident store for persist_dir, opening it when missing or stale.
+        """
+        key = store_key(persist_dir)
+
+        store = self._fresh_store(key)
+        if store is not None:
+            return store
+
+        with self._load_lock(key):
+            # Another thread may have finished the open while we waited.
+            store = self._fresh_store(key)
+            if store is not None:
+                return store
+
+            generation = current_generation(key)
+            store = factory()
+            store.prepare_for_reads()
+
+            with self._lock:
+                self._entries[key] = _SpladeEntry(generation=generation, store=store)
+            return store
+
+    def invalidate(self, persist_dir: str | Path | None = None) -> None:
+        """
+        Drop one project entry, or all entries when persist_dir is None.
+        """
+        with self._lock:
+            if persist_dir is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(store_key(persist_dir), None)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _fresh_store(self, key: str) -> VectorStoreSplade | None:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry.generation != current_generation(key):
+            return None
+        return entry.store
+
+    def _load_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            lock = self._load_locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self._load_locks[key] = lock
+            return lock
+
+
+# Shared process-wide instance used by RetrieverSplade.
+SPLADE_STORE_CACHE = SpladeStoreCache()
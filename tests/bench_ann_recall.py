@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+ANN recall benchmark for RetrieverEmb (offline, synthetic vectors)
+
+Compares RetrieverEmb in "ann" mode against the exact mode and reports
+Recall@k plus per-query latency. No OpenAI key and no real Chroma data needed:
+the project matrix is injected into DENSE_MATRIX_CACHE and query pieces are
+embedded by a fake embedder that returns fixed synthetic vectors.
+
+Run from repo root:
+    python -m tests.bench_ann_recall
+    python -m tests.bench_ann_recall --chunks 200000 --n-probe 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from ragstream.ingestion.ann_index import build_ivf_index, ivf_index_path, save_ivf_index
+from ragstream.retrieval.dense_matrix_cache import DENSE_MATRIX_CACHE
+from ragstream.retrieval.retriever_emb import RetrieverEmb
+
+PROJECT = "bench"
+
+
+class _FixedEmbedder:
+    """Returns pre-generated query vectors keyed by query-piece text."""
+
+    def __init__(self, vectors_by_text: Dict[str, np.ndarray]) -> None:
+        self.vectors_by_text = vectors_by_text
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self.vectors_by_text[t].tolist() for t in texts]
+
+
+def _synthetic_corpus(n: int, dim: int, n_topics: int, rng: np.random.Generator) -> np.ndarray:
+    """Clustered vectors: a few topic centers plus per-chunk noise."""
+    centers = rng.standard_normal((n_topics, dim)).astype(np.float32)
+    topic = rng.integers(0, n_topics, size=n)
+    return centers[topic] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--pieces", type=int, default=3)
+    parser.add_argument("--top-k", type=int, default=100)
+    parser.add_argument("--n-probe", type=int, default=8)
+    parser.add_argument("--shortlist", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    X = _synthetic_corpus(args.chunks, args.dim, n_topics=64, rng=rng)
+    ids = [f"bench/doc.md::sha::{i}" for i in range(args.chunks)]
+    metas = [{"path": "bench/doc.md", "chunk_idx": i} for i in range(args.chunks)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        chroma_root = Path(tmp)
+        project_dir = chroma_root / PROJECT
+        project_dir.mkdir()
+
+        t0 = time.perf_counter()
+        save_ivf_index(build_ivf_index(ids, X), ivf_index_path(project_dir))
+        build_s = time.perf_counter() - t0
+
+        DENSE_MATRIX_CACHE.invalidate(project_dir)
+        DENSE_MATRIX_CACHE.get(project_dir, lambda: (ids, metas, X))
+
+        queries: List[List[str]] = []
+        vectors_by_text: Dict[str, np.ndarray] = {}
+        for qi in range(args.queries):
+            anchor = X[rng.integers(0, args.chunks)]
+            pieces = []
+            for pi in range(args.pieces):
+                text = f"q{qi}-p{pi}"
+                vectors_by_text[text] = anchor + 0.8 * rng.standard_normal(args.dim).astype(np.float32)
+                pieces.append(text)
+            queries.append(pieces)
+
+        embedder = _FixedEmbedder(vectors_by_text)
+        exact = RetrieverEmb(chroma_root=str(chroma_root), embedder=embedder)
+        ann = RetrieverEmb(
+            chroma_root=str(chroma_root),
+            embedder=embedder,
+            search_mode="ann",
+            ann_n_probe=args.n_probe,
+            ann_shortlist_per_piece=args.shortlist,
+        )
+
+        recalls: List[float] = []
+        exact_s = 0.0
+        ann_s = 0.0
+        for pieces in queries:
+            t0 = time.perf_counter()
+            exact_rows = exact.run(project_name=PROJECT, query_pieces=pieces, top_k=args.top_k)
+            exact_s += time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            ann_rows = ann.run(project_name=PROJECT, query_pieces=pieces, top_k=args.top_k)
+            ann_s += time.perf_counter() - t0
+
+            truth = {row[0] for row in exact_rows}
+            found = {row[0] for row in ann_rows}
+            recalls.append(len(truth & found) / float(max(1, len(truth))))
+
+        DENSE_MATRIX_CACHE.invalidate(project_dir)
+
+    print(f"chunks={args.chunks} dim={args.dim} pieces={args.pieces} top_k={args.top_k}")
+    print(f"n_probe={args.n_probe} shortlist_per_piece={args.shortlist} index_build_s={build_s:.2f}")
+    print(f"Recall@{args.top_k}: mean={np.mean(recalls):.4f} min={np.min(recalls):.4f}")
+    print(f"latency_ms exact={1000 * exact_s / len(queries):.2f} ann={1000 * ann_s / len(queries):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _raglog_to_tmp(tmp_path_factory: pytest.TempPathFactory) -> None:
+    """
+    Point every RagLog sink at a temporary folder, so test runs never write
+    into data/logs/ of the repo.
+    """
+    from ragstream.textforge import RagLog
+
+    log_root = tmp_path_factory.mktemp("raglog")
+    RagLog.LogALL(log_root=log_root, session_state={})
+    RagLog.LogNoGUI(log_root=log_root, session_state={})
+    RagLog.LogConf(log_root=log_root, session_state={})
+    RagLog.LOGDeveloper(log_root=log_root)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from ragstream.ingestion.ann_index import (
+    IvfIndex,
+    build_ivf_index,
+    build_ivf_index_for_store,
+    ivf_index_path,
+    load_ivf_index,
+    save_ivf_index,
+)
+from ragstream.ingestion.vector_store_chroma import VectorStoreChroma
+from ragstream.retrieval.dense_matrix_cache import DENSE_MATRIX_CACHE
+from ragstream.retrieval.retriever_emb import RetrieverEmb
+
+PROJECT = "proj"
+
+
+class _FakeEmbedder:
+    def __init__(self, vectors_by_text: dict[str, np.ndarray]) -> None:
+        self.vectors_by_text = vectors_by_text
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return [self.vectors_by_text[t].tolist() for t in texts]
+
+
+def test_empty_store_gets_no_index_and_loses_a_stale_one(tmp_path: Path) -> None:
+    store = VectorStoreChroma(persist_dir=str(tmp_path / PROJECT))
+    path = ivf_index_path(store.persist_path)
+    save_ivf_index(build_ivf_index(["a"], np.ones((1, 4))), path)
+
+    assert build_ivf_index_for_store(store) is None
+    assert not path.exists()
+    with pytest.raises(ValueError):
+        build_ivf_index([], np.zeros((0, 4)))
+
+
+@pytest.mark.parametrize("stale_dim", [0, 8])
+def test_unusable_index_falls_back_to_exact_search(tmp_path: Path, stale_dim: int) -> None:
+    rng = np.random.default_rng(4)
+    n, dim = 200, 16
+    X = rng.standard_normal((n, dim)).astype(np.float32)
+    ids = [f"doc.md::sha::{i}" for i in range(n)]
+    metas = [{"chunk_idx": i} for i in range(n)]
+
+    project_dir = tmp_path / PROJECT
+    project_dir.mkdir()
+    # A (1, 0) index left behind by an empty store, or one from another model.
+    stale = IvfIndex(
+        ids=[],
+        centroids=np.zeros((1, stale_dim), dtype=np.float32),
+        list_offsets=np.zeros(2, dtype=np.int64),
+        list_members=np.zeros(0, dtype=np.int64),
+    )
+    save_ivf_index(stale, ivf_index_path(project_dir))
+    assert (load_ivf_index(ivf_index_path(project_dir)) is None) == (stale_dim == 0)
+
+    embedder = _FakeEmbedder({"q": X[3] + 0.3 * rng.standard_normal(dim).astype(np.float32)})
+    DENSE_MATRIX_CACHE.get(project_dir, lambda: (ids, metas, X))
+    try:
+        rows = {
+            mode: RetrieverEmb(chroma_root=str(tmp_path), embedder=embedder, search_mode=mode).run(
+                project_name=PROJECT, query_pieces=["q"], top_k=10
+            )
+            for mode in ("exact", "ann")
+        }
+    finally:
+        DENSE_MATRIX_CACHE.invalidate(project_dir)
+
+    assert rows["ann"] == rows["exact"]
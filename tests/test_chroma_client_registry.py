@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from pathlib import Path
+import shutil
+import sys
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from ragstream.ingestion import chroma_client_registry
+from ragstream.ingestion.vector_store_chroma import VectorStoreChroma
+
+
+def test_handles_are_shared_and_reopened_after_the_directory_is_deleted(tmp_path: Path) -> None:
+    persist_dir = tmp_path / "proj"
+    store = VectorStoreChroma(persist_dir=str(persist_dir))
+    store.add(["a"], [[1.0, 2.0]], [{"path": "a.md"}])
+    assert VectorStoreChroma(persist_dir=str(persist_dir)).collection is store.collection
+
+    shutil.rmtree(persist_dir)
+
+    recreated = VectorStoreChroma(persist_dir=str(persist_dir))
+    assert recreated.collection is not store.collection
+    assert recreated.collection.count() == 0
+    recreated.add(["b"], [[3.0, 4.0]], [{"path": "b.md"}])
+    assert recreated.collection.get()["ids"] == ["b"]
+
+    chroma_client_registry.invalidate(persist_dir, close_client=True)
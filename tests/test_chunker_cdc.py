@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from ragstream.ingestion.chunker import Chunker
+
+
+def _sample_text() -> str:
+    return "\n\n".join(
+        f"Paragraph {i}. " + "Some words about topic %d here. " % (i % 5) * (3 + i % 9)
+        for i in range(80)
+    )
+
+
+def test_cdc_spans_cover_text_and_respect_chunk_size() -> None:
+    text = _sample_text()
+    spans = Chunker().split_spans(text, chunk_size=600, overlap=60, mode="cdc")
+
+    assert spans
+    assert all(end - start <= 600 for start, end, _ in spans)
+    assert all(text[start:end].strip() == chunk for start, end, chunk in spans)
+    assert spans[-1][1] == len(text)
+
+
+def test_cdc_edit_near_top_keeps_downstream_chunks() -> None:
+    text = _sample_text()
+    chunker = Chunker()
+
+    before = [chunk for _fp, chunk in chunker.split("f.md", text, mode="cdc")]
+    after = [chunk for _fp, chunk in chunker.split("f.md", "A new opening sentence. " + text, mode="cdc")]
+
+    unchanged = set(before)
+    reused = sum(1 for chunk in after if chunk in unchanged)
+    assert reused >= len(after) - 2
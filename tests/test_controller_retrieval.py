@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import threading
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+pytest.importorskip("pylate")
+
+from ragstream.app.controller import AppController
+from ragstream.orchestration.super_prompt import SuperPrompt
+
+
+class _DocRetriever:
+    def __init__(self) -> None:
+        self.finished = threading.Event()
+
+    def run(self, *, sp: SuperPrompt, project_name: str, top_k: int, use_retrieval_splade: bool) -> SuperPrompt:
+        # Mutate everything memory retrieval reads while it is still running.
+        sp.body["task"] = "changed by document retrieval"
+        sp.extras["activebrief_relation_activebrief"]["title"] = "changed"
+        sp.extras["document_only"] = True
+        sp.base_context_chunks = ["chunk"]
+        self.finished.set()
+        return sp
+
+
+class _MemoryRetriever:
+    def __init__(self, doc: _DocRetriever, fail: bool = False) -> None:
+        self.doc = doc
+        self.fail = fail
+        self.seen: dict = {}
+
+    def run(self, view: SuperPrompt) -> SuperPrompt:
+        # Only returns once document retrieval finished: both branches overlap.
+        assert self.doc.finished.wait(timeout=10)
+        self.seen = {
+            "task": view.body["task"],
+            "title": view.extras["activebrief_relation_activebrief"]["title"],
+        }
+        if self.fail:
+            raise RuntimeError("memory store unavailable")
+        view.memory_context_text = "memory"
+        view.extras["memory_context_text"] = "memory"
+        return view
+
+
+def _controller(fail: bool = False) -> tuple[AppController, _MemoryRetriever]:
+    controller = AppController.__new__(AppController)
+    controller.retriever = _DocRetriever()
+    controller.memory_retriever = _MemoryRetriever(controller.retriever, fail=fail)
+    return controller, controller.memory_retriever
+
+
+def _prompt() -> SuperPrompt:
+    sp = SuperPrompt()
+    sp.body["task"] = "original task"
+    sp.extras["activebrief_relation_activebrief"] = {"title": "original", "body": "brief"}
+    return sp
+
+
+def test_memory_view_shares_no_mutable_field_memory_retrieval_reads() -> None:
+    sp = _prompt()
+    view = AppController._memory_retrieval_view(sp)
+
+    assert view.body == sp.body and view.body is not sp.body
+    assert view.extras == sp.extras and view.extras is not sp.extras
+    assert view.extras["activebrief_relation_activebrief"] is not sp.extras["activebrief_relation_activebrief"]
+
+
+def test_branches_run_concurrently_and_memory_results_are_merged() -> None:
+    controller, memory = _controller()
+    sp = controller.run_retrieval(_prompt(), "proj", 5)
+
+    assert memory.seen == {"task": "original task", "title": "original"}
+    assert sp.base_context_chunks == ["chunk"]
+    assert sp.memory_context_text == "memory"
+    assert sp.extras["memory_context_text"] == "memory"
+    assert sp.extras["document_only"] is True
+    assert sp.extras["activebrief_relation_activebrief"]["title"] == "changed"
+
+
+def test_memory_failure_leaves_document_results_untouched() -> None:
+    controller, _memory = _controller(fail=True)
+    sp = controller.run_retrieval(_prompt(), "proj", 5)
+
+    assert sp.base_context_chunks == ["chunk"]
+    assert "memory_context_text" not in sp.extras
+    assert sp.memory_context_text != "memory"
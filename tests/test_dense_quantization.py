@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from ragstream.ingestion.vector_store_chroma import VectorStoreChroma
+from ragstream.retrieval.dense_matrix_cache import DENSE_MATRIX_CACHE, DenseMatrixCache
+from ragstream.retrieval.retriever_emb import RetrieverEmb
+
+PROJECT = "proj"
+
+
+def _corpus(n: int = 500, dim: int = 64) -> tuple[list[str], list[dict], np.ndarray]:
+    rng = np.random.default_rng(1)
+    X = rng.standard_normal((n, dim)).astype(np.float32)
+    ids = [f"doc.md::sha::{i}" for i in range(n)]
+    return ids, [{"chunk_idx": i} for i in range(n)], X
+
+
+def test_quantized_rows_stay_close_to_float32(tmp_path: Path) -> None:
+    ids, metas, X = _corpus()
+    cache = DenseMatrixCache()
+    exact = cache.get(tmp_path, lambda: (ids, metas, X)).matrix
+
+    for precision, dtype, tolerance in (("float16", np.float16, 1e-3), ("int8", np.int8, 1e-2)):
+        entry = cache.get(tmp_path, lambda: (ids, metas, X), precision=precision)
+
+        assert entry.precision == precision
+        assert entry.matrix.dtype == dtype
+        assert np.max(np.abs(entry.rows_float32(slice(None)) - exact)) < tolerance
+        assert np.allclose(entry.rows_float32(np.asarray([3, 1])), entry.rows_float32(slice(None))[[3, 1]])
+
+
+def test_precision_switch_reloads_entry(tmp_path: Path) -> None:
+    ids, metas, X = _corpus(n=20)
+    cache = DenseMatrixCache()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return ids, metas, X
+
+    cache.get(tmp_path, loader, precision="int8")
+    cache.get(tmp_path, loader, precision="int8")
+    cache.get(tmp_path, loader)
+
+    assert len(loads) == 2
+
+
+class _FakeEmbedder:
+    def __init__(self, vectors_by_text: dict[str, np.ndarray]) -> None:
+        self.vectors_by_text = vectors_by_text
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return [self.vectors_by_text[t].tolist() for t in texts]
+
+
+def _chroma_project(tmp_path: Path, n: int = 400, dim: int = 32):
+    ids, metas, X = _corpus(n=n, dim=dim)
+    store = VectorStoreChroma(persist_dir=str(tmp_path / PROJECT))
+    store.add(ids, X.tolist(), metas)
+
+    rng = np.random.default_rng(2)
+    queries = {f"q{i}": X[i * 7] + 0.5 * rng.standard_normal(dim).astype(np.float32) for i in range(6)}
+    return store, ids, _FakeEmbedder(queries)
+
+
+def _run(tmp_path: Path, embedder: _FakeEmbedder, precision: str, pieces: list[str]):
+    retriever = RetrieverEmb(
+        chroma_root=str(tmp_path),
+        embedder=embedder,
+        dense_precision=precision,
+        rescore_candidates=40,
+    )
+    return retriever.run(project_name=PROJECT, query_pieces=pieces, top_k=15)
+
+
+def test_quantized_first_pass_with_exact_rescoring_matches_float32(tmp_path: Path) -> None:
+    _store, _ids, embedder = _chroma_project(tmp_path)
+    pieces = ["q0", "q1", "q2"]
+    try:
+        expected = _run(tmp_path, embedder, "float32", pieces)
+        for precision in ("float16", "int8"):
+            rows = _run(tmp_path, embedder, precision, pieces)
+
+            assert [row[0] for row in rows] == [row[0] for row in expected]
+            assert np.allclose([row[1] for row in rows], [row[1] for row in expected], atol=1e-6)
+            assert [row[2] for row in rows] == [row[2] for row in expected]
+    finally:
+        DENSE_MATRIX_CACHE.invalidate(tmp_path / PROJECT)
+
+
+def test_rescoring_falls_back_to_dequantized_rows_missing_in_chroma(tmp_path: Path) -> None:
+    store, _ids, embedder = _chroma_project(tmp_path)
+    pieces = ["q3"]
+    try:
+        expected = _run(tmp_path, embedder, "float32", pieces)
+        _run(tmp_path, embedder, "int8", pieces)   # int8 matrix is now resident
+
+        # Rows vanish from Chroma without a generation bump (e.g. another process).
+        gone = [row[0] for row in expected[:3]]
+        store.collection.delete(ids=gone)
+        rows = _run(tmp_path, embedder, "int8", pieces)
+
+        scores = {row[0]: row[1] for row in rows}
+        for chunk_id, score, _meta in expected[:3]:
+            assert abs(scores[chunk_id] - score) < 1e-2
+    finally:
+        DENSE_MATRIX_CACHE.invalidate(tmp_path / PROJECT)
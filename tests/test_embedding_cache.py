@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from ragstream.ingestion import embedding_cache
+from ragstream.ingestion.embedding_cache import EmbeddingCache, QueryEmbeddingLRU
+
+
+def test_cache_hits_misses_and_persists_across_reopen(tmp_path: Path) -> None:
+    cache = EmbeddingCache(tmp_path / "emb.sqlite3")
+    cache.put_many("m", ["a", "b"], [[1.0, 2.0], [3.0, 4.0]])
+
+    assert cache.get_many("m", ["a", "x", "a"]) == [[1.0, 2.0], None, [1.0, 2.0]]
+    assert cache.get_many("other-model", ["b"]) == [None]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 2, 2)
+    cache.close()
+
+    assert EmbeddingCache(tmp_path / "emb.sqlite3").get_many("m", ["b"]) == [[3.0, 4.0]]
+
+
+def test_cache_evicts_least_recently_used_and_tracks_count(tmp_path: Path) -> None:
+    cache = EmbeddingCache(tmp_path / "emb.sqlite3", max_entries=2)
+    cache.put_many("m", ["a"], [[1.0]])
+    cache.put_many("m", ["a"], [[1.5]])   # replacing a row must not count as a new one
+    cache.put_many("m", ["b"], [[2.0]])
+    cache.get_many("m", ["a"])            # a becomes the most recently used row
+    cache.put_many("m", ["c"], [[3.0]])
+
+    assert cache.get_many("m", ["a", "b", "c"]) == [[1.5], None, [3.0]]
+    stats = cache.stats()
+    assert (stats["entries"], stats["evictions"]) == (2, 1)
+
+
+def test_query_lru_counts_hits_and_misses_and_returns_read_only_float32() -> None:
+    lru = QueryEmbeddingLRU(max_entries=4, ttl_s=60.0)
+    lru.put_many("m", ["a"], [[1.0, 2.0]])
+
+    hit, miss = lru.get_many("m", ["a", "b"])
+
+    assert miss is None
+    assert hit.dtype == np.float32 and hit.tolist() == [1.0, 2.0]
+    with pytest.raises(ValueError):
+        hit[0] = 5.0
+    assert lru.get_many("other-model", ["a"]) == [None]
+    assert lru.stats() == {"entries": 1, "hits": 1, "misses": 2}
+
+
+def test_query_lru_evicts_least_recently_used() -> None:
+    lru = QueryEmbeddingLRU(max_entries=2, ttl_s=60.0)
+    lru.put_many("m", ["a", "b"], [[1.0], [2.0]])
+    lru.get_many("m", ["a"])
+    lru.put_many("m", ["c"], [[3.0]])
+
+    a, b, c = lru.get_many("m", ["a", "b", "c"])
+
+    assert b is None
+    assert a.tolist() == [1.0] and c.tolist() == [3.0]
+
+
+def test_query_lru_expires_entries_after_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr(embedding_cache.time, "monotonic", lambda: now[0])
+    lru = QueryEmbeddingLRU(max_entries=4, ttl_s=10.0)
+    lru.put_many("m", ["a"], [[1.0]])
+
+    now[0] = 109.0
+    assert lru.get_many("m", ["a"])[0] is not None
+
+    now[0] = 111.0
+    assert lru.get_many("m", ["a"]) == [None]
+    assert lru.stats()["entries"] == 0
+
+
+def test_shared_cache_keeps_first_limit_and_warns_on_a_different_one(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    warnings = []
+    monkeypatch.setattr(embedding_cache, "logger", lambda text, level, audience: warnings.append(level))
+    path = tmp_path / "shared.sqlite3"
+
+    first = embedding_cache.get_embedding_cache(path, max_entries=10)
+    assert embedding_cache.get_embedding_cache(path, max_entries=10) is first
+    assert warnings == []
+
+    assert embedding_cache.get_embedding_cache(path, max_entries=20) is first
+    assert first.max_entries == 10
+    assert warnings == ["WARN"]
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from ragstream.ingestion.ann_index import build_ivf_index, ivf_index_path, save_ivf_index
+from ragstream.retrieval.dense_matrix_cache import DENSE_MATRIX_CACHE
+from ragstream.retrieval.retriever_emb import RetrieverEmb
+
+PROJECT = "proj"
+
+
+class _CountingEmbedder:
+    def __init__(self, vectors_by_text: dict[str, np.ndarray]) -> None:
+        self.vectors_by_text = vectors_by_text
+        self.calls = 0
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        self.calls += 1
+        return [self.vectors_by_text[t].tolist() for t in texts]
+
+
+@pytest.mark.parametrize("search_mode", ["exact", "ann"])
+def test_run_batch_is_identical_to_sequential_runs(tmp_path: Path, search_mode: str) -> None:
+    rng = np.random.default_rng(5)
+    n, dim = 3000, 48
+    centers = rng.standard_normal((16, dim)).astype(np.float32)
+    X = centers[rng.integers(0, 16, size=n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    ids = [f"doc.md::sha::{i}" for i in range(n)]
+    metas = [{"chunk_idx": i} for i in range(n)]
+
+    project_dir = tmp_path / PROJECT
+    project_dir.mkdir()
+    save_ivf_index(build_ivf_index(ids, X), ivf_index_path(project_dir))
+    DENSE_MATRIX_CACHE.get(project_dir, lambda: (ids, metas, X))
+
+    # Prompts with 1, 2 and many query pieces (plus an empty one).
+    batch = [["p0"], ["p1", "p2"], [f"p{i}" for i in range(3, 11)], [], ["p11"]]
+    vectors = {f"p{i}": X[int(rng.integers(0, n))] + 0.7 * rng.standard_normal(dim).astype(np.float32) for i in range(12)}
+    embedder = _CountingEmbedder(vectors)
+    retriever = RetrieverEmb(chroma_root=str(tmp_path), embedder=embedder, search_mode=search_mode)
+
+    try:
+        batched = retriever.run_batch(project_name=PROJECT, query_pieces_batch=batch, top_k=25)
+        assert embedder.calls == 1
+
+        sequential = [retriever.run(project_name=PROJECT, query_pieces=pieces, top_k=25) for pieces in batch]
+    finally:
+        DENSE_MATRIX_CACHE.invalidate(project_dir)
+
+    assert [[row[0] for row in rows] for rows in batched] == [[row[0] for row in rows] for rows in sequential]
+    # Bit-identical scores, not just close ones.
+    assert [[row[1] for row in rows] for rows in batched] == [[row[1] for row in rows] for rows in sequential]
+    assert [len(rows) for rows in batched] == [25, 25, 25, 0, 25]
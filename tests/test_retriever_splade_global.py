@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from pathlib import Path
+import random
+import sys
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+pytest.importorskip("torch")
+
+from ragstream.ingestion.vector_store_splade import VectorStoreSplade
+from ragstream.retrieval.retriever_splade import RetrieverSplade
+from ragstream.retrieval.score_selection import select_top_k
+from ragstream.retrieval.splade_store_cache import SPLADE_STORE_CACHE
+
+PROJECT = "proj"
+
+
+class _FakeSpladeEmbedder:
+    def __init__(self, vectors_by_text: dict[str, dict[str, float]]) -> None:
+        self.vectors_by_text = vectors_by_text
+
+    def embed_queries(self, texts: list[str]) -> list[dict[str, float]]:
+        return [self.vectors_by_text[t] for t in texts]
+
+
+def _brute_force(store: VectorStoreSplade, queries: list[dict[str, float]], k: int) -> list[tuple[str, float]]:
+    ids = store.ids()
+    aggregated = RetrieverSplade._aggregate(store.score_many(queries))
+    return [(ids[int(pos)], float(aggregated[int(pos)])) for pos in select_top_k(aggregated, ids, k)]
+
+
+def _random_vector(rng: random.Random, vocab: int) -> dict[str, float]:
+    return {str(rng.randrange(vocab)): rng.random() * 3 for _ in range(rng.randint(1, 12))}
+
+
+def test_global_mode_matches_full_scan(tmp_path: Path) -> None:
+    rng = random.Random(3)
+    project_dir = tmp_path / PROJECT
+    store = VectorStoreSplade(persist_dir=str(project_dir))
+    ids = [f"doc.md::sha::{i}" for i in range(300)]
+    vectors = [_random_vector(rng, 60) for _ in ids]
+    # Second on both pieces, first on neither: outside each piece's top-1,
+    # yet the p-norm ranks it first.
+    ids += ["a.md::s::0", "b.md::s::0", "both.md::s::0"]
+    vectors += [{"1000": 1.0}, {"1001": 1.0}, {"1000": 0.95, "1001": 0.95}]
+    store.add(ids=ids, vectors=vectors, metadatas=[{"path": cid.split("::")[0]} for cid in ids])
+
+    queries = {"a": {"1000": 1.0}, "b": {"1001": 1.0}}
+    queries.update({f"q{i}": _random_vector(rng, 60) for i in range(8)})
+    retriever = RetrieverSplade(splade_root=str(tmp_path), splade_embedder=_FakeSpladeEmbedder(queries))
+
+    cases = [(["a", "b"], 1), (["q0"], 10), (["q1", "q2", "q3"], 5), ([f"q{i}" for i in range(8)], 20)]
+    try:
+        for pieces, k in cases:
+            rows = retriever.run(project_name=PROJECT, query_pieces=pieces, top_k=k)
+            expected = _brute_force(store, [queries[p] for p in pieces], k)
+
+            assert [row[0] for row in rows] == [cid for cid, _score in expected]
+            assert [row[1] for row in rows] == pytest.approx([score for _cid, score in expected])
+            assert rows[0][2] == {"path": rows[0][0].split("::")[0]}
+
+        assert retriever.run(project_name=PROJECT, query_pieces=["a", "b"], top_k=1)[0][0] == "both.md::s::0"
+    finally:
+        SPLADE_STORE_CACHE.invalidate(project_dir)
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from ragstream.retrieval.score_selection import select_top_k
+
+
+def _full_sort_positions(scores: np.ndarray, ids: list[str], k: int) -> list[int]:
+    order = sorted(range(len(ids)), key=lambda i: (-float(scores[i]), ids[i]))
+    return order[: max(0, min(k, len(ids)))]
+
+
+def test_select_top_k_matches_full_sort_including_ties() -> None:
+    rng = np.random.default_rng(0)
+    for _ in range(300):
+        n = int(rng.integers(1, 50))
+        scores = (rng.integers(0, 4, size=n) / 3.0).astype(np.float32)
+        ids = [f"doc.md::sha::{int(i)}" for i in rng.permutation(n)]
+        k = int(rng.integers(0, 60))
+
+        assert select_top_k(scores, ids, k).tolist() == _full_sort_positions(scores, ids, k)
+
+
+def test_select_top_k_breaks_boundary_ties_by_id() -> None:
+    scores = np.asarray([0.5, 0.9, 0.5, 0.5], dtype=np.float32)
+    ids = ["d", "a", "b", "c"]
+
+    assert select_top_k(scores, ids, 2).tolist() == [1, 2]
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+pytest.importorskip("torch")
+
+from ragstream.ingestion import splade_backend
+from ragstream.ingestion.splade_backend import SpladeBackendChoice, verify_backend_parity
+
+_REFERENCE = {"1": 3.0, "2": 2.0, "3": 1.0}
+
+
+class _FakeEmbedder:
+    def __init__(self, vector: dict[str, float]) -> None:
+        self.vector = vector
+
+    def embed_queries(self, texts: list[str]) -> list[dict[str, float]]:
+        return [dict(self.vector) for _ in texts]
+
+
+@pytest.mark.parametrize(
+    ("quantized_vector", "expected_backend"),
+    [(_REFERENCE, "onnx-int8"), ({"7": 1.0}, "torch")],
+)
+def test_quantized_backend_must_pass_parity(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    quantized_vector: dict[str, float],
+    expected_backend: str,
+) -> None:
+    def fake_build(choice: SpladeBackendChoice, *, device: str = "cpu") -> _FakeEmbedder:
+        return _FakeEmbedder(_REFERENCE if choice.name == "torch" else quantized_vector)
+
+    monkeypatch.setattr(splade_backend, "_build_embedder", fake_build)
+    quantized = SpladeBackendChoice(name="onnx-int8", model="export", backend="onnx")
+
+    choice = verify_backend_parity("model", quantized, parity_top_k=3, parity_path=tmp_path / "parity.json")
+
+    assert choice.name == expected_backend
+    assert (tmp_path / "parity.json").exists()
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+from pathlib import Path
+import pickle
+import random
+import sys
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from ragstream.ingestion.vector_store_splade import VectorStoreSplade
+
+
+def _random_vector(rng: random.Random) -> dict[str, float]:
+    return {str(rng.randrange(5000)): rng.random() * 3 for _ in range(rng.randint(1, 40))}
+
+
+def _brute_force_top_k(index: dict, query: dict, k: int) -> list[str]:
+    def dot(doc: dict) -> float:
+        return sum(value * doc.get(key, 0.0) for key, value in query.items())
+
+    return sorted(index, key=lambda cid: (-dot(index[cid]), cid))[:k]
+
+
+def test_legacy_pickle_is_migrated_and_queries_match(tmp_path: Path) -> None:
+    rng = random.Random(0)
+    index = {f"doc{i % 7}.md::sha{i % 7}::{i}": _random_vector(rng) for i in range(400)}
+    metadatas = {cid: {"path": cid.split("::")[0], "sha256": cid.split("::")[1]} for cid in index}
+    with (tmp_path / "docs_sparse.pkl").open("wb") as f:
+        pickle.dump({"version": "1", "index": index, "metadatas": metadatas}, f)
+
+    store = VectorStoreSplade(persist_dir=str(tmp_path))
+
+    assert not (tmp_path / "docs_sparse.pkl").exists()
+    assert store.count() == len(index)
+
+    query = _random_vector(rng)
+    assert store.query(query, k=10) == _brute_force_top_k(index, query, 10)
+
+    reopened = VectorStoreSplade(persist_dir=str(tmp_path))
+    assert reopened.query(query, k=10) == _brute_force_top_k(index, query, 10)
+
+
+def test_add_and_delete_survive_reopen(tmp_path: Path) -> None:
+    store = VectorStoreSplade(persist_dir=str(tmp_path))
+    store.add(
+        ids=["a.md::s1::0", "a.md::s1::1", "b.md::s2::0"],
+        vectors=[{"1": 1.0}, {"2": 2.0}, {"1": 0.5, "3": 1.0}],
+        metadatas=[
+            {"path": "a.md", "sha256": "s1"},
+            {"path": "a.md", "sha256": "s1"},
+            {"path": "b.md", "sha256": "s2"},
+        ],
+    )
+    assert store.delete_file_version("a.md", "s1") == 2
+
+    reopened = VectorStoreSplade(persist_dir=str(tmp_path))
+    assert reopened.count() == 1
+    assert reopened.index["b.md::s2::0"] == {"1": 0.5, "3": 1.0}
+    assert reopened.query({"1": 1.0}, k=5) == ["b.md::s2::0"]
+
+
+def test_wal_replay_ignores_torn_last_record_and_compacts(tmp_path: Path) -> None:
+    store = VectorStoreSplade(persist_dir=str(tmp_path))
+    store.add(ids=["a::0", "a::1"], vectors=[{"1": 1.0}, {"2": 1.0}], metadatas=[{}, {}])
+    store.delete_where({"$or": [{"missing": 1}]})
+
+    wal_path = tmp_path / "docs_sparse.wal.jsonl"
+    with wal_path.open("ab") as f:
+        f.write(b'{"op":"upsert","id":"torn","indi')
+
+    reopened = VectorStoreSplade(persist_dir=str(tmp_path))
+    assert sorted(reopened.ids()) == ["a::0", "a::1"]
+    assert wal_path.read_bytes().endswith(b"\n")
+
+    reopened.compact()
+    assert wal_path.stat().st_size == 0
+    assert sorted(VectorStoreSplade(persist_dir=str(tmp_path)).ids()) == ["a::0", "a::1"]
+
+
+def test_pruned_search_matches_exhaustive_scores(tmp_path: Path) -> None:
+    import numpy as np
+
+    rng = random.Random(3)
+    store = VectorStoreSplade(persist_dir=str(tmp_path))
+    ids = [f"doc::{i:04d}" for i in range(1500)]
+    store.add(ids=ids, vectors=[_random_vector(rng) for _ in ids])
+
+    all_rows = np.arange(len(ids))
+    for _ in range(20):
+        query = _random_vector(rng)
+        for k in (1, 10, 50):
+            rows, scores = store.search(query, k)
+            expected_rows, expected_scores = store._rank_rows(all_rows, store.score(query), k)
+            assert rows.tolist() == expected_rows.tolist()
+            assert np.allclose(scores, expected_scores)
+
+
+def test_score_many_matches_per_query_scores(tmp_path: Path) -> None:
+    import numpy as np
+
+    rng = random.Random(5)
+    store = VectorStoreSplade(persist_dir=str(tmp_path))
+    ids = [f"doc::{i:04d}" for i in range(300)]
+    store.add(ids=ids, vectors=[_random_vector(rng) for _ in ids])
+
+    queries = [_random_vector(rng) for _ in range(6)] + [{}]
+    rows = np.asarray(rng.sample(range(len(ids)), 40))
+
+    for subset in (rows, None):
+        scores = store.score_many(queries, subset)
+        expected = np.vstack([store.score(query, subset) for query in queries])
+        assert scores.shape == expected.shape
+        assert np.allclose(scores, expected)
+
+
+def test_array_rows_are_accepted_like_dicts(tmp_path: Path) -> None:
+    import numpy as np
+
+    store = VectorStoreSplade(persist_dir=str(tmp_path))
+    store.add(
+        ids=["a::0", "a::1"],
+        vectors=[
+            (np.asarray([7, 2, 4], dtype=np.int32), np.asarray([0.5, 1.5, 0.0], dtype=np.float32)),
+            {"2": 1.5, "7": 0.5},
+        ],
+    )
+
+    reopened = VectorStoreSplade(persist_dir=str(tmp_path))
+    assert reopened.index["a::0"] == reopened.index["a::1"] == {"2": 1.5, "7": 0.5}
+
+
+def test_metadata_index_matches_full_scan(tmp_path: Path) -> None:
+    rng = random.Random(7)
+    store = VectorStoreSplade(persist_dir=str(tmp_path))
+    versions = [(f"doc{p}.md", f"sha{s}") for p in range(5) for s in range(3)]
+
+    for step in range(6):
+        picks = [rng.choice(versions) for _ in range(60)]
+        store.add(
+            ids=[f"{path}::{sha}::{step}_{i}" for i, (path, sha) in enumerate(picks)],
+            vectors=[_random_vector(rng) for _ in picks],
+            metadatas=[{"path": path, "sha256": sha} for path, sha in picks],
+        )
+        path, sha = rng.choice(versions)
+        store.delete_file_version(path, sha)
+        if step == 3:
+            store = VectorStoreSplade(persist_dir=str(tmp_path))
+
+    filters = [
+        {"path": "doc1.md"},
+        {"path": "doc2.md", "sha256": "sha1"},
+        {"$and": [{"path": "doc3.md"}, {"sha256": "sha0"}]},
+        {"$or": [{"path": "doc0.md"}, {"path": "doc4.md", "sha256": "sha2"}]},
+        {"sha256": "sha1"},
+    ]
+    for where in filters:
+        expected = sorted(
+            cid for cid in store.ids() if store._metadata_matches(store.get_metadata(cid), where)
+        )
+        assert sorted(store.ids_where(where)) == expected
+        assert store.count_where(where) == len(expected)
+
+
+def test_store_cache_reopens_only_after_generation_bump(tmp_path: Path) -> None:
+    from ragstream.ingestion.store_generation import bump_generation
+    from ragstream.retrieval.splade_store_cache import SpladeStoreCache
+
+    VectorStoreSplade(persist_dir=str(tmp_path)).add(["a.md::s::0"], [{"1": 1.0}], [{"path": "a.md"}])
+    cache = SpladeStoreCache()
+    opened = []
+
+    def factory() -> VectorStoreSplade:
+        opened.append(1)
+        return VectorStoreSplade(persist_dir=str(tmp_path))
+
+    first = cache.get(tmp_path, factory)
+    assert cache.get(tmp_path, factory) is first
+
+    VectorStoreSplade(persist_dir=str(tmp_path)).add(["b.md::s::0"], [{"2": 1.0}], [{"path": "b.md"}])
+    bump_generation(tmp_path)
+
+    assert len(cache.get(tmp_path, factory)) == 2
+    assert len(opened) == 2
+
+
+def test_reusable_rows_are_read_without_materializing(tmp_path: Path) -> None:
+    store = VectorStoreSplade(persist_dir=str(tmp_path))
+    store.add(
+        ids=["a.md::s1::0", "a.md::s1::1", "a.md::s1::2"],
+        vectors=[{"1": 1.0, "7": 0.5}, {"2": 2.0}, {"3": 3.0}],
+        metadatas=[{"path": "a.md", "sha256": "s1", "chunk_sha256": f"h{i}"} for i in range(3)],
+    )
+    store.compact()
+    # One committed row is overwritten and one is deleted; both stay pending.
+    store.add(["a.md::s1::1"], [{"4": 4.0}], [{"path": "a.md", "sha256": "s1", "chunk_sha256": "h1"}])
+    store._delete_ids(["a.md::s1::2"])
+    assert store._pending and store._dropped
+
+    rows = store.vectors_by_chunk_hash("a.md", "s1")
+
+    assert store._pending and store._dropped   # nothing was folded into the CSR
+    assert sorted(rows) == ["h0", "h1"]
+    for indices, weights in rows.values():
+        assert indices.dtype == np.int32 and weights.dtype == np.float32
+    assert rows["h0"][0].tolist() == [1, 7] and rows["h0"][1].tolist() == [1.0, 0.5]
+    assert rows["h1"][0].tolist() == [4] and rows["h1"][1].tolist() == [4.0]